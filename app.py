@@ -1,60 +1,106 @@
 import flask
-from datetime import datetime, timedelta
+import functools
+import json
 import dash
 import dash_core_components as dcc
 import dash_html_components as html
-from dash.dependencies import Input, Output
+from dash.dependencies import Input, Output, State
+from dash.exceptions import PreventUpdate
+from urllib.parse import parse_qs
 import pandas as pd
 import numpy as np
+import plotly
 import plotly.graph_objects as go
-import plotly.express as px
-import pickle
-import pathlib
 from controls import monthCode, econSector, sectorColor, sectorTxtColor
-
-# get relative data folder
-PATH = pathlib.Path(__file__).parent
-DATA_PATH = PATH.joinpath("dataset").resolve()
-MODEL_PATH = PATH.joinpath("model").resolve()
+from prediction import MODEL_FILE, encode_features, load_model, file_hash
+from backtest import load_backtest
+from storage import aggregate, load_dataset, DATA_FILE
+from rollup import Rollup
+from downsample import downsample
+from scenario_store import ScenarioStore, scenario_key
+from singleflight import SingleFlight, Supersede
+from session_store import SessionStore
+from scenario import compute_scenario, default_scenario, scenario_totals
+import optimizer
+from projection import horizon_periods, load_or_project
+from surrogate import load_surrogate
+from explain import GROUPS, TreeExplainer, explanation_key, load_or_explain
+from layout_cache import HOST_URL, CachedLayoutDash, layout_key
+from progressive import Z, ProgressiveForest
 
 #styling/css
 external_stylesheets = ['https://dash-gallery.plotly.host/dash-oil-and-gas/assets/s1.css','https://dash-gallery.plotly.host/dash-oil-and-gas/assets/styles.css']
 
 server = flask.Flask(__name__)
-app = dash.Dash(__name__, external_stylesheets=external_stylesheets, server=server)
+app = CachedLayoutDash(__name__, external_stylesheets=external_stylesheets, server=server)
 
-#read dataset
-df = pd.read_csv(DATA_PATH.joinpath('dataset-predictive-NPL-UMKM.csv'),low_memory=False)
+#read dataset as a sector-level monthly rollup, scanned in bounded chunks so the
+#raw data can be split further (province, bank) without growing this frame.
+#keys are categorical and measures downcast, see datalayer.memory_report
+df = load_dataset(DATA_FILE)
 
 #import model 
-model_rf = pickle.load(open(MODEL_PATH.joinpath("penjaminan_predictive_UMKM_2.sav"), "rb"))
+model_rf = load_model()
+model_version = file_hash(MODEL_FILE)[:16]
+
+#the forest evaluated tree by tree: the same results as model_rf, and estimates from its first
+#trees within a latency budget while a scenario tab waits for a new result
+forest = ProgressiveForest(model_rf)
+
+#interactive scenarios read the precomputed response grid when it has been built
+#(python surrogate.py), sectors or inputs it does not cover fall back to the model
+scenario_model, scenario_version = load_surrogate(forest, model_version)
+
+#scenario inputs and results shared by all workers, addressable by their key
+scenario_store = ScenarioStore()
+
+#historical backtest of the model, cached on disk per model and dataset
+backtest = load_backtest(df, model_rf, DATA_FILE, MODEL_FILE)
+
+#June 2020 defaults and their cost, the starting point of the allocation optimizer
+defaults = default_scenario(DATA_FILE)
+default_result = compute_scenario(model_rf, defaults['EconGrowth'], defaults['Inflasi'], defaults['Unemployment'], defaults['credits'])
+
+#months of the guarantee year after the last observed month
+last_year = int(df['Tahun'].max())
+last_month = monthCode.index(df[df.Tahun == last_year]['Bulan'].iloc[-1])
+projection_periods = horizon_periods(last_year, last_month)
+history_periods = (df['Bulan'].astype(str) + " " + df['Tahun'].astype(str)).unique()
 
 pre_df = df[df.Tahun == 2020]
 fil_df = pre_df[pre_df.Bulan=="Jun"]
 row_take = fil_df[fil_df.SektorEkonomi==econSector[0]]
 
-#populate average 2019 data
-prev_df = df[df.Tahun != 2020]
-summavg_df = prev_df.groupby('SektorEkonomi', as_index=False).agg({"percentNPL":"mean"})
+#starting values of the scenario tab forms (June 2020) keyed by input id, the layout shows them
+#with their outputs already rendered
+initial_fields = {"npl_value_type": 'Percentage', "baseline-year-slider": [int(df['Tahun'].min()), 2019]}
+for suffix in ["", "2", "3"]:
+    initial_fields.update({name+suffix: row_take[name].values[0].item() for name in ['EconGrowth', 'Inflasi', 'Unemployment']})
+    initial_fields.update({"sector_form{}_{}".format(suffix, i): (fil_df[fil_df.SektorEkonomi==sector]['valueChannel'].values[0]*1000000000).item()
+                           for i, sector in enumerate(econSector)})
 
-avg_2019 = []  
-    
-for i in np.arange(18):
-    taken_df = summavg_df[summavg_df.SektorEkonomi==econSector[i]]
-    avg_2019.append(taken_df['percentNPL'].values[0]*100)
+#cumulative per-sector monthly rollups for year-range sums and baseline averages
+rollups = Rollup(df)
+
+#full monthly history of every sector up to the last observed month, for the zoomable chart.
+#positions on the x axis are nanoseconds so zoom ranges compare directly
+n_history = (last_year - rollups.first_year) * 12 + last_month + 1
+history_x = np.datetime_as_string(rollups.periods()[:n_history], unit='D')
+history_ns = rollups.periods()[:n_history].astype('datetime64[ns]').astype(np.int64).astype(float)
+history_series = {measure: rollups.monthly(measure)[:, :n_history] for measure in ['valueChannel', 'valueNPL', 'percentNPL']}
+
+#labels of the year sliders
+year_marks = {str(year): str(year) for year in df['Tahun'].unique()}
 
 #form generation function
 def generate_form(i):
-    prefiltered_df = df[df.Tahun == 2020]
-    filtered_df = prefiltered_df[prefiltered_df.Bulan=="Jun"]
-    data = filtered_df[filtered_df.SektorEkonomi==econSector[i]]
     return html.Div([
         html.P(econSector[i], style={'color': sectorTxtColor[i], 'font-weight':'bold'}),
         html.P("Penyaluran Kredit", style={'color': sectorTxtColor[i]}),
         dcc.Input(
             id="sector_form_{}".format(str(i)),
             type="number",
-            value=data['valueChannel'].values[0]*1000000000,
+            value=initial_fields["sector_form_{}".format(i)],
             debounce=True
         ),
         html.P("Proyeksi NPL", style={'color': sectorTxtColor[i]}),
@@ -62,18 +108,28 @@ def generate_form(i):
         html.P(id="sector_NPL_val_{}".format(i) , style={'color': sectorTxtColor[i]})
         ],className="three columns pretty_container", style={'width': '98%', 'background-color':sectorColor[i]})
 
+#form generation function untuk asumsi pertumbuhan kredit bulanan
+def generate_growth_form(i):
+    return html.Div([
+        html.P(econSector[i], style={'color': sectorTxtColor[i], 'font-weight':'bold', 'font-size':'12px'}),
+        dcc.Input(
+            id="growth_form_{}".format(str(i)),
+            type="number",
+            value=0,
+            debounce=True,
+            style={'width':'100%'}
+        ),
+        ],className="two columns pretty_container", style={'width': '98%', 'background-color':sectorColor[i]})
+
 #form generation function untuk evaluasi IJP
 def generate_form_eval_IJP(i):
-    prefiltered_df = df[df.Tahun == 2020]
-    filtered_df = prefiltered_df[prefiltered_df.Bulan=="Jun"]
-    data = filtered_df[filtered_df.SektorEkonomi==econSector[i]]
     return html.Div([
         html.P(econSector[i], style={'color': sectorTxtColor[i], 'font-weight':'bold'}),
         html.P("Penyaluran Kredit", style={'color': sectorTxtColor[i]}),
         dcc.Input(
             id="sector_form2_{}".format(str(i)),
             type="number",
-            value=data['valueChannel'].values[0]*1000000000,
+            value=initial_fields["sector_form2_{}".format(i)],
             debounce=True
         ),
         html.P("Proyeksi NPL", style={'color': sectorTxtColor[i]}),
@@ -83,497 +139,760 @@ def generate_form_eval_IJP(i):
 
 #form generation function untuk evaluasi sektor terdampak
 def generate_form_eval_sector(i):
-    prefiltered_df = df[df.Tahun == 2020]
-    filtered_df = prefiltered_df[prefiltered_df.Bulan=="Jun"]
-    data = filtered_df[filtered_df.SektorEkonomi==econSector[i]]
     return html.Div([
         html.P(econSector[i], style={'color': sectorTxtColor[i], 'font-weight':'bold'}),
         html.P("Penyaluran Kredit", style={'color': sectorTxtColor[i]}),
         dcc.Input(
             id="sector_form3_{}".format(str(i)),
             type="number",
-            value=data['valueChannel'].values[0]*1000000000,
+            value=initial_fields["sector_form3_{}".format(i)],
             debounce=True
         ),
         html.P("Proyeksi NPL", style={'color': sectorTxtColor[i]}),
         html.H1(id ="sector_NPL3_{}".format(str(i)) , style={'color': sectorTxtColor[i], 'font-weight':'bold', 'font-size':'44px'}),
-        html.P("Rata-rata Persentase NPL 2019" , style={'color': sectorTxtColor[i]}),
+        html.P("Rata-rata Persentase NPL Periode Pembanding" , style={'color': sectorTxtColor[i]}),
         html.H6(id="sector_compare_NPL3_{}".format(i) , style={'color': sectorTxtColor[i], 'font-size':'32px'}), 
         html.P(id="sector_NPL_val3_{}".format(i) , style={'color': sectorTxtColor[i]})
         ],className="three columns pretty_container", style={'width': '98%', 'background-color':sectorColor[i]})
 
-app.layout = html.Div(children=[
-    html.Div( #header div
+#inputs and outputs of the scenario tabs, whose state is kept server side per browser tab
+SESSION_SLOTS = {
+    'penganggaran': (
+        ["EconGrowth", "Inflasi", "Unemployment"] + ["sector_form_{}".format(i) for i in range(18)],
+        [("sector_NPL_{}".format(i), "children") for i in range(18)] +
+        [("sector_NPL_val_{}".format(i), "children") for i in range(18)] +
+        [("total_NPL", "children"), ("total_NPL_val", "children"), ("total_credit", "children"),
+         ("IJP_tarif", "children"), ("IJP_budget", "children"), ("loss_limit_budget", "children"),
+         ("scenario_link", "href"), ("scenario_link", "children")]),
+    'tarif': (
+        ["EconGrowth2", "Inflasi2", "Unemployment2"] + ["sector_form2_{}".format(i) for i in range(18)],
+        [("sector_NPL2_{}".format(i), "children") for i in range(18)] +
+        [("sector_NPL_val2_{}".format(i), "children") for i in range(18)] +
+        [("total_NPL2", "children"), ("total_NPL_val2", "children"), ("total_credit2", "children"),
+         ("IJP_tarif2", "children")]),
+    'sektor': (
+        ["EconGrowth3", "Inflasi3", "Unemployment3", "npl_value_type", "baseline-year-slider"] +
+        ["sector_form3_{}".format(i) for i in range(18)],
+        [("sector_NPL3_{}".format(i), "children") for i in range(18)] +
+        [("sector_NPL_val3_{}".format(i), "children") for i in range(18)] +
+        [("sector_compare_NPL3_{}".format(i), "children") for i in range(18)] +
+        [("channel-comparison-graph-sector-affected", "figure")]),
+}
+
+def build_layout():
+    return html.Div(children=[
+        dcc.Location(id='url', refresh=False),
+        #per scenario tab: values sent so far (client only), changed fields to the server,
+        #changed outputs from the server, the sequence number the server confirmed, the
+        #estimated patch to refine with the refined outputs, and the full state resent after a
+        #resync with the outputs rendered from it
+        *[dcc.Store(id="{}-{}".format(slot, kind)) for slot in SESSION_SLOTS
+          for kind in ('sent', 'delta', 'patch', 'ack', 'refine', 'refined', 'resend', 'resynced')],
+        html.Div( #header div
+                [
+                    html.Div(
+                        [
+                            html.Img(
+                                src=app.get_asset_url("kemenkeu-logo.png"),
+                                id="logo-image",
+                                style={
+                                    "height": "100px",
+                                    "width": "auto",
+                                },
+                            ),#end of logo img tag
+                            html.Div(
+                                [
+                                    html.H3(
+                                        "Penjaminan Kredit UMKM dalam rangka PEN",
+                                        style={"margin-bottom": "0px", "font-weight":"bold"},
+                                    ),
+                                    html.H5(
+                                        "Predictive Analytics Dashboard", style={"margin-top": "0px"}
+                                    ),
+                                ]
+                            )
+                        ],
+                        className="twelve columns",
+                        id="title",
+                    )
+                ],
+                id="header",
+                className="row flex-display",
+                style={"margin-bottom": "25px"},
+                ),#end of header div
+        html.Div( #main div
             [
-                html.Div(
-                    [
-                        html.Img(
-                            src=app.get_asset_url("kemenkeu-logo.png"),
-                            id="logo-image",
-                            style={
-                                "height": "100px",
-                                "width": "auto",
-                            },
-                        ),#end of logo img tag
-                        html.Div(
-                            [
-                                html.H3(
-                                    "Penjaminan Kredit UMKM dalam rangka PEN",
-                                    style={"margin-bottom": "0px", "font-weight":"bold"},
-                                ),
-                                html.H5(
-                                    "Predictive Analytics Dashboard", style={"margin-top": "0px"}
-                                ),
-                            ]
-                        )
-                    ],
-                    className="twelve columns",
-                    id="title",
-                )
-            ],
-            id="header",
-            className="row flex-display",
-            style={"margin-bottom": "25px"},
-            ),#end of header div
-    html.Div( #main div
-        [
-            dcc.Tabs([
-                dcc.Tab(label='Informasi Umum', children=[
+                dcc.Tabs([
+                    dcc.Tab(label='Informasi Umum', children=[
                     
-                        html.Div([ #latar belakang dan tujuan analisis
-                            html.Div([
-                                html.H5("Latar Belakang", style={"font-weight":"bold"}),
-                                html.P("Dalam rangka mendukung kebijakan keuangan negara untuk penanganan pandemi Covid-19 dan pemulihan ekonomi nasional, Pemerintah melalui Peraturan Pemerintah nomor 43 tahun 2020 telah mengatur 4 (empat) modalitas untuk program pemulihan ekonomi nasional (PEN) yang meliputi penyertaan modal negara, penempatan dana, investasi pemerintah, dan penjaminan."),
-                                html.P("Pada kegiatan penjaminan kredit modal kerja UMKM, pemerintah menugaskan BUMN dalam hal ini PT Jamkrindo dan PT Askrindo untuk bertindak sebagai penjamin bagi kredit modal kerja Usaha Mikro Kecil Menengah (UMKM). Program penjaminan ini sendiri bertujuan untuk meningkatkan minat perbankan dalam menyalurkan kredit kepada pelaku usaha agar mendapat kemudahan penjaminan saat mengajukan kredit. Selain itu, pemberian modal kerja pada UMKM penting dilakukan dalam membuat kegiatan usaha kembali menggeliat setelah terpuruk akibat dampak pandemi Covid-19."),
-                                html.P("Pemerintah telah melakukan berbagai dukungan agar program penjaminan berjalan dengan baik. Pada tahun 2020, pemerintah telah menganggarkan sejumlah Rp6 T untuk memberikan dukungan pada program penjaminan pelaku usaha UMKM dengan rincian Rp5 T sebagai Subsidi Belanja IJP dan Rp1 T untuk dukungan penjaminan loss limit."),
-                                html.P("Salah satu dukungan yang dilakukan pemerintah adalah membayarkan seluruh Imbal Jasa Penjaminan (IJP) yang seharusnya ditanggung oleh pelaku usaha sebagai kreditur. IJP yang dianggarkan pemerintah akan dibayarkan ke pihak penjamin sesuai dengan perhitungan yang telah ditetapkan. Salah satu faktor penentuan besaran IJP adalah adanya proyeksi non performing loan (NPL). Penentuan besaran rasio NPL yang akurat akan berpengaruh pada ketepatan jumlah penganggaran yang dilakukan pemerintah dalam alokasi pembayaran IJP. Pada penjaminan pemerintah pada pelaku usaha UMKM, penentuan tarif IJP didasari pada hasil metode perhitungan dan analisa PT Reindonesia Indonesia Utama (RIU) dengan mempertimbangkan proyeksi NPL.")
-                                ],
-                                className="pretty_container eight columns"),   
-                            html.Div([
-                                html.H5("Tujuan", style={"font-weight":"bold"}),
-                                html.Div([
-                                    html.P("Melihat sektor usaha UMKM yang paling terdampak dengan adanya pandemi COVID-19",style={"color":"#fff"})
-                                    ],className = "pretty_container",
-                                    style={"background-color":"#007bff"}),
+                            html.Div([ #latar belakang dan tujuan analisis
                                 html.Div([
-                                    html.P("Memberikan usulan tarif IJP yang akan diberikan kepada Jamkrindo dan Askrindo sebagai lembaga penjamin program PEN",style={"color":"#fff"})
-                                    ],className = "pretty_container",
-                                    style={"background-color":"#28a745"}),
+                                    html.H5("Latar Belakang", style={"font-weight":"bold"}),
+                                    html.P("Dalam rangka mendukung kebijakan keuangan negara untuk penanganan pandemi Covid-19 dan pemulihan ekonomi nasional, Pemerintah melalui Peraturan Pemerintah nomor 43 tahun 2020 telah mengatur 4 (empat) modalitas untuk program pemulihan ekonomi nasional (PEN) yang meliputi penyertaan modal negara, penempatan dana, investasi pemerintah, dan penjaminan."),
+                                    html.P("Pada kegiatan penjaminan kredit modal kerja UMKM, pemerintah menugaskan BUMN dalam hal ini PT Jamkrindo dan PT Askrindo untuk bertindak sebagai penjamin bagi kredit modal kerja Usaha Mikro Kecil Menengah (UMKM). Program penjaminan ini sendiri bertujuan untuk meningkatkan minat perbankan dalam menyalurkan kredit kepada pelaku usaha agar mendapat kemudahan penjaminan saat mengajukan kredit. Selain itu, pemberian modal kerja pada UMKM penting dilakukan dalam membuat kegiatan usaha kembali menggeliat setelah terpuruk akibat dampak pandemi Covid-19."),
+                                    html.P("Pemerintah telah melakukan berbagai dukungan agar program penjaminan berjalan dengan baik. Pada tahun 2020, pemerintah telah menganggarkan sejumlah Rp6 T untuk memberikan dukungan pada program penjaminan pelaku usaha UMKM dengan rincian Rp5 T sebagai Subsidi Belanja IJP dan Rp1 T untuk dukungan penjaminan loss limit."),
+                                    html.P("Salah satu dukungan yang dilakukan pemerintah adalah membayarkan seluruh Imbal Jasa Penjaminan (IJP) yang seharusnya ditanggung oleh pelaku usaha sebagai kreditur. IJP yang dianggarkan pemerintah akan dibayarkan ke pihak penjamin sesuai dengan perhitungan yang telah ditetapkan. Salah satu faktor penentuan besaran IJP adalah adanya proyeksi non performing loan (NPL). Penentuan besaran rasio NPL yang akurat akan berpengaruh pada ketepatan jumlah penganggaran yang dilakukan pemerintah dalam alokasi pembayaran IJP. Pada penjaminan pemerintah pada pelaku usaha UMKM, penentuan tarif IJP didasari pada hasil metode perhitungan dan analisa PT Reindonesia Indonesia Utama (RIU) dengan mempertimbangkan proyeksi NPL.")
+                                    ],
+                                    className="pretty_container eight columns"),   
                                 html.Div([
-                                    html.P("Memberikan usulan anggaran belanja subsidi IJP dan Loss Limit yang sesuai dan tepat",style={"color":"#000"})
-                                    ],className = "pretty_container",
-                                    style={"background-color":"#ffc107"}),
-                                html.P("Selain tujuan yang disebutkan di atas, analisis ini juga dapat bermanfaat untuk pelaksanaan kegiatan pengawasan yang dilakukan oleh Inspektorat Jenderal atas penjaminan program PEN. Hasil analisis dapat digunakan untuk melihat apakah tarif yang diusulkan oleh PT Reasuransi Indonesia Utama (PT RIU) telah disusun menggunakan prediksi NPL yang tepat dan anggaran yang diusulkan Direktorat Jenderal Pengelolaan Pembiayaan dan Risiko (DJPPR) sudah tepat.")
+                                    html.H5("Tujuan", style={"font-weight":"bold"}),
+                                    html.Div([
+                                        html.P("Melihat sektor usaha UMKM yang paling terdampak dengan adanya pandemi COVID-19",style={"color":"#fff"})
+                                        ],className = "pretty_container",
+                                        style={"background-color":"#007bff"}),
+                                    html.Div([
+                                        html.P("Memberikan usulan tarif IJP yang akan diberikan kepada Jamkrindo dan Askrindo sebagai lembaga penjamin program PEN",style={"color":"#fff"})
+                                        ],className = "pretty_container",
+                                        style={"background-color":"#28a745"}),
+                                    html.Div([
+                                        html.P("Memberikan usulan anggaran belanja subsidi IJP dan Loss Limit yang sesuai dan tepat",style={"color":"#000"})
+                                        ],className = "pretty_container",
+                                        style={"background-color":"#ffc107"}),
+                                    html.P("Selain tujuan yang disebutkan di atas, analisis ini juga dapat bermanfaat untuk pelaksanaan kegiatan pengawasan yang dilakukan oleh Inspektorat Jenderal atas penjaminan program PEN. Hasil analisis dapat digunakan untuk melihat apakah tarif yang diusulkan oleh PT Reasuransi Indonesia Utama (PT RIU) telah disusun menggunakan prediksi NPL yang tepat dan anggaran yang diusulkan Direktorat Jenderal Pengelolaan Pembiayaan dan Risiko (DJPPR) sudah tepat.")
+                                    ],
+                                    id="predictiveDescription",
+                                    className="pretty_container four columns")
                                 ],
-                                id="predictiveDescription",
-                                className="pretty_container four columns")
-                            ],
-                            className="row flex-display"), #end of latar belakang dan tujuan analisis
-                    
-                    html.Div([ #start of model chart
-                        html.H5("Model Prediktif",style={"font-weight":"bold"}),
-                        html.Div([
-                            html.P("Model prediktif ini dikembangkan atas target utama yakni NPL penyaluran kredit kepada UMKM. Terdapat beberapa aspek yang menjadi prediktor dan secara umum terbagi ke dalam dua kelompok besar, yakni kondisi makroekonomi dan sektor ekonomi UMKM."),
-                            html.P("Algoritma Random Forest Regression digunakan dalam pengembangan model prediktif tersebut. Random Forest merupakan jenis algoritma ensemble yang mengkombinasikan beberapa decision tree untuk membuat prediksi finalnya."),
-                            html.P("Sumber data yang digunakan dalam pengembangan model prediktif ini adalah Laporan Statistik Perbankan Indonesia dari Otoritas Jasa Keuangan, serta Badan Pusat Statistik untuk indikator makroekonomi.")
-                            ],style={'width': '40%','display':'inline-block'}),
-                        html.Div([
-                           html.Img(
-                               src=app.get_asset_url("model-chart.png"),
-                               id="scheme-image",
-                               style={
-                                   "height": "auto",
-                                   "width": "80%",
-                                   },
-                               ),#end of logo img tag   
-                            ],style={'text-align':'center','width': '60%','display':'inline-block'}),
-                        ], className="pretty_container",style={'background-color':'#fff'}),
-                    
-                    html.Div([#start of aggregate credit channel and NPL graph div
-                        html.H5("Total Penyaluran dan NPL Kredit UMKM Tahun 2011-2020 (dalam Rp Miliar)",style={"font-weight":"bold"}),
-                        html.Div([
-                            dcc.Graph(id='aggregate-channel-graph-with-slider',
-                                      style={'height':500})   
-                            ],style={'width': '50%','display':'inline-block'}),
-
-                        html.Div([
-                            dcc.Graph(id='aggregate-npl-graph-with-slider',
-                                      style={'height':500})   
-                            ],style={'width': '50%','display':'inline-block'}),
-
-                        dcc.Slider(
-                                id='aggregate-year-slider',
-                                min=df['Tahun'].min(),
-                                max=df['Tahun'].max(),
-                                value=2020,
-                                marks={str(year): str(year) for year in df['Tahun'].unique()},
-                                step=None
-                                ),
-                        html.Br(),
-                        html.Br()
-                        ],className="pretty_container"),
+                                className="row flex-display"), #end of latar belakang dan tujuan analisis
                     
-                    html.Div([ #start of sectoral credit channel and NPL graph div
-                        html.Div([ #column div
-                            html.H5("Penyaluran dan NPL Kredit UMKM per Sektor Ekonomi Tahun 2011-2020 (dalam Rp Miliar)",style={"font-weight":"bold"}),
+                        html.Div([ #start of model chart
+                            html.H5("Model Prediktif",style={"font-weight":"bold"}),
                             html.Div([
-                                dcc.Dropdown(
-                                    id='econ-sector-selector',
-                                    options=[{'label': i, 'value': i} for i in econSector],
-                                    value='Perdagangan Besar dan Eceran'
-                                    )                                
-                                ],style={'width': '48%'}),
+                                html.P("Model prediktif ini dikembangkan atas target utama yakni NPL penyaluran kredit kepada UMKM. Terdapat beberapa aspek yang menjadi prediktor dan secara umum terbagi ke dalam dua kelompok besar, yakni kondisi makroekonomi dan sektor ekonomi UMKM."),
+                                html.P("Algoritma Random Forest Regression digunakan dalam pengembangan model prediktif tersebut. Random Forest merupakan jenis algoritma ensemble yang mengkombinasikan beberapa decision tree untuk membuat prediksi finalnya."),
+                                html.P("Sumber data yang digunakan dalam pengembangan model prediktif ini adalah Laporan Statistik Perbankan Indonesia dari Otoritas Jasa Keuangan, serta Badan Pusat Statistik untuk indikator makroekonomi.")
+                                ],style={'width': '40%','display':'inline-block'}),
                             html.Div([
-                                dcc.Graph(id='channel-graph-with-slider',
-                                      style={'height':500})                                
-                                ],style={'width': '60%','display':'inline-block'}),
+                               html.Img(
+                                   src=app.get_asset_url("model-chart.png"),
+                                   id="scheme-image",
+                                   style={
+                                       "height": "auto",
+                                       "width": "80%",
+                                       },
+                                   ),#end of logo img tag   
+                                ],style={'text-align':'center','width': '60%','display':'inline-block'}),
+                            ], className="pretty_container",style={'background-color':'#fff'}),
+                    
+                        html.Div([#start of aggregate credit channel and NPL graph div
+                            html.H5("Total Penyaluran dan NPL Kredit UMKM Tahun 2011-2020 (dalam Rp Miliar)",style={"font-weight":"bold"}),
                             html.Div([
-                                dcc.Graph(id='channel-graph-with-slider-2',
-                                      style={'height':500})                                
-                                ],style={'width': '40%','display':'inline-block'}),
-                            dcc.Slider(
-                                id='year-slider',
-                                min=df['Tahun'].min(),
-                                max=df['Tahun'].max(),
-                                value=2020,
-                                marks={str(year): str(year) for year in df['Tahun'].unique()},
-                                step=None
-                                ),
-                            html.Br()],
-                            className="twelve columns")                
-                        ],
-                        id="display-graph-credit",
-                        className="pretty_container row flex-display",
-                        style={"margin-bottom": "25px", "background-color":"#fff"}
-                        ),#end of credit channel and NPL graph div
-                    html.Div([ #start of comparison on sectoral credit channel and NPL graph div
-                        html.Div([ #column div
-                            html.H5("Perbandingan Penyaluran dan NPL Kredit UMKM Antar Sektor Ekonomi Tahun 2011-2020", style={"font-weight":"bold"}),
+                                dcc.Graph(id='aggregate-channel-graph-with-slider',
+                                          style={'height':500})   
+                                ],style={'width': '50%','display':'inline-block'}),
+
                             html.Div([
-                                dcc.Graph(id='channel-comparison-graph-with-slider',
-                                      style={'height':600}),
-                                dcc.Slider(
-                                    id='year-slider-2',
+                                dcc.Graph(id='aggregate-npl-graph-with-slider',
+                                          style={'height':500})   
+                                ],style={'width': '50%','display':'inline-block'}),
+
+                            dcc.Slider(
+                                    id='aggregate-year-slider',
                                     min=df['Tahun'].min(),
                                     max=df['Tahun'].max(),
                                     value=2020,
-                                    marks={str(year): str(year) for year in df['Tahun'].unique()},
+                                    marks=year_marks,
                                     step=None
                                     ),
-                                html.Br(),
-                                html.Br()                                
-                                ],style={'width': '98%'}),
-                            html.Div([
-                                dcc.Graph(id='channel-comparison-graph-with-slider-2',
-                                      style={'height':600}),
+                            html.Br(),
+                            html.Br()
+                            ],className="pretty_container"),
+                    
+                        html.Div([ #start of sectoral credit channel and NPL graph div
+                            html.Div([ #column div
+                                html.H5("Penyaluran dan NPL Kredit UMKM per Sektor Ekonomi Tahun 2011-2020 (dalam Rp Miliar)",style={"font-weight":"bold"}),
+                                html.Div([
+                                    dcc.Dropdown(
+                                        id='econ-sector-selector',
+                                        options=[{'label': i, 'value': i} for i in econSector],
+                                        value='Perdagangan Besar dan Eceran'
+                                        )                                
+                                    ],style={'width': '48%'}),
+                                html.Div([
+                                    dcc.Graph(id='channel-graph-with-slider',
+                                          style={'height':500})                                
+                                    ],style={'width': '60%','display':'inline-block'}),
+                                html.Div([
+                                    dcc.Graph(id='channel-graph-with-slider-2',
+                                          style={'height':500})                                
+                                    ],style={'width': '40%','display':'inline-block'}),
                                 dcc.Slider(
-                                    id='year-slider-3',
+                                    id='year-slider',
                                     min=df['Tahun'].min(),
                                     max=df['Tahun'].max(),
                                     value=2020,
-                                    marks={str(year): str(year) for year in df['Tahun'].unique()},
+                                    marks=year_marks,
                                     step=None
                                     ),
-                                html.Br()                                
-                                ],style={'width': '98%'}),
+                                html.Br()],
+                                className="twelve columns")                
                             ],
-                            className="twelve columns")                
-                        ],
-                        id="compare-graph-credit",
-                        className="pretty_container row flex-display",
-                        style={"margin-bottom": "25px"}
-                        ),#end of comparison on sectoral credit channel and NPL graph div
-                    ]),#end of first tab
-                #######################tab limit#####################
-                dcc.Tab(label='Evaluasi Sektor Terdampak', children=[
-
-                    html.Div([ #start of total channeling and NPL row div
-                        html.Div([ #start of column div for total SME Credit channeling
-                            html.H5("Perbandingan Proyeksi NPL Kredit UMKM Antar Sektor Ekonomi", style={"font-weight":"bold", "color":"#000"}),
-                            dcc.RadioItems(
-                                id='npl_value_type',
-                                options=[{'label': i, 'value': i} for i in ['Percentage', 'Value']],
-                                value='Percentage',
-                                labelStyle={'display': 'inline-block'}
-                                ),
-                            dcc.Graph(id='channel-comparison-graph-sector-affected',
-                                      style={'height':600})
-                            ], className="pretty_container twelve columns",
-                            style={'text-align':'center','background-color':'#fff', 'border-top':'6px solid #007bff'}
-                            ),#end of column div for total SME credit channeling
-                        ], className="row flex-display"), #end of total channeling and NPL row div
-                    
-                    html.Div([#start of macroeconomic vars
-                        html.H5("Indikator Makro Ekonomi", style={"font-weight":"bold"}),
-                        html.Div([ #row div of macro vars
-                            html.Div([ #pertumbuhan ekonomi div start
-                                html.H5("Pertumbuhan Ekonomi", style={"font-weight":"bold", "color":"#fff"}),
-                                dcc.Input(
-                                    id="EconGrowth3",
-                                    type="number",
-                                    value=row_take['EconGrowth'].values[0],
-                                    debounce=True
-                                    ),
-                                ],className="pretty_container four columns",style={"background-color":"#111"}),
-                            html.Div([ #inflasi div start
-                                html.H5("Tingkat Inflasi", style={"font-weight":"bold", "color":"#fff"}),
-                                dcc.Input(
-                                    id="Inflasi3",
-                                    type="number",
-                                    value=row_take['Inflasi'].values[0],
-                                    debounce=True
+                            id="display-graph-credit",
+                            className="pretty_container row flex-display",
+                            style={"margin-bottom": "25px", "background-color":"#fff"}
+                            ),#end of credit channel and NPL graph div
+                        html.Div([ #start of comparison on sectoral credit channel and NPL graph div
+                            html.Div([ #column div
+                                html.H5("Perbandingan Penyaluran dan NPL Kredit UMKM Antar Sektor Ekonomi Tahun 2011-2020", style={"font-weight":"bold"}),
+                                html.Div([
+                                    dcc.Graph(id='channel-comparison-graph-with-slider',
+                                          style={'height':600}),
+                                    dcc.RangeSlider(
+                                        id='year-slider-2',
+                                        min=df['Tahun'].min(),
+                                        max=df['Tahun'].max(),
+                                        value=[2020, 2020],
+                                        marks=year_marks,
+                                        step=None
+                                        ),
+                                    html.Br(),
+                                    html.Br()                                
+                                    ],style={'width': '98%'}),
+                                html.Div([
+                                    dcc.Graph(id='channel-comparison-graph-with-slider-2',
+                                          style={'height':600}),
+                                    dcc.RangeSlider(
+                                        id='year-slider-3',
+                                        min=df['Tahun'].min(),
+                                        max=df['Tahun'].max(),
+                                        value=[2020, 2020],
+                                        marks=year_marks,
+                                        step=None
+                                        ),
+                                    html.Br()                                
+                                    ],style={'width': '98%'}),
+                                ],
+                                className="twelve columns")                
+                            ],
+                            id="compare-graph-credit",
+                            className="pretty_container row flex-display",
+                            style={"margin-bottom": "25px"}
+                            ),#end of comparison on sectoral credit channel and NPL graph div
+                        html.Div([ #start of full history graph div
+                            html.H5("Riwayat Bulanan Penyaluran dan NPL Kredit UMKM Seluruh Sektor Ekonomi", style={"font-weight":"bold"}),
+                            html.Div([
+                                dcc.RadioItems(
+                                    id='history-measure',
+                                    options=[{'label': 'Penyaluran Kredit (Rp Miliar)', 'value': 'valueChannel'},
+                                             {'label': 'NPL (Rp Miliar)', 'value': 'valueNPL'},
+                                             {'label': 'Persentase NPL', 'value': 'percentNPL'}],
+                                    value='percentNPL',
+                                    labelStyle={'display': 'inline-block', 'margin-right': '20px'}
                                     ),
-                                ],className="pretty_container four columns",style={"background-color":"#111"}),
-                            html.Div([ #pengangguran div start
-                                html.H5("Tingkat Pengangguran", style={"font-weight":"bold", "color":"#fff"}),
-                                dcc.Input(
-                                    id="Unemployment3",
-                                    type="number",
-                                    value=row_take['Unemployment'].values[0],
-                                    debounce=True
+                                dcc.Dropdown(
+                                    id='history-sector-selector',
+                                    options=[{'label': i, 'value': i} for i in econSector],
+                                    value=econSector,
+                                    multi=True
+                                    )
+                                ],style={'width': '98%'}),
+                            dcc.Graph(id='history-graph',
+                                      style={'height':600}),
+                            html.P("Geser atau perbesar grafik untuk melihat periode tertentu, klik dua kali untuk kembali ke seluruh periode.")
+                            ],
+                            className="pretty_container",
+                            style={"margin-bottom": "25px", "background-color":"#fff"}
+                            ),#end of full history graph div
+                        ]),#end of first tab
+                    #######################tab limit#####################
+                    dcc.Tab(label='Evaluasi Sektor Terdampak', children=[
+
+                        html.Div([ #start of total channeling and NPL row div
+                            html.Div([ #start of column div for total SME Credit channeling
+                                html.H5("Perbandingan Proyeksi NPL Kredit UMKM Antar Sektor Ekonomi", style={"font-weight":"bold", "color":"#000"}),
+                                dcc.RadioItems(
+                                    id='npl_value_type',
+                                    options=[{'label': i, 'value': i} for i in ['Percentage', 'Value']],
+                                    value=initial_fields["npl_value_type"],
+                                    labelStyle={'display': 'inline-block'}
                                     ),
-                                ],className="pretty_container four columns",style={"background-color":"#111"})
-                            ],className="row flex-display") #end of macro vars row div
-                        ],className="pretty_container"),#end of macroeconomic var div                    
+                                dcc.Graph(id='channel-comparison-graph-sector-affected',
+                                          style={'height':600})
+                                ], className="pretty_container twelve columns",
+                                style={'text-align':'center','background-color':'#fff', 'border-top':'6px solid #007bff'}
+                                ),#end of column div for total SME credit channeling
+                            ], className="row flex-display"), #end of total channeling and NPL row div
+                    
+                        html.Div([#start of macroeconomic vars
+                            html.H5("Indikator Makro Ekonomi", style={"font-weight":"bold"}),
+                            html.Div([ #row div of macro vars
+                                html.Div([ #pertumbuhan ekonomi div start
+                                    html.H5("Pertumbuhan Ekonomi", style={"font-weight":"bold", "color":"#fff"}),
+                                    dcc.Input(
+                                        id="EconGrowth3",
+                                        type="number",
+                                        value=initial_fields["EconGrowth3"],
+                                        debounce=True
+                                        ),
+                                    ],className="pretty_container four columns",style={"background-color":"#111"}),
+                                html.Div([ #inflasi div start
+                                    html.H5("Tingkat Inflasi", style={"font-weight":"bold", "color":"#fff"}),
+                                    dcc.Input(
+                                        id="Inflasi3",
+                                        type="number",
+                                        value=initial_fields["Inflasi3"],
+                                        debounce=True
+                                        ),
+                                    ],className="pretty_container four columns",style={"background-color":"#111"}),
+                                html.Div([ #pengangguran div start
+                                    html.H5("Tingkat Pengangguran", style={"font-weight":"bold", "color":"#fff"}),
+                                    dcc.Input(
+                                        id="Unemployment3",
+                                        type="number",
+                                        value=initial_fields["Unemployment3"],
+                                        debounce=True
+                                        ),
+                                    ],className="pretty_container four columns",style={"background-color":"#111"})
+                                ],className="row flex-display") #end of macro vars row div
+                            ],className="pretty_container"),#end of macroeconomic var div                    
 
-                    html.Div([ #start of sectoral form div
-                        html.Div([ #row div
-                            html.Div([
-                                html.H5("Nilai Penyaluran dan Proyeksi NPL Kredit UMKM per Sektor Ekonomi", style={"font-weight":"bold"}),                                
-                                ], className="twelve columns"),
-                            ],className="row flex-display"),#end of row div for title
-                        #first row div for sectoral form
-                        html.Div(children=[generate_form_eval_sector(i) for i in np.arange(3)
-                            ],className="row flex-display",style={'width': '98%'}),
-                        #second row of sectoral form
-                        html.Div(children=[generate_form_eval_sector(i+3) for i in np.arange(3)
-                            ],className="row flex-display",style={'width': '98%'}),
-                        #third row of sectoral form
-                        html.Div(children=[generate_form_eval_sector(i+6) for i in np.arange(3)
-                            ],className="row flex-display",style={'width': '98%'}),
-                        #fourth row of sectoral form
-                        html.Div(children=[generate_form_eval_sector(i+9) for i in np.arange(3)
-                            ],className="row flex-display",style={'width': '98%'}),
-                        #fifth row of sectoral form
-                        html.Div(children=[generate_form_eval_sector(i+12) for i in np.arange(3)
-                            ],className="row flex-display",style={'width': '98%'}),
-                        #sixth row of sectoral form
-                        html.Div(children=[generate_form_eval_sector(i+15) for i in np.arange(3)
-                            ],className="row flex-display",style={'width': '98%'}),
-                        ],id="economic-sector-channeling-predictors3",
-                        className="pretty_container",
-                        style={"margin-bottom": "25px"}
-                        ), #end of sectoral div form
+                        html.Div([#start of baseline period div
+                            html.H5("Periode Pembanding Rata-rata Persentase NPL", style={"font-weight":"bold"}),
+                            dcc.RangeSlider(
+                                id='baseline-year-slider',
+                                min=df['Tahun'].min(),
+                                max=df['Tahun'].max(),
+                                value=initial_fields["baseline-year-slider"],
+                                marks=year_marks,
+                                step=None
+                                ),
+                            html.Br()
+                            ],className="pretty_container"),#end of baseline period div
+
+                        html.Div([ #start of sectoral form div
+                            html.Div([ #row div
+                                html.Div([
+                                    html.H5("Nilai Penyaluran dan Proyeksi NPL Kredit UMKM per Sektor Ekonomi", style={"font-weight":"bold"}),                                
+                                    ], className="twelve columns"),
+                                ],className="row flex-display"),#end of row div for title
+                            #first row div for sectoral form
+                            html.Div(children=[generate_form_eval_sector(i) for i in np.arange(3)
+                                ],className="row flex-display",style={'width': '98%'}),
+                            #second row of sectoral form
+                            html.Div(children=[generate_form_eval_sector(i+3) for i in np.arange(3)
+                                ],className="row flex-display",style={'width': '98%'}),
+                            #third row of sectoral form
+                            html.Div(children=[generate_form_eval_sector(i+6) for i in np.arange(3)
+                                ],className="row flex-display",style={'width': '98%'}),
+                            #fourth row of sectoral form
+                            html.Div(children=[generate_form_eval_sector(i+9) for i in np.arange(3)
+                                ],className="row flex-display",style={'width': '98%'}),
+                            #fifth row of sectoral form
+                            html.Div(children=[generate_form_eval_sector(i+12) for i in np.arange(3)
+                                ],className="row flex-display",style={'width': '98%'}),
+                            #sixth row of sectoral form
+                            html.Div(children=[generate_form_eval_sector(i+15) for i in np.arange(3)
+                                ],className="row flex-display",style={'width': '98%'}),
+                            ],id="economic-sector-channeling-predictors3",
+                            className="pretty_container",
+                            style={"margin-bottom": "25px"}
+                            ), #end of sectoral div form
                     
-                    ]),#end of second tab
-                #######################tab limit#####################
-                dcc.Tab(label='Penganggaran IJP dan Loss Limit', children=[
+                        ]),#end of second tab
+                    #######################tab limit#####################
+                    dcc.Tab(label='Penganggaran IJP dan Loss Limit', children=[
                                         
-                    html.Div([ #start of total channeling and NPL row div
-                        html.Div([ #start of column div for total SME Credit channeling
-                            html.H5("Total Penyaluran Kredit UMKM", style={'font-weight':'bold'}),
-                            html.H4(id ="total_credit", style={'font-weight':'bold', 'font-size':'36px'}),
-                            ], className="pretty_container six columns",
-                            style={'text-align':'center','background-color':'#fff', 'border-top':'6px solid #fd7e14'}
-                            ),#end of column div for total SME credit channeling
-                        html.Div([ #start of column div for total NPL Projection
-                            html.H5("Proyeksi Total NPL Kredit UMKM", style={'font-weight':'bold'}),
-                            html.H1(id ="total_NPL", style={'font-weight':'bold', 'font-size':'44px'}),
-                            html.P(id="total_NPL_val")
-                            ], className="pretty_container six columns",
-                            style={'text-align':'center','background-color':'#fff', 'border-top':'6px solid #ffc107'}
-                            )#end of column div for total NPL projection
-                        ], className="row flex-display"), #end of total channeling and NPL row div
+                        html.Div([ #start of total channeling and NPL row div
+                            html.Div([ #start of column div for total SME Credit channeling
+                                html.H5("Total Penyaluran Kredit UMKM", style={'font-weight':'bold'}),
+                                html.H4(id ="total_credit", style={'font-weight':'bold', 'font-size':'36px'}),
+                                ], className="pretty_container six columns",
+                                style={'text-align':'center','background-color':'#fff', 'border-top':'6px solid #fd7e14'}
+                                ),#end of column div for total SME credit channeling
+                            html.Div([ #start of column div for total NPL Projection
+                                html.H5("Proyeksi Total NPL Kredit UMKM", style={'font-weight':'bold'}),
+                                html.H1(id ="total_NPL", style={'font-weight':'bold', 'font-size':'44px'}),
+                                html.P(id="total_NPL_val")
+                                ], className="pretty_container six columns",
+                                style={'text-align':'center','background-color':'#fff', 'border-top':'6px solid #ffc107'}
+                                )#end of column div for total NPL projection
+                            ], className="row flex-display"), #end of total channeling and NPL row div
                     
-                    html.Div([ #start of budgeting row div
-                        html.Div([ #start of column div for IJP tarif
-                            html.H5("Tarif IJP Kredit UMKM", style={'font-weight':'bold'}),
-                            html.H1(id ="IJP_tarif", style={'font-weight':'bold', 'font-size':'44px'}),
-                            html.P(id="IJP_tarif_exp")
-                            ], className="pretty_container four columns",
-                            style={'text-align':'center','background-color':'#fff', 'border-top':'6px solid #007bff'}
-                            ),#end of column div for IJP tarif
-                        html.Div([ #start of column div for IJP budget
-                            html.H5("Anggaran IJP", style={'font-weight':'bold'}),
-                            html.H4(id ="IJP_budget", style={'font-weight':'bold', 'font-size':'32px'}),
-                            ], className="pretty_container four columns",
-                            style={'text-align':'center','background-color':'#fff', 'border-top':'6px solid #6610f2'}
-                            ),#end of column div for IJP budget
-                        html.Div([ #start of column div for loss limit budget
-                            html.H5("Anggaran Loss Limit", style={'font-weight':'bold'}),
-                            html.H4(id ="loss_limit_budget", style={'font-weight':'bold', 'font-size':'32px'}),
-                            ], className="pretty_container four columns",
-                            style={'text-align':'center','background-color':'#fff', 'border-top':'6px solid #6f42c1'}
-                            ),#end of column div for loss limit budget
-                        ], className="row flex-display"), #end of budgeting row div
-
-                    html.Div([#start of macroeconomic vars
-                        html.H5("Indikator Makro Ekonomi", style={"font-weight":"bold"}),
-                        html.Div([ #row div of macro vars
-                            html.Div([ #pertumbuhan ekonomi div start
-                                html.H5("Pertumbuhan Ekonomi", style={"font-weight":"bold", "color":"#fff"}),
-                                dcc.Input(
-                                    id="EconGrowth",
-                                    type="number",
-                                    value=row_take['EconGrowth'].values[0],
-                                    debounce=True
-                                    ),
-                                ],className="pretty_container four columns",style={"background-color":"#111"}),
-                            html.Div([ #inflasi div start
-                                html.H5("Tingkat Inflasi", style={"font-weight":"bold", "color":"#fff"}),
-                                dcc.Input(
-                                    id="Inflasi",
-                                    type="number",
-                                    value=row_take['Inflasi'].values[0],
-                                    debounce=True
-                                    ),
-                                ],className="pretty_container four columns",style={"background-color":"#111"}),
-                            html.Div([ #pengangguran div start
-                                html.H5("Tingkat Pengangguran", style={"font-weight":"bold", "color":"#fff"}),
-                                dcc.Input(
-                                    id="Unemployment",
-                                    type="number",
-                                    value=row_take['Unemployment'].values[0],
-                                    debounce=True
-                                    ),
-                                ],className="pretty_container four columns",style={"background-color":"#111"})
-                            ],className="row flex-display") #end of macro vars row div
-                        ],className="pretty_container"),#end of macroeconomic var div                    
+                        html.Div([ #start of budgeting row div
+                            html.Div([ #start of column div for IJP tarif
+                                html.H5("Tarif IJP Kredit UMKM", style={'font-weight':'bold'}),
+                                html.H1(id ="IJP_tarif", style={'font-weight':'bold', 'font-size':'44px'}),
+                                html.P(id="IJP_tarif_exp")
+                                ], className="pretty_container four columns",
+                                style={'text-align':'center','background-color':'#fff', 'border-top':'6px solid #007bff'}
+                                ),#end of column div for IJP tarif
+                            html.Div([ #start of column div for IJP budget
+                                html.H5("Anggaran IJP", style={'font-weight':'bold'}),
+                                html.H4(id ="IJP_budget", style={'font-weight':'bold', 'font-size':'32px'}),
+                                ], className="pretty_container four columns",
+                                style={'text-align':'center','background-color':'#fff', 'border-top':'6px solid #6610f2'}
+                                ),#end of column div for IJP budget
+                            html.Div([ #start of column div for loss limit budget
+                                html.H5("Anggaran Loss Limit", style={'font-weight':'bold'}),
+                                html.H4(id ="loss_limit_budget", style={'font-weight':'bold', 'font-size':'32px'}),
+                                ], className="pretty_container four columns",
+                                style={'text-align':'center','background-color':'#fff', 'border-top':'6px solid #6f42c1'}
+                                ),#end of column div for loss limit budget
+                            ], className="row flex-display"), #end of budgeting row div
 
-                    html.Div([ #start of sectoral form div
-                        html.Div([ #row div
+                        html.Div([ #start of scenario link div
+                            html.P(["Tautan skenario: ", html.A(id="scenario_link")])
+                            ], className="pretty_container"), #end of scenario link div
+
+                        html.Div([ #start of prediction explanation div
+                            html.H5("Kontribusi Faktor terhadap Proyeksi NPL Sektor", style={"font-weight":"bold"}),
                             html.Div([
-                                html.H5("Nilai Penyaluran dan Proyeksi NPL Kredit UMKM per Sektor Ekonomi", style={"font-weight":"bold"}),                                
-                                ], className="twelve columns"),
-                            ],className="row flex-display"),#end of row div for title
-                        #first row div for sectoral form
-                        html.Div(children=[generate_form(i) for i in np.arange(3)
-                            ],className="row flex-display",style={'width': '98%'}),
-                        #second row of sectoral form
-                        html.Div(children=[generate_form(i+3) for i in np.arange(3)
-                            ],className="row flex-display",style={'width': '98%'}),
-                        #third row of sectoral form
-                        html.Div(children=[generate_form(i+6) for i in np.arange(3)
-                            ],className="row flex-display",style={'width': '98%'}),
-                        #fourth row of sectoral form
-                        html.Div(children=[generate_form(i+9) for i in np.arange(3)
-                            ],className="row flex-display",style={'width': '98%'}),
-                        #fifth row of sectoral form
-                        html.Div(children=[generate_form(i+12) for i in np.arange(3)
-                            ],className="row flex-display",style={'width': '98%'}),
-                        #sixth row of sectoral form
-                        html.Div(children=[generate_form(i+15) for i in np.arange(3)
-                            ],className="row flex-display",style={'width': '98%'}),
-                        ],id="economic-sector-channeling-predictors",
-                        className="pretty_container",
-                        style={"margin-bottom": "25px"}
-                        ), #end of sectoral div form
-
-                    ]),#end of third tab
-                #######################tab limit#####################
-                dcc.Tab(label='Evaluasi Tarif IJP', children=[
-
-                    html.Div([ #start of total channeling and NPL row div
-                        html.Div([ #start of column div for total SME Credit channeling
-                            html.H5("Total Penyaluran Kredit UMKM", style={'font-weight':'bold'}),
-                            html.H4(id ="total_credit2", style={'font-weight':'bold', 'font-size':'28px'}),
-                            ], className="pretty_container four columns",
-                            style={'text-align':'center','background-color':'#fff', 'border-top':'6px solid #007bff'}
-                            ),#end of column div for total SME credit channeling
-                        html.Div([ #start of column div for total NPL Projection
-                            html.H5("Proyeksi Total NPL Kredit UMKM", style={'font-weight':'bold'}),
-                            html.H1(id ="total_NPL2", style={'font-weight':'bold', 'font-size':'44px'}),
-                            html.P(id="total_NPL_val2")
-                            ], className="pretty_container four columns",
-                            style={'text-align':'center','background-color':'#fff', 'border-top':'6px solid #6610f2'}
-                            ),#end of column div for total NPL projection
-                        html.Div([ #start of column div for IJP tarif
-                            html.H5("Tarif IJP Kredit UMKM", style={'font-weight':'bold'}),
-                            html.H1(id ="IJP_tarif2", style={'font-weight':'bold', 'font-size':'44px'}),
-                            html.P(id="IJP_tarif_exp2")
-                            ], className="pretty_container four columns",
-                            style={'text-align':'center','background-color':'#fff', 'border-top':'6px solid #6f42c1'}
-                            )#end of column div for IJP tarif
-                        ], className="row flex-display"), #end of total channeling and NPL row div
+                                dcc.Dropdown(
+                                    id='explain-sector-selector',
+                                    options=[{'label': i, 'value': i} for i in econSector],
+                                    value='Perdagangan Besar dan Eceran'
+                                    )
+                                ],style={'width': '48%'}),
+                            dcc.Graph(id='explain-graph',
+                                      style={'height':450})
+                            ],className="pretty_container",style={'background-color':'#fff'}), #end of prediction explanation div
+
+                        html.Div([#start of macroeconomic vars
+                            html.H5("Indikator Makro Ekonomi", style={"font-weight":"bold"}),
+                            html.Div([ #row div of macro vars
+                                html.Div([ #pertumbuhan ekonomi div start
+                                    html.H5("Pertumbuhan Ekonomi", style={"font-weight":"bold", "color":"#fff"}),
+                                    dcc.Input(
+                                        id="EconGrowth",
+                                        type="number",
+                                        value=initial_fields["EconGrowth"],
+                                        debounce=True
+                                        ),
+                                    ],className="pretty_container four columns",style={"background-color":"#111"}),
+                                html.Div([ #inflasi div start
+                                    html.H5("Tingkat Inflasi", style={"font-weight":"bold", "color":"#fff"}),
+                                    dcc.Input(
+                                        id="Inflasi",
+                                        type="number",
+                                        value=initial_fields["Inflasi"],
+                                        debounce=True
+                                        ),
+                                    ],className="pretty_container four columns",style={"background-color":"#111"}),
+                                html.Div([ #pengangguran div start
+                                    html.H5("Tingkat Pengangguran", style={"font-weight":"bold", "color":"#fff"}),
+                                    dcc.Input(
+                                        id="Unemployment",
+                                        type="number",
+                                        value=initial_fields["Unemployment"],
+                                        debounce=True
+                                        ),
+                                    ],className="pretty_container four columns",style={"background-color":"#111"})
+                                ],className="row flex-display") #end of macro vars row div
+                            ],className="pretty_container"),#end of macroeconomic var div                    
+
+                        html.Div([ #start of sectoral form div
+                            html.Div([ #row div
+                                html.Div([
+                                    html.H5("Nilai Penyaluran dan Proyeksi NPL Kredit UMKM per Sektor Ekonomi", style={"font-weight":"bold"}),                                
+                                    ], className="twelve columns"),
+                                ],className="row flex-display"),#end of row div for title
+                            #first row div for sectoral form
+                            html.Div(children=[generate_form(i) for i in np.arange(3)
+                                ],className="row flex-display",style={'width': '98%'}),
+                            #second row of sectoral form
+                            html.Div(children=[generate_form(i+3) for i in np.arange(3)
+                                ],className="row flex-display",style={'width': '98%'}),
+                            #third row of sectoral form
+                            html.Div(children=[generate_form(i+6) for i in np.arange(3)
+                                ],className="row flex-display",style={'width': '98%'}),
+                            #fourth row of sectoral form
+                            html.Div(children=[generate_form(i+9) for i in np.arange(3)
+                                ],className="row flex-display",style={'width': '98%'}),
+                            #fifth row of sectoral form
+                            html.Div(children=[generate_form(i+12) for i in np.arange(3)
+                                ],className="row flex-display",style={'width': '98%'}),
+                            #sixth row of sectoral form
+                            html.Div(children=[generate_form(i+15) for i in np.arange(3)
+                                ],className="row flex-display",style={'width': '98%'}),
+                            ],id="economic-sector-channeling-predictors",
+                            className="pretty_container",
+                            style={"margin-bottom": "25px"}
+                            ), #end of sectoral div form
+
+                        ]),#end of third tab
+                    #######################tab limit#####################
+                    dcc.Tab(label='Evaluasi Tarif IJP', children=[
+
+                        html.Div([ #start of total channeling and NPL row div
+                            html.Div([ #start of column div for total SME Credit channeling
+                                html.H5("Total Penyaluran Kredit UMKM", style={'font-weight':'bold'}),
+                                html.H4(id ="total_credit2", style={'font-weight':'bold', 'font-size':'28px'}),
+                                ], className="pretty_container four columns",
+                                style={'text-align':'center','background-color':'#fff', 'border-top':'6px solid #007bff'}
+                                ),#end of column div for total SME credit channeling
+                            html.Div([ #start of column div for total NPL Projection
+                                html.H5("Proyeksi Total NPL Kredit UMKM", style={'font-weight':'bold'}),
+                                html.H1(id ="total_NPL2", style={'font-weight':'bold', 'font-size':'44px'}),
+                                html.P(id="total_NPL_val2")
+                                ], className="pretty_container four columns",
+                                style={'text-align':'center','background-color':'#fff', 'border-top':'6px solid #6610f2'}
+                                ),#end of column div for total NPL projection
+                            html.Div([ #start of column div for IJP tarif
+                                html.H5("Tarif IJP Kredit UMKM", style={'font-weight':'bold'}),
+                                html.H1(id ="IJP_tarif2", style={'font-weight':'bold', 'font-size':'44px'}),
+                                html.P(id="IJP_tarif_exp2")
+                                ], className="pretty_container four columns",
+                                style={'text-align':'center','background-color':'#fff', 'border-top':'6px solid #6f42c1'}
+                                )#end of column div for IJP tarif
+                            ], className="row flex-display"), #end of total channeling and NPL row div
                     
-                    html.Div([#start of macroeconomic vars
-                        html.H5("Indikator Makro Ekonomi", style={"font-weight":"bold"}),
-                        html.Div([ #row div of macro vars
-                            html.Div([ #pertumbuhan ekonomi div start
-                                html.H5("Pertumbuhan Ekonomi", style={"font-weight":"bold", "color":"#fff"}),
-                                dcc.Input(
-                                    id="EconGrowth2",
-                                    type="number",
-                                    value=row_take['EconGrowth'].values[0],
-                                    debounce=True
-                                    ),
-                                ],className="pretty_container four columns",style={"background-color":"#111"}),
-                            html.Div([ #inflasi div start
-                                html.H5("Tingkat Inflasi", style={"font-weight":"bold", "color":"#fff"}),
-                                dcc.Input(
-                                    id="Inflasi2",
-                                    type="number",
-                                    value=row_take['Inflasi'].values[0],
-                                    debounce=True
-                                    ),
-                                ],className="pretty_container four columns",style={"background-color":"#111"}),
-                            html.Div([ #pengangguran div start
-                                html.H5("Tingkat Pengangguran", style={"font-weight":"bold", "color":"#fff"}),
-                                dcc.Input(
-                                    id="Unemployment2",
-                                    type="number",
-                                    value=row_take['Unemployment'].values[0],
-                                    debounce=True
-                                    ),
-                                ],className="pretty_container four columns",style={"background-color":"#111"})
-                            ],className="row flex-display") #end of macro vars row div
-                        ],className="pretty_container"),#end of macroeconomic var div                    
+                        html.Div([#start of macroeconomic vars
+                            html.H5("Indikator Makro Ekonomi", style={"font-weight":"bold"}),
+                            html.Div([ #row div of macro vars
+                                html.Div([ #pertumbuhan ekonomi div start
+                                    html.H5("Pertumbuhan Ekonomi", style={"font-weight":"bold", "color":"#fff"}),
+                                    dcc.Input(
+                                        id="EconGrowth2",
+                                        type="number",
+                                        value=initial_fields["EconGrowth2"],
+                                        debounce=True
+                                        ),
+                                    ],className="pretty_container four columns",style={"background-color":"#111"}),
+                                html.Div([ #inflasi div start
+                                    html.H5("Tingkat Inflasi", style={"font-weight":"bold", "color":"#fff"}),
+                                    dcc.Input(
+                                        id="Inflasi2",
+                                        type="number",
+                                        value=initial_fields["Inflasi2"],
+                                        debounce=True
+                                        ),
+                                    ],className="pretty_container four columns",style={"background-color":"#111"}),
+                                html.Div([ #pengangguran div start
+                                    html.H5("Tingkat Pengangguran", style={"font-weight":"bold", "color":"#fff"}),
+                                    dcc.Input(
+                                        id="Unemployment2",
+                                        type="number",
+                                        value=initial_fields["Unemployment2"],
+                                        debounce=True
+                                        ),
+                                    ],className="pretty_container four columns",style={"background-color":"#111"})
+                                ],className="row flex-display") #end of macro vars row div
+                            ],className="pretty_container"),#end of macroeconomic var div                    
 
-                    html.Div([ #start of sectoral form div
-                        html.Div([ #row div
-                            html.Div([
-                                html.H5("Nilai Penyaluran dan Proyeksi NPL Kredit UMKM per Sektor Ekonomi", style={"font-weight":"bold"}),                                
-                                ], className="twelve columns"),
-                            ],className="row flex-display"),#end of row div for title
-                        #first row div for sectoral form
-                        html.Div(children=[generate_form_eval_IJP(i) for i in np.arange(3)
-                            ],className="row flex-display",style={'width': '98%'}),
-                        #second row of sectoral form
-                        html.Div(children=[generate_form_eval_IJP(i+3) for i in np.arange(3)
-                            ],className="row flex-display",style={'width': '98%'}),
-                        #third row of sectoral form
-                        html.Div(children=[generate_form_eval_IJP(i+6) for i in np.arange(3)
-                            ],className="row flex-display",style={'width': '98%'}),
-                        #fourth row of sectoral form
-                        html.Div(children=[generate_form_eval_IJP(i+9) for i in np.arange(3)
-                            ],className="row flex-display",style={'width': '98%'}),
-                        #fifth row of sectoral form
-                        html.Div(children=[generate_form_eval_IJP(i+12) for i in np.arange(3)
-                            ],className="row flex-display",style={'width': '98%'}),
-                        #sixth row of sectoral form
-                        html.Div(children=[generate_form_eval_IJP(i+15) for i in np.arange(3)
-                            ],className="row flex-display",style={'width': '98%'}),
-                        ],id="economic-sector-channeling-predictors2",
-                        className="pretty_container",
-                        style={"margin-bottom": "25px"}
-                        ), #end of sectoral div form
+                        html.Div([ #start of sectoral form div
+                            html.Div([ #row div
+                                html.Div([
+                                    html.H5("Nilai Penyaluran dan Proyeksi NPL Kredit UMKM per Sektor Ekonomi", style={"font-weight":"bold"}),                                
+                                    ], className="twelve columns"),
+                                ],className="row flex-display"),#end of row div for title
+                            #first row div for sectoral form
+                            html.Div(children=[generate_form_eval_IJP(i) for i in np.arange(3)
+                                ],className="row flex-display",style={'width': '98%'}),
+                            #second row of sectoral form
+                            html.Div(children=[generate_form_eval_IJP(i+3) for i in np.arange(3)
+                                ],className="row flex-display",style={'width': '98%'}),
+                            #third row of sectoral form
+                            html.Div(children=[generate_form_eval_IJP(i+6) for i in np.arange(3)
+                                ],className="row flex-display",style={'width': '98%'}),
+                            #fourth row of sectoral form
+                            html.Div(children=[generate_form_eval_IJP(i+9) for i in np.arange(3)
+                                ],className="row flex-display",style={'width': '98%'}),
+                            #fifth row of sectoral form
+                            html.Div(children=[generate_form_eval_IJP(i+12) for i in np.arange(3)
+                                ],className="row flex-display",style={'width': '98%'}),
+                            #sixth row of sectoral form
+                            html.Div(children=[generate_form_eval_IJP(i+15) for i in np.arange(3)
+                                ],className="row flex-display",style={'width': '98%'}),
+                            ],id="economic-sector-channeling-predictors2",
+                            className="pretty_container",
+                            style={"margin-bottom": "25px"}
+                            ), #end of sectoral div form
                     
-                    ]),#end of fourth tab
-                #######################tab limit#####################
-                ])
-            ]
-        ), #end of main div
-    html.Div([
-        html.P("© 2020 - Inspektorat Jenderal Kementerian Keuangan", style={"font-weight":"bold"})
-        ],className="pretty_container", style={'text-align':'center'})
-        ]) #end of app.layout
-    
+                        ]),#end of fourth tab
+                    #######################tab limit#####################
+                    dcc.Tab(label='Evaluasi Model', children=[
+
+                        html.Div([ #start of backtest actual vs predicted div
+                            html.H5("Perbandingan NPL Aktual dan Prediksi Model Tahun 2011-2020", style={"font-weight":"bold"}),
+                            html.Div([
+                                dcc.Dropdown(
+                                    id='backtest-sector-selector',
+                                    options=[{'label': i, 'value': i} for i in econSector],
+                                    value='Perdagangan Besar dan Eceran'
+                                    )
+                                ],style={'width': '48%'}),
+                            dcc.Graph(id='backtest-graph',
+                                      style={'height':500}),
+                            dcc.Graph(id='backtest-year-error-graph',
+                                      style={'height':400})
+                            ],className="pretty_container",style={'background-color':'#fff'}),
+
+                        html.Div([ #start of backtest error per sector div
+                            html.H5("Rata-rata Galat Absolut Prediksi per Sektor Ekonomi", style={"font-weight":"bold"}),
+                            dcc.Graph(id='backtest-sector-error-graph',
+                                      figure=go.Figure(go.Bar(
+                                          x=backtest['by_sector']['MAE']*100,
+                                          y=econSector,
+                                          orientation='h')),
+                                      style={'height':600})
+                            ],className="pretty_container"),
+
+                        ]),#end of fifth tab
+                    #######################tab limit#####################
+                    dcc.Tab(label='Optimasi Alokasi Kredit', children=[
+
+                        html.Div([#start of macroeconomic vars
+                            html.H5("Indikator Makro Ekonomi", style={"font-weight":"bold"}),
+                            html.Div([ #row div of macro vars
+                                html.Div([ #pertumbuhan ekonomi div start
+                                    html.H5("Pertumbuhan Ekonomi", style={"font-weight":"bold", "color":"#fff"}),
+                                    dcc.Input(
+                                        id="EconGrowth4",
+                                        type="number",
+                                        value=row_take['EconGrowth'].values[0],
+                                        debounce=True
+                                        ),
+                                    ],className="pretty_container four columns",style={"background-color":"#111"}),
+                                html.Div([ #inflasi div start
+                                    html.H5("Tingkat Inflasi", style={"font-weight":"bold", "color":"#fff"}),
+                                    dcc.Input(
+                                        id="Inflasi4",
+                                        type="number",
+                                        value=row_take['Inflasi'].values[0],
+                                        debounce=True
+                                        ),
+                                    ],className="pretty_container four columns",style={"background-color":"#111"}),
+                                html.Div([ #pengangguran div start
+                                    html.H5("Tingkat Pengangguran", style={"font-weight":"bold", "color":"#fff"}),
+                                    dcc.Input(
+                                        id="Unemployment4",
+                                        type="number",
+                                        value=row_take['Unemployment'].values[0],
+                                        debounce=True
+                                        ),
+                                    ],className="pretty_container four columns",style={"background-color":"#111"})
+                                ],className="row flex-display") #end of macro vars row div
+                            ],className="pretty_container"),#end of macroeconomic var div
+
+                        html.Div([ #start of optimizer parameter div
+                            html.H5("Parameter Optimasi", style={"font-weight":"bold"}),
+                            html.Div([ #row div of parameters
+                                html.Div([
+                                    html.P("Total Penyaluran Kredit (Rp)"),
+                                    dcc.Input(id="opt_total_credit", type="number", value=default_result['total_credit'], debounce=True),
+                                    ],className="three columns"),
+                                html.Div([
+                                    html.P("Batas Anggaran IJP dan Loss Limit (Rp)"),
+                                    dcc.Input(id="opt_budget", type="number",
+                                              value=default_result['ijp_budget']+default_result['loss_limit_budget'], debounce=True),
+                                    ],className="three columns"),
+                                html.Div([
+                                    html.P("Batas Bawah/Atas per Sektor (% alokasi Juni 2020)"),
+                                    dcc.Input(id="opt_lower", type="number", value=50, debounce=True, style={'width':'45%'}),
+                                    dcc.Input(id="opt_upper", type="number", value=150, debounce=True, style={'width':'45%'}),
+                                    ],className="three columns"),
+                                html.Div([
+                                    html.P("Minimalkan"),
+                                    dcc.RadioItems(
+                                        id='opt_objective',
+                                        options=[{'label': 'Total NPL', 'value': 'npl'}, {'label': 'Anggaran IJP per sektor', 'value': 'ijp'}],
+                                        value='npl',
+                                        labelStyle={'display': 'inline-block'}
+                                        ),
+                                    html.Button("Optimasi", id="opt_run", n_clicks=0),
+                                    ],className="three columns"),
+                                ],className="row flex-display")
+                            ],className="pretty_container"),#end of optimizer parameter div
+
+                        dcc.Loading(html.Div([ #start of optimizer result div
+                            html.Div([
+                                html.H5("Proyeksi Total NPL Kredit UMKM", style={'font-weight':'bold'}),
+                                html.H1(id="opt_total_NPL", style={'font-weight':'bold', 'font-size':'44px'}),
+                                ], className="pretty_container four columns",
+                                style={'text-align':'center','background-color':'#fff', 'border-top':'6px solid #007bff'}),
+                            html.Div([
+                                html.H5("Anggaran IJP dan Loss Limit", id="opt_cost_label", style={'font-weight':'bold'}),
+                                html.H4(id="opt_cost", style={'font-weight':'bold', 'font-size':'32px'}),
+                                ], className="pretty_container four columns",
+                                style={'text-align':'center','background-color':'#fff', 'border-top':'6px solid #6610f2'}),
+                            html.Div([
+                                html.H5("Status", style={'font-weight':'bold'}),
+                                html.P(id="opt_status"),
+                                ], className="pretty_container four columns",
+                                style={'text-align':'center','background-color':'#fff', 'border-top':'6px solid #6f42c1'}),
+                            ], className="row flex-display")), #end of optimizer result div
+
+                        html.Div([ #start of allocation graph div
+                            dcc.Graph(id='opt_allocation_graph', style={'height':600})
+                            ],className="pretty_container"),
+
+                        ]),#end of sixth tab
+                    #######################tab limit#####################
+                    dcc.Tab(label='Proyeksi Bulanan', children=[
+
+                        html.Div([ #start of projection chart div
+                            html.H5("Proyeksi Persentase NPL Bulanan hingga Akhir Tahun Penjaminan", style={"font-weight":"bold"}),
+                            html.Div([
+                                dcc.Dropdown(
+                                    id='projection-sector-selector',
+                                    options=[{'label': 'Total Seluruh Sektor', 'value': 'Total'}]+[{'label': i, 'value': i} for i in econSector],
+                                    value='Total'
+                                    )
+                                ],style={'width': '48%'}),
+                            dcc.Graph(id='projection-graph', style={'height':500})
+                            ],className="pretty_container",style={'background-color':'#fff'}),
+
+                        html.Div([#start of macroeconomic path
+                            html.H5("Lintasan Indikator Makro Ekonomi per Bulan ({} - {}), dipisahkan koma".format(projection_periods[0], projection_periods[-1]), style={"font-weight":"bold"}),
+                            html.Div([ #row div of macro paths
+                                html.Div([
+                                    html.H5("Pertumbuhan Ekonomi", style={"font-weight":"bold", "color":"#fff"}),
+                                    dcc.Input(
+                                        id="EconGrowth_path",
+                                        type="text",
+                                        value=", ".join(["{:g}".format(row_take['EconGrowth'].values[0])]*len(projection_periods)),
+                                        debounce=True,
+                                        style={'width':'100%'}
+                                        ),
+                                    ],className="pretty_container four columns",style={"background-color":"#111"}),
+                                html.Div([
+                                    html.H5("Tingkat Inflasi", style={"font-weight":"bold", "color":"#fff"}),
+                                    dcc.Input(
+                                        id="Inflasi_path",
+                                        type="text",
+                                        value=", ".join(["{:g}".format(row_take['Inflasi'].values[0])]*len(projection_periods)),
+                                        debounce=True,
+                                        style={'width':'100%'}
+                                        ),
+                                    ],className="pretty_container four columns",style={"background-color":"#111"}),
+                                html.Div([
+                                    html.H5("Tingkat Pengangguran", style={"font-weight":"bold", "color":"#fff"}),
+                                    dcc.Input(
+                                        id="Unemployment_path",
+                                        type="text",
+                                        value=", ".join(["{:g}".format(row_take['Unemployment'].values[0])]*len(projection_periods)),
+                                        debounce=True,
+                                        style={'width':'100%'}
+                                        ),
+                                    ],className="pretty_container four columns",style={"background-color":"#111"}),
+                                ],className="row flex-display") #end of macro paths row div
+                            ],className="pretty_container"),#end of macroeconomic path div
+
+                        html.Div([ #start of credit growth form div
+                            html.H5("Asumsi Pertumbuhan Penyaluran Kredit per Bulan (%)", style={"font-weight":"bold"}),
+                            html.Div(children=[generate_growth_form(i) for i in np.arange(6)
+                                ],className="row flex-display",style={'width': '98%'}),
+                            html.Div(children=[generate_growth_form(i+6) for i in np.arange(6)
+                                ],className="row flex-display",style={'width': '98%'}),
+                            html.Div(children=[generate_growth_form(i+12) for i in np.arange(6)
+                                ],className="row flex-display",style={'width': '98%'}),
+                            ],className="pretty_container"), #end of credit growth form div
+
+                        ]),#end of seventh tab
+                    #######################tab limit#####################
+                    ])
+                ]
+            ), #end of main div
+        html.Div([
+            html.P("© 2020 - Inspektorat Jenderal Kementerian Keuangan", style={"font-weight":"bold"})
+            ],className="pretty_container", style={'text-align':'center'})
+            ]) #end of app.layout
+
 @app.callback(
     Output('channel-graph-with-slider', 'figure'),
     [Input('year-slider', 'value'),Input('econ-sector-selector', 'value')])
 def update_figure(selected_year,sektor):
-    prefiltered_df = df[df.Tahun == selected_year]
-    filtered_df = prefiltered_df[prefiltered_df.SektorEkonomi == sektor]
+    filtered_df = aggregate(DATA_FILE, by='Bulan', filters={'Tahun': selected_year, 'SektorEkonomi': sektor})
 
     fig = go.Figure()
     
@@ -610,8 +929,7 @@ def update_figure(selected_year,sektor):
     Output('channel-graph-with-slider-2', 'figure'),
     [Input('year-slider', 'value'),Input('econ-sector-selector', 'value')])
 def update_figure2(selected_year,sektor):
-    prefiltered_df = df[df.Tahun == selected_year]
-    filtered_df = prefiltered_df[prefiltered_df.SektorEkonomi == sektor]
+    filtered_df = aggregate(DATA_FILE, by='Bulan', filters={'Tahun': selected_year, 'SektorEkonomi': sektor})
     
     fig = go.Figure(data=go.Scatter(x=monthCode, y=filtered_df['percentNPL']*100))
 
@@ -621,14 +939,56 @@ def update_figure2(selected_year,sektor):
 
     return fig
 
+#visible x range of a relayout event, (None, None) when the axis was reset and None when the
+#event did not touch the x axis (y zoom, resize)
+def relayout_range(relayout):
+    relayout = relayout or {}
+    if 'xaxis.range[0]' in relayout:
+        lo, hi = relayout['xaxis.range[0]'], relayout['xaxis.range[1]']
+    elif 'xaxis.range' in relayout:
+        lo, hi = relayout['xaxis.range']
+    elif relayout.get('xaxis.autorange'):
+        return None, None
+    else:
+        return None
+    return lo, hi
+
+@app.callback(
+    Output('history-graph', 'figure'),
+    [Input('history-measure', 'value'), Input('history-sector-selector', 'value'), Input('history-graph', 'relayoutData')])
+def update_history(measure, sectors, relayout):
+    #zooming re-queries the visible range, so every trace stays within downsample.MAX_POINTS
+    #points however long the series grow
+    visible = relayout_range(relayout)
+    triggered = [t['prop_id'] for t in dash.callback_context.triggered]
+    if visible is None:
+        if triggered == ['history-graph.relayoutData']:
+            raise PreventUpdate
+        visible = (None, None)
+
+    rows = [econSector.index(sektor) for sektor in sectors or []]
+    values = history_series[measure][rows] * (100 if measure == 'percentNPL' else 1)
+    x0, x1 = [None if x is None else pd.Timestamp(x).value for x in visible]
+    kept = downsample(history_ns, values, x0=x0, x1=x1)
+
+    fig = go.Figure()
+    fig.add_traces([go.Scattergl(x=history_x[kept[j]], y=values[j, kept[j]], mode='lines', name=econSector[i])
+                    for j, i in enumerate(rows)])
+
+    #keep the user's zoom and legend selection across updates
+    fig.update_layout(uirevision='history', legend=dict(font=dict(size=10)))
+    if x0 is not None:
+        fig.update_xaxes(range=list(visible))
+    fig.layout.update({'title': 'Persentase NPL' if measure == 'percentNPL' else 'Rp Miliar'})
+    return fig
+
 @app.callback(
     Output('aggregate-channel-graph-with-slider', 'figure'),
     Output('aggregate-npl-graph-with-slider', 'figure'),
     [Input('aggregate-year-slider', 'value')])
 def update_aggregate2(selected_year):
-    filtered_df = df[df.Tahun == selected_year]
-    summ_df = filtered_df.groupby('Bulan', as_index=False).agg({"valueChannel":"sum"})
-    summ_df2 = filtered_df.groupby('Bulan', as_index=False).agg({"valueNPL":"sum"})
+    summ_df = aggregate(DATA_FILE, by='Bulan', filters={'Tahun': selected_year})
+    summ_df2 = summ_df
     
     
     #initiate figure
@@ -663,420 +1023,517 @@ def update_aggregate2(selected_year):
 @app.callback(
     Output('channel-comparison-graph-with-slider-2', 'figure'),
     [Input('year-slider-3', 'value')])
-def update_figure_comparison(selected_year):
-    prefiltered_df = df[df.Tahun == selected_year]
-    filtered_df = prefiltered_df[prefiltered_df.Bulan=="Jun"]
-
+def update_figure_comparison(selected_years):
     fig = go.Figure(go.Bar(
-            x=filtered_df['percentNPL']*100,
+            x=rollups.range_mean('percentNPL', *selected_years)*100,
             y=econSector,
             orientation='h'))
 
     #chart title and transition
-    fig.layout.update({'title': 'Perbandingan Persentase NPL Antar Sektor Ekonomi Tahun 2011-2020'})
+    fig.layout.update({'title': 'Perbandingan Rata-rata Persentase NPL Antar Sektor Ekonomi Tahun {}-{}'.format(*selected_years)})
     fig.update_layout(transition_duration=500)
     return fig
 
 @app.callback(
     Output('channel-comparison-graph-with-slider', 'figure'),
     [Input('year-slider-2', 'value')])
-def update_figure_comparison2(selected_year):
-    prefiltered_df = df[df.Tahun == selected_year]
-    filtered_df = prefiltered_df[prefiltered_df.Bulan=="Jun"]
+def update_figure_comparison2(selected_years):
+    #average monthly outstanding credit of each sector over the selected years
+    filtered_df = pd.DataFrame({'SektorEkonomi': econSector,
+                                'valueChannel': rollups.range_mean('valueChannel', *selected_years)})
     
+    #only this chart uses plotly express, imported on first use to keep it out of startup
+    import plotly.express as px
     fig = px.pie(filtered_df, values='valueChannel', names='SektorEkonomi', color_discrete_sequence=px.colors.sequential.RdBu)
 
     #chart title and transition
-    fig.layout.update({'title': 'Perbandingan Penyaluran Kredit Antar Sektor Ekonomi'})
+    fig.layout.update({'title': 'Perbandingan Rata-rata Penyaluran Kredit Antar Sektor Ekonomi Tahun {}-{}'.format(*selected_years)})
     fig.update_layout(transition_duration=500)
 
     return fig
 
 @app.callback(
-    [Output("sector_NPL_{}".format(i), "children") for i in np.arange(18)],
-    [Output("sector_NPL_val_{}".format(i), "children") for i in np.arange(18)],
-    Output("total_NPL","children"),
-    Output("total_NPL_val","children"),
-    Output("total_credit","children"),
-    Output("IJP_tarif","children"),
-    Output("IJP_budget","children"),
-    Output("loss_limit_budget","children"),
-    [Input("EconGrowth", "value"),
-    Input("Inflasi", "value"),
-    Input("Unemployment", "value"),
-    Input("sector_form_0", "value"),
-    Input("sector_form_1", "value"),
-    Input("sector_form_2", "value"),
-    Input("sector_form_3", "value"),
-    Input("sector_form_4", "value"),
-    Input("sector_form_5", "value"),
-    Input("sector_form_6", "value"),
-    Input("sector_form_7", "value"),
-    Input("sector_form_8", "value"),
-    Input("sector_form_9", "value"),
-    Input("sector_form_10", "value"),
-    Input("sector_form_11", "value"),
-    Input("sector_form_12", "value"),
-    Input("sector_form_13", "value"),
-    Input("sector_form_14", "value"),
-    Input("sector_form_15", "value"),
-    Input("sector_form_16", "value"),
-    Input("sector_form_17", "value")
-])
-def predict_NPL(EconGrowth,Inflasi,Unemployment,a,b,c,d,e,f,g,h,i,j,k,l,m,n,o,p,q,r):
-    
-    #prediction
-    pred1 = model_rf.predict([[np.log(a),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,1,0,0]])
-    pred2 = model_rf.predict([[np.log(b),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,0,0,0,0,0,1,0,0,0,0]])
-    pred3 = model_rf.predict([[np.log(c),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,0,0,0,0,0,0,1,0,0,0]])
-    pred4 = model_rf.predict([[np.log(d),1,Inflasi,EconGrowth,Unemployment,0,0,1,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0]])
-    pred5 = model_rf.predict([[np.log(e),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,0,1,0,0,0,0,0,0,0,0]])
-    pred6 = model_rf.predict([[np.log(f),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,1,0,0,0,0,0,0,0,0,0]])
-    pred7 = model_rf.predict([[np.log(g),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,0,0,0,0,1,0,0,0,0,0]])
-    pred8 = model_rf.predict([[np.log(h),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,0,0,1,0,0,0,0,0,0,0]])
-    pred9 = model_rf.predict([[np.log(i),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,1]])
-    pred10 = model_rf.predict([[np.log(j),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,0,0,0,1,0,0,0,0,0,0]])
-    pred11 = model_rf.predict([[np.log(k),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,1,0]])
-    pred12 = model_rf.predict([[np.log(l),1,Inflasi,EconGrowth,Unemployment,1,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0]])
-    pred13 = model_rf.predict([[np.log(m),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,1,0,0,0,0,0,0,0,0,0,0,0,0]])
-    pred14 = model_rf.predict([[np.log(n),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,1,0,0,0,0,0,0,0,0,0,0,0,0,0]])
-    pred15 = model_rf.predict([[np.log(o),1,Inflasi,EconGrowth,Unemployment,0,0,0,1,0,0,0,0,0,0,0,0,0,0,0,0,0,0]])
-    pred16 = model_rf.predict([[np.log(p),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,1,0,0,0,0,0,0,0,0,0,0,0]])
-    pred17 = model_rf.predict([[np.log(q),1,Inflasi,EconGrowth,Unemployment,0,1,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0]])
-    pred18 = model_rf.predict([[np.log(r),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,1,0,0,0,0,0,0,0,0,0,0]])
-    
+    Output('backtest-graph', 'figure'),
+    Output('backtest-year-error-graph', 'figure'),
+    [Input('backtest-sector-selector', 'value')])
+def update_backtest(sektor):
+    rows = backtest['rows']
+    filtered_df = rows[rows.SektorEkonomi == sektor]
+    by_year = backtest['by_sector_year']
+    year_df = by_year[by_year.SektorEkonomi == sektor]
+
+    fig = go.Figure()
+    fig.add_traces([
+        go.Scatter(x=filtered_df['period'], y=filtered_df['percentNPL']*100,
+                   marker=dict(color='#404040'), name='NPL Aktual'),
+        go.Scatter(x=filtered_df['period'], y=filtered_df['predNPL']*100,
+                   marker=dict(color='#0099ff'), name='Prediksi Model')])
+    fig.layout.update({'title': 'Persentase NPL Aktual dan Prediksi'})
+
+    fig2 = go.Figure(go.Bar(x=year_df['Tahun'], y=year_df['MAE']*100, marker=dict(color='#6f42c1')))
+    fig2.layout.update({'title': 'Rata-rata Galat Absolut per Tahun (poin persentase)'})
+    return fig, fig2
+
+#identical concurrent scenarios (e.g. the June 2020 defaults of every visitor and every tab)
+#are computed once, and a request whose session has sent newer inputs for the same tab is dropped
+flights = SingleFlight()
+superseded = Supersede()
+
+#everything the scenario tabs show for one input set: projection, totals, budgets and their
+#formatted text, computed and formatted once per process. Identical inputs in several tabs
+#(or browser tabs) cost one computation, other workers read the result from the scenario store
+@functools.lru_cache(maxsize=256)
+def scenario_outputs(EconGrowth, Inflasi, Unemployment, credit_channeling):
+    key, result = scenario_store.load_or_compute(scenario_model, scenario_version,
+                                                 EconGrowth, Inflasi, Unemployment, credit_channeling)
+    percent_NPL_prediction = np.asarray(result['percent_npl'])
+    npl_value = percent_NPL_prediction * np.asarray(credit_channeling, dtype=float)
     pre = "Proyeksi NPL Kredit UMKM untuk sektor ekonomi "
-    
-    #processing sectoral NPL percentage
-    preds1 = "{:,.2f} %".format(pred1[0]*100)
-    preds2 = "{:,.2f} %".format(pred2[0]*100)
-    preds3 = "{:,.2f} %".format(pred3[0]*100)
-    preds4 = "{:,.2f} %".format(pred4[0]*100)
-    preds5 = "{:,.2f} %".format(pred5[0]*100)
-    preds6 = "{:,.2f} %".format(pred6[0]*100)
-    preds7 = "{:,.2f} %".format(pred7[0]*100)
-    preds8 = "{:,.2f} %".format(pred8[0]*100)
-    preds9 = "{:,.2f} %".format(pred9[0]*100)
-    preds10 = "{:,.2f} %".format(pred10[0]*100)
-    preds11 = "{:,.2f} %".format(pred11[0]*100)
-    preds12 = "{:,.2f} %".format(pred12[0]*100)
-    preds13 = "{:,.2f} %".format(pred13[0]*100)
-    preds14 = "{:,.2f} %".format(pred14[0]*100)
-    preds15 = "{:,.2f} %".format(pred15[0]*100)
-    preds16 = "{:,.2f} %".format(pred16[0]*100)
-    preds17 = "{:,.2f} %".format(pred17[0]*100)
-    preds18 = "{:,.2f} %".format(pred18[0]*100)
-    
-    #processing NPL sectoral value
-    pref1 = pre+econSector[0]+" {:,.2f}".format(pred1[0]*a)
-    pref2 = pre+econSector[1]+" {:,.2f}".format(pred2[0]*b)
-    pref3 = pre+econSector[2]+" {:,.2f}".format(pred3[0]*c)
-    pref4 = pre+econSector[3]+" {:,.2f}".format(pred4[0]*d)
-    pref5 = pre+econSector[4]+" {:,.2f}".format(pred5[0]*e)
-    pref6 = pre+econSector[5]+" {:,.2f}".format(pred6[0]*f)
-    pref7 = pre+econSector[6]+" {:,.2f}".format(pred7[0]*g)
-    pref8 = pre+econSector[7]+" {:,.2f}".format(pred8[0]*h)
-    pref9 = pre+econSector[8]+" {:,.2f}".format(pred9[0]*i)
-    pref10 = pre+econSector[9]+" {:,.2f}".format(pred10[0]*j)
-    pref11 = pre+econSector[10]+" {:,.2f}".format(pred11[0]*k)
-    pref12 = pre+econSector[11]+" {:,.2f}".format(pred12[0]*l)
-    pref13 = pre+econSector[12]+" {:,.2f}".format(pred13[0]*m)
-    pref14 = pre+econSector[13]+" {:,.2f}".format(pred14[0]*n)
-    pref15 = pre+econSector[14]+" {:,.2f}".format(pred15[0]*o)
-    pref16 = pre+econSector[15]+" {:,.2f}".format(pred16[0]*p)
-    pref17 = pre+econSector[16]+" {:,.2f}".format(pred17[0]*q)
-    pref18 = pre+econSector[17]+" {:,.2f}".format(pred18[0]*r)
-    
-    #populate variables
-    credit_channeling = [a,b,c,d,e,f,g,h,i,j,k,l,m,n,o,p,q,r]
-    percent_NPL_prediction = [pred1[0],pred2[0],pred3[0],pred4[0],pred5[0],pred6[0],
-                           pred7[0],pred8[0],pred9[0],pred10[0],pred11[0],pred12[0],
-                           pred13[0],pred14[0],pred15[0],pred16[0],pred17[0],pred18[0]]
-    
-    #processing total NPL percentage and value
-    total_SME_credit_channeling = sum(credit_channeling)
-#    populate_total_NPL = [[credit_channeling[_]*percent_NPL_prediction[_]/100] for _ in np.arange(18)]
-    total_NPL_val = 0.00
-    for i in np.arange(18):
-        NPL_i = credit_channeling[i]*percent_NPL_prediction[i]
-        total_NPL_val +=NPL_i
-    total_NPL_percentage = (total_NPL_val/total_SME_credit_channeling)*100
-    
-    #processing IJP and loss limit information
-    #ijp_trf = total_NPL_percentage * 0.8 * 0.91
-    ijp_trf = ((((total_NPL_percentage/100) * 0.8)-0.01) / 0.9)*100
-    ijp = ijp_trf * total_SME_credit_channeling / 100
-    #loss_lim = ijp / 100
-    loss_lim = total_SME_credit_channeling / 100
-    
-    
-    #data to pass
-    total_NPL_percentage_pass = "{:,.2f} %".format(total_NPL_percentage)
-    total_NPL_val_pass = "Proyeksi total nilai NPL atas Penyaluran Kredit kepada UMKM adalah Rp {:,.2f}".format(total_NPL_val)
-    total_credit = "Rp {:,.2f}".format(total_SME_credit_channeling)
-    ijp_tarif =  "{:,.2f} %".format(ijp_trf)
-    ijp_budget = "Rp {:,.2f}".format(ijp)
-    loss_limit_budget = "Rp {:,.2f}".format(loss_lim)
-    
-    return preds1, preds2, preds3, preds4, preds5, preds6, preds7, preds8, preds9, preds10, preds11, preds12, preds13, preds14, preds15, preds16, preds17, preds18, pref1, pref2, pref3, pref4, pref5, pref6, pref7, pref8, pref9, pref10, pref11, pref12, pref13, pref14, pref15, pref16, pref17, pref18, total_NPL_percentage_pass, total_NPL_val_pass, total_credit, ijp_tarif, ijp_budget, loss_limit_budget
+    return {
+        'key': key,
+        'estimate': False,
+        'percent_npl': percent_NPL_prediction,
+        'npl_value': npl_value,
+        'error': None,
+        'sector_NPL': ["{:,.2f} %".format(pred*100) for pred in percent_NPL_prediction],
+        'sector_NPL_val': [pre+econSector[i]+" {:,.2f}".format(npl_value[i]) for i in range(18)],
+        'total_NPL': "{:,.2f} %".format(result['total_npl_percentage']),
+        'total_NPL_val': "Proyeksi total nilai NPL atas Penyaluran Kredit kepada UMKM adalah Rp {:,.2f}".format(result['total_npl_val']),
+        'total_credit': "Rp {:,.2f}".format(result['total_credit']),
+        'IJP_tarif': "{:,.2f} %".format(result['ijp_trf']),
+        'IJP_budget': "Rp {:,.2f}".format(result['ijp_budget']),
+        'loss_limit_budget': "Rp {:,.2f}".format(result['loss_limit_budget']),
+    }
 
-######################limit second prediction######################
+#the scenario_outputs of a scenario not computed yet from the trees of the forest that fit the
+#latency budget: approximate values, and their error (Z standard errors against the full forest)
+#on the Rupiah values, the total NPL and the sector chart
+def scenario_estimate(key, EconGrowth, Inflasi, Unemployment, credit_channeling):
+    credits = np.asarray(credit_channeling, dtype=float)
+    predictions = forest.estimate(encode_features(credits, Inflasi, EconGrowth, Unemployment, np.arange(18)))
+    result = scenario_totals(credits, predictions.mean(axis=0))
+    error = Z * forest.standard_error(predictions)
+    total_error = Z * forest.standard_error(predictions @ credits) / result['total_credit']
+    pre = "Proyeksi NPL Kredit UMKM untuk sektor ekonomi "
+    return {
+        'key': key,
+        'estimate': True,
+        'percent_npl': result['percent_npl'],
+        'npl_value': result['npl_value'],
+        'error': error,
+        'sector_NPL': ["≈ {:,.2f} %".format(pred*100) for pred in result['percent_npl']],
+        'sector_NPL_val': [pre+econSector[i]+" ≈ {:,.2f} ± {:,.2f}".format(result['npl_value'][i], error[i]*credits[i]) for i in range(18)],
+        'total_NPL': "≈ {:,.2f} % ± {:,.2f}".format(result['total_npl_percentage'], total_error*100),
+        'total_NPL_val': "Perkiraan dari {} dari {} pohon: total nilai NPL atas Penyaluran Kredit kepada UMKM ≈ Rp {:,.2f} ± {:,.2f}".format(
+            len(predictions), forest.n_trees, result['total_npl_val'], total_error*result['total_credit']),
+        'total_credit': "Rp {:,.2f}".format(result['total_credit']),
+        'IJP_tarif': "≈ {:,.2f} %".format(result['ijp_trf']),
+        'IJP_budget': "≈ Rp {:,.2f}".format(result['ijp_budget']),
+        'loss_limit_budget': "Rp {:,.2f}".format(result['loss_limit_budget']),
+    }
+
+#outputs of the scenario, dropped when newer inputs of the same browser tab arrived meanwhile.
+#Unless exact, a scenario not computed yet is estimated when the full forest does not fit the
+#latency budget, and the full result follows (session_refine)
+def shared_scenario(session_id, slot, EconGrowth, Inflasi, Unemployment, credit_channeling, exact=True):
+    generation = superseded.begin(session_id, slot) if session_id else None
+    credit_channeling = tuple(credit_channeling)
+    key = scenario_key(scenario_version, EconGrowth, Inflasi, Unemployment, credit_channeling)
+    if exact or forest.fits_budget() or scenario_store.get(key) is not None:
+        outputs = flights.do(key, scenario_outputs, EconGrowth, Inflasi, Unemployment, credit_channeling)
+    else:
+        outputs = scenario_estimate(key, EconGrowth, Inflasi, Unemployment, credit_channeling)
+    if generation is not None and not superseded.is_current(session_id, slot, generation):
+        raise PreventUpdate
+    return outputs
+
+#the sector chart of the Evaluasi Sektor Terdampak tab only changes in its bar lengths: the
+#validated figure is built on first use and the values of each scenario are swapped in
+@functools.lru_cache(maxsize=1)
+def sector_chart():
+    fig = go.Figure(go.Bar(x=[0]*18, y=econSector, orientation='h'))
+    fig.update_layout(transition_duration=500)
+    return json.loads(json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder))
+
+def sector_chart_figure(values, errors=None):
+    template = sector_chart()
+    bars = dict(template['data'][0], x=[float(v) for v in values])
+    if errors is not None:
+        bars['error_x'] = {'type': 'data', 'array': [float(e) for e in errors]}
+    return dict(template, data=[bars])
+
+#average NPL percentage of the comparison period per sector, formatted
+@functools.lru_cache(maxsize=64)
+def baseline_words(start_year, end_year):
+    return ["{:,.2f} %".format(avg) for avg in rollups.range_mean('percentNPL', start_year, end_year)*100]
+
+#scenario tab state lives server side, keyed by a random token per browser tab:
+#the browser sends only the fields changed since the state the server last confirmed (diff),
+#the server merges them into that snapshot and answers with only the outputs that changed (patch),
+#which the browser applies leaving the other outputs untouched (render).
+#diffing against the confirmed state rather than the last request keeps dropped or reordered
+#responses harmless, a snapshot the server no longer has makes the next request resend everything
+sessions = SessionStore()
+
+DIFF_JS = """function() {
+    var fields = %s;
+    var values = {};
+    for (var i = 0; i < fields.length; i++) { values[fields[i]] = arguments[i]; }
+    var sent = arguments[fields.length] || {};
+    var patch = arguments[fields.length + 1];
+    var token = sent.token || Math.random().toString(36).slice(2, 12);
+    var seq = (sent.seq || 0) + 1;
+    var history = sent.history || {};
+    //after an estimate the screen shows it or its refinement, so everything is resent as on a resync
+    var base = (patch && !patch.resync && !patch.refine && patch.token === token && history[patch.seq]) ? patch.seq : null;
+    var kept = {};
+    if (base !== null) {
+        Object.keys(history).forEach(function(s) { if (+s >= base) { kept[s] = history[s]; } });
+    }
+    var changed = {};
+    fields.forEach(function(f) {
+        if (base === null || JSON.stringify(history[base][f]) !== JSON.stringify(values[f])) { changed[f] = values[f]; }
+    });
+    kept[seq] = values;
+    return [{token: token, seq: seq, base: base, changed: changed}, {token: token, seq: seq, history: kept}];
+}"""
+
+REFINE_JS = """function(patch) {
+    return (patch && patch.refine) ? patch : window.dash_clientside.no_update;
+}"""
+
+#the server lost the snapshot the delta was based on: the values of that request are resent in
+#full, unless newer inputs have been sent since (their own request follows)
+RESYNC_JS = """function(patch, sent) {
+    if (!(patch && patch.resync && sent && sent.token === patch.token && sent.seq === patch.seq)) {
+        return window.dash_clientside.no_update;
+    }
+    return {token: patch.token, seq: patch.seq, fields: sent.history[patch.seq]};
+}"""
+
+RENDER_JS = """function(patch, refined, resynced) {
+    var outputs = %s;
+    //the refinement of an estimate, or the outputs resent after a resync, apply only while that
+    //patch is the one on display
+    var current = function(p) { return p && patch && p.token === patch.token && p.seq === patch.seq; };
+    var changed = ((patch && patch.resync ? (current(resynced) ? resynced : null)
+                    : (current(refined) ? refined : patch)) || {}).outputs || {};
+    return outputs.map(function(o) {
+        return o in changed ? changed[o] : window.dash_clientside.no_update;
+    });
+}"""
+
+#merge the changed fields into the confirmed snapshot, render, store and diff the outputs
+def session_update(slot, delta, render):
+    if not delta:
+        raise PreventUpdate
+    token, seq, base = delta['token'], delta['seq'], delta['base']
+    previous = sessions.get(token, slot, base) if base is not None else None
+    #base snapshot expired or pruned: the browser resends this request's full state (RESYNC_JS)
+    if base is not None and previous is None:
+        return {'token': token, 'seq': seq, 'resync': True}, dash.no_update
+    fields = dict(previous['fields'] if previous else {}, **delta['changed'])
+
+    #dropped before and after the computation once the tab sent newer inputs, in any worker
+    if not sessions.claim(token, slot, seq):
+        raise PreventUpdate
+    names = ["{}.{}".format(*o) for o in SESSION_SLOTS[slot][1]]
+    rendered, estimated = render(token, fields, exact=False)
+    outputs = json.loads(json.dumps(dict(zip(names, rendered)), cls=plotly.utils.PlotlyJSONEncoder))
+    if not sessions.put(token, slot, seq, fields, outputs):
+        raise PreventUpdate
+    old = previous['outputs'] if previous else {}
+    patch = {name: value for name, value in outputs.items() if old.get(name) != value}
+    return {'token': token, 'seq': seq, 'outputs': patch, 'refine': estimated}, {'token': token, 'seq': seq}
+
+#outputs of the full state resent after a resync, all of them since the browser tab shows those
+#of an older state. Stored as the snapshot of its sequence number like any other request
+def session_resync(slot, resend, render):
+    token, seq, fields = resend['token'], resend['seq'], resend['fields']
+    if not fields or not sessions.claim(token, slot, seq):
+        raise PreventUpdate
+    names = ["{}.{}".format(*o) for o in SESSION_SLOTS[slot][1]]
+    rendered, _ = render(token, fields)
+    outputs = json.loads(json.dumps(dict(zip(names, rendered)), cls=plotly.utils.PlotlyJSONEncoder))
+    if not sessions.put(token, slot, seq, fields, outputs):
+        raise PreventUpdate
+    return {'token': token, 'seq': seq, 'outputs': outputs}
+
+#full forest outputs of an estimated snapshot, as a patch on the estimate. Skipped once the
+#browser tab has sent newer inputs, an exact result is only worth computing for where it stopped
+def session_refine(slot, patch, render):
+    token, seq = patch['token'], patch['seq']
+    snapshot = sessions.get(token, slot, seq)
+    if snapshot is None or sessions.latest_seq(token, slot) > seq:
+        raise PreventUpdate
+    names = ["{}.{}".format(*o) for o in SESSION_SLOTS[slot][1]]
+    rendered, _ = render(None, snapshot['fields'])
+    outputs = json.loads(json.dumps(dict(zip(names, rendered)), cls=plotly.utils.PlotlyJSONEncoder))
+    if sessions.latest_seq(token, slot) > seq:
+        raise PreventUpdate
+    old = snapshot['outputs']
+    return {'token': token, 'seq': seq, 'outputs': {name: value for name, value in outputs.items() if old.get(name) != value}}
+
+#the layout already shows the outputs of the starting values (render_initial), so none of the
+#session callbacks runs on page load. The first edit finds no confirmed state and sends every field
+session_renders = {}
+
+def register_session(slot, render):
+    fields, outputs = SESSION_SLOTS[slot]
+    session_renders[slot] = render
+    app.clientside_callback(
+        DIFF_JS % json.dumps(fields),
+        [Output("{}-delta".format(slot), "data"), Output("{}-sent".format(slot), "data")],
+        [Input(f, "value") for f in fields],
+        [State("{}-sent".format(slot), "data"), State("{}-patch".format(slot), "data")],
+        prevent_initial_call=True)
+    app.callback(
+        [Output("{}-patch".format(slot), "data"), Output("{}-ack".format(slot), "data")],
+        [Input("{}-delta".format(slot), "data")],
+        prevent_initial_call=True)(functools.partial(session_update, slot, render=render))
+    #only estimated patches go on to the server for their refinement
+    app.clientside_callback(
+        REFINE_JS,
+        Output("{}-refine".format(slot), "data"),
+        [Input("{}-patch".format(slot), "data")],
+        prevent_initial_call=True)
+    app.callback(
+        Output("{}-refined".format(slot), "data"),
+        [Input("{}-refine".format(slot), "data")],
+        prevent_initial_call=True)(functools.partial(session_refine, slot, render=render))
+    app.clientside_callback(
+        RESYNC_JS,
+        Output("{}-resend".format(slot), "data"),
+        [Input("{}-patch".format(slot), "data")],
+        [State("{}-sent".format(slot), "data")],
+        prevent_initial_call=True)
+    app.callback(
+        Output("{}-resynced".format(slot), "data"),
+        [Input("{}-resend".format(slot), "data")],
+        prevent_initial_call=True)(functools.partial(session_resync, slot, render=render))
+    app.clientside_callback(
+        RENDER_JS % json.dumps(["{}.{}".format(*o) for o in outputs]),
+        [Output(*o) for o in outputs],
+        [Input("{}-patch".format(slot), "data"), Input("{}-refined".format(slot), "data"),
+         Input("{}-resynced".format(slot), "data")],
+        prevent_initial_call=True)
+
+def render_penganggaran(token, fields, exact=True):
+    credit_channeling = [fields["sector_form_{}".format(i)] for i in range(18)]
+    view = shared_scenario(token, "penganggaran", fields["EconGrowth"], fields["Inflasi"], fields["Unemployment"],
+                           credit_channeling, exact)
+
+    #shareable link, opening it refills the forms and reads the stored result. Rendered into the
+    #cached layout outside a request, the host is filled in when the layout is served
+    host_url = flask.request.host_url if flask.has_request_context() else HOST_URL
+    scenario_url = "{}?skenario={}".format(host_url, view['key'])
+
+    return (*view['sector_NPL'], *view['sector_NPL_val'], view['total_NPL'], view['total_NPL_val'], view['total_credit'],
+            view['IJP_tarif'], view['IJP_budget'], view['loss_limit_budget'], scenario_url, scenario_url), view['estimate']
+
+register_session("penganggaran", render_penganggaran)
+
+#attribution tables of the forest, built on the first explanation request
+@functools.lru_cache(maxsize=1)
+def get_explainer():
+    return TreeExplainer(model_rf)
+
+#contributions to the projection of one sector for the inputs of the budgeting tab
+def explanation_figure(sektor, fields):
+    EconGrowth, Inflasi, Unemployment = fields["EconGrowth"], fields["Inflasi"], fields["Unemployment"]
+    credit_channeling = [fields["sector_form_{}".format(i)] for i in range(18)]
+
+    #contributions of the exact model for all sectors, cached per scenario in the store
+    key = explanation_key(model_version, EconGrowth, Inflasi, Unemployment, credit_channeling)
+    result = flights.do(key, load_or_explain, scenario_store, get_explainer(), model_version,
+                        EconGrowth, Inflasi, Unemployment, credit_channeling)
+    i = econSector.index(sektor)
+    base = result['base'][i]*100
+    contributions = [c*100 for c in result['contributions'][i]]
+
+    fig = go.Figure(go.Waterfall(
+        x=['Rata-rata Model'] + GROUPS + ['Proyeksi NPL'],
+        measure=['absolute'] + ['relative']*len(GROUPS) + ['total'],
+        y=[base] + contributions + [0],
+        text=["{:.2f}%".format(base)] + ["{:+.2f}%".format(c) for c in contributions] +
+             ["{:.2f}%".format(base + sum(contributions))],
+        textposition='outside',
+        increasing=dict(marker=dict(color='#dc3545')),
+        decreasing=dict(marker=dict(color='#28a745')),
+        totals=dict(marker=dict(color='#007bff'))))
+    fig.layout.update({'title':'Kontribusi Faktor terhadap Proyeksi NPL Sektor {}'.format(sektor),
+                       'yaxis':{'title':'Persentase NPL (%)'},
+                       'showlegend':False})
+    return fig
 
 @app.callback(
-    [Output("sector_NPL2_{}".format(i), "children") for i in np.arange(18)],
-    [Output("sector_NPL_val2_{}".format(i), "children") for i in np.arange(18)],
-    Output("total_NPL2","children"),
-    Output("total_NPL_val2","children"),
-    Output("total_credit2","children"),
-    Output("IJP_tarif2","children"),
-    [Input("EconGrowth2", "value"),
-    Input("Inflasi2", "value"),
-    Input("Unemployment2", "value"),
-    Input("sector_form2_0", "value"),
-    Input("sector_form2_1", "value"),
-    Input("sector_form2_2", "value"),
-    Input("sector_form2_3", "value"),
-    Input("sector_form2_4", "value"),
-    Input("sector_form2_5", "value"),
-    Input("sector_form2_6", "value"),
-    Input("sector_form2_7", "value"),
-    Input("sector_form2_8", "value"),
-    Input("sector_form2_9", "value"),
-    Input("sector_form2_10", "value"),
-    Input("sector_form2_11", "value"),
-    Input("sector_form2_12", "value"),
-    Input("sector_form2_13", "value"),
-    Input("sector_form2_14", "value"),
-    Input("sector_form2_15", "value"),
-    Input("sector_form2_16", "value"),
-    Input("sector_form2_17", "value")
-])
-def predict_NPL2(EconGrowth,Inflasi,Unemployment,a,b,c,d,e,f,g,h,i,j,k,l,m,n,o,p,q,r):
-    
-    #prediction
-    pred1 = model_rf.predict([[np.log(a),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,1,0,0]])
-    pred2 = model_rf.predict([[np.log(b),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,0,0,0,0,0,1,0,0,0,0]])
-    pred3 = model_rf.predict([[np.log(c),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,0,0,0,0,0,0,1,0,0,0]])
-    pred4 = model_rf.predict([[np.log(d),1,Inflasi,EconGrowth,Unemployment,0,0,1,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0]])
-    pred5 = model_rf.predict([[np.log(e),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,0,1,0,0,0,0,0,0,0,0]])
-    pred6 = model_rf.predict([[np.log(f),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,1,0,0,0,0,0,0,0,0,0]])
-    pred7 = model_rf.predict([[np.log(g),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,0,0,0,0,1,0,0,0,0,0]])
-    pred8 = model_rf.predict([[np.log(h),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,0,0,1,0,0,0,0,0,0,0]])
-    pred9 = model_rf.predict([[np.log(i),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,1]])
-    pred10 = model_rf.predict([[np.log(j),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,0,0,0,1,0,0,0,0,0,0]])
-    pred11 = model_rf.predict([[np.log(k),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,1,0]])
-    pred12 = model_rf.predict([[np.log(l),1,Inflasi,EconGrowth,Unemployment,1,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0]])
-    pred13 = model_rf.predict([[np.log(m),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,1,0,0,0,0,0,0,0,0,0,0,0,0]])
-    pred14 = model_rf.predict([[np.log(n),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,1,0,0,0,0,0,0,0,0,0,0,0,0,0]])
-    pred15 = model_rf.predict([[np.log(o),1,Inflasi,EconGrowth,Unemployment,0,0,0,1,0,0,0,0,0,0,0,0,0,0,0,0,0,0]])
-    pred16 = model_rf.predict([[np.log(p),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,1,0,0,0,0,0,0,0,0,0,0,0]])
-    pred17 = model_rf.predict([[np.log(q),1,Inflasi,EconGrowth,Unemployment,0,1,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0]])
-    pred18 = model_rf.predict([[np.log(r),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,1,0,0,0,0,0,0,0,0,0,0]])
-    
-    pre = "Proyeksi NPL Kredit UMKM untuk sektor ekonomi "
-    
-    #processing sectoral NPL percentage
-    preds1 = "{:,.2f} %".format(pred1[0]*100)
-    preds2 = "{:,.2f} %".format(pred2[0]*100)
-    preds3 = "{:,.2f} %".format(pred3[0]*100)
-    preds4 = "{:,.2f} %".format(pred4[0]*100)
-    preds5 = "{:,.2f} %".format(pred5[0]*100)
-    preds6 = "{:,.2f} %".format(pred6[0]*100)
-    preds7 = "{:,.2f} %".format(pred7[0]*100)
-    preds8 = "{:,.2f} %".format(pred8[0]*100)
-    preds9 = "{:,.2f} %".format(pred9[0]*100)
-    preds10 = "{:,.2f} %".format(pred10[0]*100)
-    preds11 = "{:,.2f} %".format(pred11[0]*100)
-    preds12 = "{:,.2f} %".format(pred12[0]*100)
-    preds13 = "{:,.2f} %".format(pred13[0]*100)
-    preds14 = "{:,.2f} %".format(pred14[0]*100)
-    preds15 = "{:,.2f} %".format(pred15[0]*100)
-    preds16 = "{:,.2f} %".format(pred16[0]*100)
-    preds17 = "{:,.2f} %".format(pred17[0]*100)
-    preds18 = "{:,.2f} %".format(pred18[0]*100)
-    
-    #processing NPL sectoral value
-    pref1 = pre+econSector[0]+" {:,.2f}".format(pred1[0]*a)
-    pref2 = pre+econSector[1]+" {:,.2f}".format(pred2[0]*b)
-    pref3 = pre+econSector[2]+" {:,.2f}".format(pred3[0]*c)
-    pref4 = pre+econSector[3]+" {:,.2f}".format(pred4[0]*d)
-    pref5 = pre+econSector[4]+" {:,.2f}".format(pred5[0]*e)
-    pref6 = pre+econSector[5]+" {:,.2f}".format(pred6[0]*f)
-    pref7 = pre+econSector[6]+" {:,.2f}".format(pred7[0]*g)
-    pref8 = pre+econSector[7]+" {:,.2f}".format(pred8[0]*h)
-    pref9 = pre+econSector[8]+" {:,.2f}".format(pred9[0]*i)
-    pref10 = pre+econSector[9]+" {:,.2f}".format(pred10[0]*j)
-    pref11 = pre+econSector[10]+" {:,.2f}".format(pred11[0]*k)
-    pref12 = pre+econSector[11]+" {:,.2f}".format(pred12[0]*l)
-    pref13 = pre+econSector[12]+" {:,.2f}".format(pred13[0]*m)
-    pref14 = pre+econSector[13]+" {:,.2f}".format(pred14[0]*n)
-    pref15 = pre+econSector[14]+" {:,.2f}".format(pred15[0]*o)
-    pref16 = pre+econSector[15]+" {:,.2f}".format(pred16[0]*p)
-    pref17 = pre+econSector[16]+" {:,.2f}".format(pred17[0]*q)
-    pref18 = pre+econSector[17]+" {:,.2f}".format(pred18[0]*r)
-    
-    #populate variables
-    credit_channeling = [a,b,c,d,e,f,g,h,i,j,k,l,m,n,o,p,q,r]
-    percent_NPL_prediction = [pred1[0],pred2[0],pred3[0],pred4[0],pred5[0],pred6[0],
-                           pred7[0],pred8[0],pred9[0],pred10[0],pred11[0],pred12[0],
-                           pred13[0],pred14[0],pred15[0],pred16[0],pred17[0],pred18[0]]
-    
-    #processing total NPL percentage and value
-    total_SME_credit_channeling = sum(credit_channeling)
-#    populate_total_NPL = [[credit_channeling[_]*percent_NPL_prediction[_]/100] for _ in np.arange(18)]
-    total_NPL_val = 0.00
-    for i in np.arange(18):
-        NPL_i = credit_channeling[i]*percent_NPL_prediction[i]
-        total_NPL_val +=NPL_i
-    total_NPL_percentage = (total_NPL_val/total_SME_credit_channeling)*100
-    
-    #processing IJP and loss limit information
-    #ijp_trf = total_NPL_percentage * 0.8 * 0.91
-    ijp_trf = ((((total_NPL_percentage/100) * 0.8)-0.01) / 0.9)*100
-    
-    #data to pass
-    total_NPL_percentage_pass = "{:,.2f} %".format(total_NPL_percentage)
-    total_NPL_val_pass = "Proyeksi total nilai NPL atas Penyaluran Kredit kepada UMKM adalah Rp {:,.2f}".format(total_NPL_val)
-    total_credit = "Rp {:,.2f}".format(total_SME_credit_channeling)
-    ijp_tarif =  "{:,.2f} %".format(ijp_trf)
-    
-    return preds1, preds2, preds3, preds4, preds5, preds6, preds7, preds8, preds9, preds10, preds11, preds12, preds13, preds14, preds15, preds16, preds17, preds18, pref1, pref2, pref3, pref4, pref5, pref6, pref7, pref8, pref9, pref10, pref11, pref12, pref13, pref14, pref15, pref16, pref17, pref18, total_NPL_percentage_pass, total_NPL_val_pass, total_credit, ijp_tarif
+    Output("explain-graph", "figure"),
+    [Input("explain-sector-selector", "value"),
+    Input("penganggaran-ack", "data"),
+    Input("penganggaran-resynced", "data")],
+    prevent_initial_call=True)
+def update_explanation(sektor,ack,resynced):
+    #inputs of the budgeting tab as last confirmed by the server for this browser tab (by a
+    #request or by the resend after a resync), the starting values until its first edit
+    if resynced and (not ack or resynced['seq'] > ack['seq']):
+        ack = resynced
+    if not ack:
+        return explanation_figure(sektor, initial_fields)
+    snapshot = sessions.get(ack['token'], "penganggaran", ack['seq'])
+    if snapshot is None:
+        raise PreventUpdate
+    return explanation_figure(sektor, snapshot['fields'])
 
-######################limit third prediction######################
+@app.callback(
+    Output("EconGrowth", "value"),
+    Output("Inflasi", "value"),
+    Output("Unemployment", "value"),
+    [Output("sector_form_{}".format(i), "value") for i in np.arange(18)],
+    [Input("url", "search")])
+def load_shared_scenario(search):
+    key = parse_qs((search or "").lstrip("?")).get("skenario", [None])[0]
+    stored = scenario_store.get(key) if key else None
+    if stored is None or stored['inputs'].get('kind', 'scenario') != 'scenario':
+        raise PreventUpdate
+    inputs = stored['inputs']
+    return (inputs['EconGrowth'], inputs['Inflasi'], inputs['Unemployment'], *inputs['credits'])
+
+@server.route("/skenario/<key>")
+def scenario_json(key):
+    stored = scenario_store.get(key)
+    if stored is None:
+        flask.abort(404)
+    return flask.jsonify(stored)
+
+######################limit optimizer######################
 
 @app.callback(
-    [Output("sector_NPL3_{}".format(i), "children") for i in np.arange(18)],
-    [Output("sector_NPL_val3_{}".format(i), "children") for i in np.arange(18)],
-    [Output("sector_compare_NPL3_{}".format(i), "children") for i in np.arange(18)],
-    Output("channel-comparison-graph-sector-affected","figure"),
-    [Input("EconGrowth3", "value"),
-    Input("Inflasi3", "value"),
-    Input("Unemployment3", "value"),
-    Input("npl_value_type", "value"),
-    Input("sector_form3_0", "value"),
-    Input("sector_form3_1", "value"),
-    Input("sector_form3_2", "value"),
-    Input("sector_form3_3", "value"),
-    Input("sector_form3_4", "value"),
-    Input("sector_form3_5", "value"),
-    Input("sector_form3_6", "value"),
-    Input("sector_form3_7", "value"),
-    Input("sector_form3_8", "value"),
-    Input("sector_form3_9", "value"),
-    Input("sector_form3_10", "value"),
-    Input("sector_form3_11", "value"),
-    Input("sector_form3_12", "value"),
-    Input("sector_form3_13", "value"),
-    Input("sector_form3_14", "value"),
-    Input("sector_form3_15", "value"),
-    Input("sector_form3_16", "value"),
-    Input("sector_form3_17", "value")
-])
-def predict_NPL2(EconGrowth,Inflasi,Unemployment,val_type,a,b,c,d,e,f,g,h,i,j,k,l,m,n,o,p,q,r):
-    
-    #prediction
-    pred1 = model_rf.predict([[np.log(a),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,1,0,0]])
-    pred2 = model_rf.predict([[np.log(b),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,0,0,0,0,0,1,0,0,0,0]])
-    pred3 = model_rf.predict([[np.log(c),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,0,0,0,0,0,0,1,0,0,0]])
-    pred4 = model_rf.predict([[np.log(d),1,Inflasi,EconGrowth,Unemployment,0,0,1,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0]])
-    pred5 = model_rf.predict([[np.log(e),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,0,1,0,0,0,0,0,0,0,0]])
-    pred6 = model_rf.predict([[np.log(f),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,1,0,0,0,0,0,0,0,0,0]])
-    pred7 = model_rf.predict([[np.log(g),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,0,0,0,0,1,0,0,0,0,0]])
-    pred8 = model_rf.predict([[np.log(h),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,0,0,1,0,0,0,0,0,0,0]])
-    pred9 = model_rf.predict([[np.log(i),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,1]])
-    pred10 = model_rf.predict([[np.log(j),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,0,0,0,1,0,0,0,0,0,0]])
-    pred11 = model_rf.predict([[np.log(k),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,1,0]])
-    pred12 = model_rf.predict([[np.log(l),1,Inflasi,EconGrowth,Unemployment,1,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0]])
-    pred13 = model_rf.predict([[np.log(m),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,1,0,0,0,0,0,0,0,0,0,0,0,0]])
-    pred14 = model_rf.predict([[np.log(n),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,1,0,0,0,0,0,0,0,0,0,0,0,0,0]])
-    pred15 = model_rf.predict([[np.log(o),1,Inflasi,EconGrowth,Unemployment,0,0,0,1,0,0,0,0,0,0,0,0,0,0,0,0,0,0]])
-    pred16 = model_rf.predict([[np.log(p),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,1,0,0,0,0,0,0,0,0,0,0,0]])
-    pred17 = model_rf.predict([[np.log(q),1,Inflasi,EconGrowth,Unemployment,0,1,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0]])
-    pred18 = model_rf.predict([[np.log(r),1,Inflasi,EconGrowth,Unemployment,0,0,0,0,0,0,0,1,0,0,0,0,0,0,0,0,0,0]])
-    
-    pre = "Proyeksi NPL Kredit UMKM untuk sektor ekonomi "
-    
-    #processing sectoral NPL percentage
-    preds1 = "{:,.2f} %".format(pred1[0]*100)
-    preds2 = "{:,.2f} %".format(pred2[0]*100)
-    preds3 = "{:,.2f} %".format(pred3[0]*100)
-    preds4 = "{:,.2f} %".format(pred4[0]*100)
-    preds5 = "{:,.2f} %".format(pred5[0]*100)
-    preds6 = "{:,.2f} %".format(pred6[0]*100)
-    preds7 = "{:,.2f} %".format(pred7[0]*100)
-    preds8 = "{:,.2f} %".format(pred8[0]*100)
-    preds9 = "{:,.2f} %".format(pred9[0]*100)
-    preds10 = "{:,.2f} %".format(pred10[0]*100)
-    preds11 = "{:,.2f} %".format(pred11[0]*100)
-    preds12 = "{:,.2f} %".format(pred12[0]*100)
-    preds13 = "{:,.2f} %".format(pred13[0]*100)
-    preds14 = "{:,.2f} %".format(pred14[0]*100)
-    preds15 = "{:,.2f} %".format(pred15[0]*100)
-    preds16 = "{:,.2f} %".format(pred16[0]*100)
-    preds17 = "{:,.2f} %".format(pred17[0]*100)
-    preds18 = "{:,.2f} %".format(pred18[0]*100)
-    
-    #processing NPL sectoral value
-    pref1 = pre+econSector[0]+" {:,.2f}".format(pred1[0]*a)
-    pref2 = pre+econSector[1]+" {:,.2f}".format(pred2[0]*b)
-    pref3 = pre+econSector[2]+" {:,.2f}".format(pred3[0]*c)
-    pref4 = pre+econSector[3]+" {:,.2f}".format(pred4[0]*d)
-    pref5 = pre+econSector[4]+" {:,.2f}".format(pred5[0]*e)
-    pref6 = pre+econSector[5]+" {:,.2f}".format(pred6[0]*f)
-    pref7 = pre+econSector[6]+" {:,.2f}".format(pred7[0]*g)
-    pref8 = pre+econSector[7]+" {:,.2f}".format(pred8[0]*h)
-    pref9 = pre+econSector[8]+" {:,.2f}".format(pred9[0]*i)
-    pref10 = pre+econSector[9]+" {:,.2f}".format(pred10[0]*j)
-    pref11 = pre+econSector[10]+" {:,.2f}".format(pred11[0]*k)
-    pref12 = pre+econSector[11]+" {:,.2f}".format(pred12[0]*l)
-    pref13 = pre+econSector[12]+" {:,.2f}".format(pred13[0]*m)
-    pref14 = pre+econSector[13]+" {:,.2f}".format(pred14[0]*n)
-    pref15 = pre+econSector[14]+" {:,.2f}".format(pred15[0]*o)
-    pref16 = pre+econSector[15]+" {:,.2f}".format(pred16[0]*p)
-    pref17 = pre+econSector[16]+" {:,.2f}".format(pred17[0]*q)
-    pref18 = pre+econSector[17]+" {:,.2f}".format(pred18[0]*r)
-    
-    #populate variables
-    credit_channeling = [a,b,c,d,e,f,g,h,i,j,k,l,m,n,o,p,q,r]
-    percent_NPL_prediction = [pred1[0],pred2[0],pred3[0],pred4[0],pred5[0],pred6[0],
-                           pred7[0],pred8[0],pred9[0],pred10[0],pred11[0],pred12[0],
-                           pred13[0],pred14[0],pred15[0],pred16[0],pred17[0],pred18[0]]
-    
-    s1 = pd.Series(econSector, name='sector')
-    s2 = pd.Series(credit_channeling, name='channeling')
-    s3 = pd.Series(percent_NPL_prediction, name='percentNPL')
-    
-    df = pd.concat([s1,s2,s3], axis=1)
-    df['valueNPL'] = df['percentNPL']*df['channeling']    
-    
-    fig = go.Figure(go.Bar(
-            x=df['percentNPL']*100 if val_type=='Percentage' else df['valueNPL'],
-            y=econSector,
-            orientation='h'))
+    Output("opt_total_NPL","children"),
+    Output("opt_cost_label","children"),
+    Output("opt_cost","children"),
+    Output("opt_status","children"),
+    Output("opt_allocation_graph","figure"),
+    [Input("opt_run", "n_clicks")],
+    [State("EconGrowth4", "value"),
+    State("Inflasi4", "value"),
+    State("Unemployment4", "value"),
+    State("opt_total_credit", "value"),
+    State("opt_budget", "value"),
+    State("opt_lower", "value"),
+    State("opt_upper", "value"),
+    State("opt_objective", "value")],
+    prevent_initial_call=True)
+def optimize_NPL(n_clicks,EconGrowth,Inflasi,Unemployment,total_credit,budget,lower_pct,upper_pct,objective):
+    #bounds are relative to each sector's June 2020 share of credit, scaled to the requested total
+    current = np.array(defaults['credits'])*total_credit/sum(defaults['credits'])
+    try:
+        result = optimizer.optimize_allocation(
+            model_rf, EconGrowth, Inflasi, Unemployment, total_credit, budget,
+            current*lower_pct/100, current*upper_pct/100, start=current, objective=objective,
+            pool=optimizer.get_pool(optimizer.WORKERS) if optimizer.WORKERS > 1 else None,
+            workers=optimizer.WORKERS)
+    except ValueError as e:
+        return "-", dash.no_update, "-", str(e), go.Figure()
 
-    #chart transition
-    fig.update_layout(transition_duration=500)
-    
-    avg_word_2019_0 = "{:,.2f} %".format(avg_2019[0])
-    avg_word_2019_1 = "{:,.2f} %".format(avg_2019[1])
-    avg_word_2019_2 = "{:,.2f} %".format(avg_2019[2])
-    avg_word_2019_3 = "{:,.2f} %".format(avg_2019[3])
-    avg_word_2019_4 = "{:,.2f} %".format(avg_2019[4])
-    avg_word_2019_5 = "{:,.2f} %".format(avg_2019[5])
-    avg_word_2019_6 = "{:,.2f} %".format(avg_2019[6])
-    avg_word_2019_7 = "{:,.2f} %".format(avg_2019[7])
-    avg_word_2019_8 = "{:,.2f} %".format(avg_2019[8])
-    avg_word_2019_9 = "{:,.2f} %".format(avg_2019[9])    
-    avg_word_2019_10 = "{:,.2f} %".format(avg_2019[10])
-    avg_word_2019_11 = "{:,.2f} %".format(avg_2019[11])
-    avg_word_2019_12 = "{:,.2f} %".format(avg_2019[12])
-    avg_word_2019_13 = "{:,.2f} %".format(avg_2019[13])
-    avg_word_2019_14 = "{:,.2f} %".format(avg_2019[14])
-    avg_word_2019_15 = "{:,.2f} %".format(avg_2019[15])
-    avg_word_2019_16 = "{:,.2f} %".format(avg_2019[16])
-    avg_word_2019_17 = "{:,.2f} %".format(avg_2019[17])
-    
-    return preds1, preds2, preds3, preds4, preds5, preds6, preds7, preds8, preds9, preds10, preds11, preds12, preds13, preds14, preds15, preds16, preds17, preds18, pref1, pref2, pref3, pref4, pref5, pref6, pref7, pref8, pref9, pref10, pref11, pref12, pref13, pref14, pref15, pref16, pref17, pref18, avg_word_2019_0, avg_word_2019_1, avg_word_2019_2, avg_word_2019_3, avg_word_2019_4, avg_word_2019_5, avg_word_2019_6, avg_word_2019_7, avg_word_2019_8, avg_word_2019_9, avg_word_2019_10, avg_word_2019_11, avg_word_2019_12, avg_word_2019_13, avg_word_2019_14, avg_word_2019_15, avg_word_2019_16, avg_word_2019_17, fig
+    #the IJP figure shown is the one the budget was checked against and, for 'ijp', minimized
+    if objective == 'npl':
+        cost_label = "Anggaran IJP dan Loss Limit"
+    else:
+        cost_label = "Anggaran IJP per Sektor dan Loss Limit"
+    status = "{:,} alokasi dievaluasi dalam {:,.1f} detik. ".format(result['evaluated'], result['seconds'])
+    if objective != 'npl':
+        status += "Batas anggaran diterapkan pada IJP dengan tarif per sektor (IJP gabungan Rp {:,.2f}). ".format(result['ijp_budget'])
+    status += "Anggaran terpenuhi." if result['feasible'] else "Tidak ada alokasi yang memenuhi batas anggaran, ditampilkan alokasi dengan biaya terendah."
+
+    fig = go.Figure()
+    fig.add_traces([
+        go.Bar(x=current, y=econSector, orientation='h', marker=dict(color='#404040'), name='Alokasi Juni 2020'),
+        go.Bar(x=result['credits'], y=econSector, orientation='h', marker=dict(color='#0099ff'), name='Alokasi Optimal')])
+    fig.layout.update({'title': 'Alokasi Penyaluran Kredit per Sektor Ekonomi (Rp)'})
+
+    return ("{:,.2f} %".format(result['total_npl_percentage']), cost_label, "Rp {:,.2f}".format(result['cost']), status, fig)
+
+######################limit projection######################
+
+#comma separated monthly values, padded with the last value to the projection horizon
+def parse_path(text):
+    try:
+        values = [float(v) for v in str(text).replace(";", ",").split(",") if v.strip()]
+    except ValueError:
+        raise PreventUpdate
+    if not values:
+        raise PreventUpdate
+    return (values + values[-1:]*len(projection_periods))[:len(projection_periods)]
+
+@app.callback(
+    Output("projection-graph", "figure"),
+    [Input("projection-sector-selector", "value"),
+    Input("EconGrowth_path", "value"),
+    Input("Inflasi_path", "value"),
+    Input("Unemployment_path", "value")]+
+    [Input("growth_form_{}".format(i), "value") for i in np.arange(18)])
+def update_projection(sektor,EconGrowth_path,Inflasi_path,Unemployment_path,*growth):
+    paths = load_or_project(scenario_store, scenario_model, scenario_version, defaults['credits'],
+                            [g or 0 for g in growth], parse_path(Inflasi_path),
+                            parse_path(EconGrowth_path), parse_path(Unemployment_path))
+
+    #historical series ends at the last observed month, the projection continues from there
+    if sektor == 'Total':
+        summ_df = df.groupby(['Tahun', 'Bulan'], sort=False, observed=True)[['valueChannel', 'valueNPL']].sum()
+        history = (summ_df['valueNPL']/summ_df['valueChannel']*100).values
+        projected = paths['total_npl_percentage']
+    else:
+        history = df[df.SektorEkonomi == sektor]['percentNPL'].values*100
+        projected = np.array(paths['percent_npl'])[:, econSector.index(sektor)]*100
+
+    fig = go.Figure()
+    fig.add_traces([
+        go.Scatter(x=history_periods, y=history, marker=dict(color='#404040'), name='Historis'),
+        go.Scatter(x=[history_periods[-1]]+projection_periods, y=np.concatenate([history[-1:], projected]),
+                   marker=dict(color='#0099ff'), line=dict(dash='dash'), name='Proyeksi')])
+    fig.layout.update({'title': 'Persentase NPL Historis dan Proyeksi (%)'})
+    return fig
+
+######################limit second prediction######################
+
+def render_tarif(token, fields, exact=True):
+    credit_channeling = [fields["sector_form2_{}".format(i)] for i in range(18)]
+    view = shared_scenario(token, "tarif", fields["EconGrowth2"], fields["Inflasi2"], fields["Unemployment2"],
+                           credit_channeling, exact)
+    return (*view['sector_NPL'], *view['sector_NPL_val'], view['total_NPL'], view['total_NPL_val'], view['total_credit'],
+            view['IJP_tarif']), view['estimate']
+
+register_session("tarif", render_tarif)
+
+######################limit third prediction######################
+
+def render_sektor(token, fields, exact=True):
+    credit_channeling = [fields["sector_form3_{}".format(i)] for i in range(18)]
+    view = shared_scenario(token, "sektor", fields["EconGrowth3"], fields["Inflasi3"], fields["Unemployment3"],
+                           credit_channeling, exact)
+    scale = 100 if fields["npl_value_type"]=='Percentage' else np.asarray(credit_channeling, dtype=float)
+    errors = view['error']*scale if view['estimate'] else None
+    fig = sector_chart_figure(view['percent_npl']*scale, errors)
+
+    #baseline average NPL percentage of the selected period
+    return (*view['sector_NPL'], *view['sector_NPL_val'], *baseline_words(*fields["baseline-year-slider"]), fig), view['estimate']
+
+register_session("sektor", render_sektor)
+
+#the layout with the outputs of the starting values filled in by the same renders the
+#callbacks run, built once per dataset, model (and surrogate grid) and code and served from the
+#layout cache. The key also covers every app module loaded by now (scenario formulas, rollups,
+#explanations, backtest) and the dash and plotly versions, see layout_cache.layout_key
+def render_initial():
+    layout = build_layout()
+    for slot, (fields, outputs) in SESSION_SLOTS.items():
+        rendered, _ = session_renders[slot](None, {f: initial_fields[f] for f in fields})
+        for (component_id, prop), value in zip(outputs, rendered):
+            setattr(layout[component_id], prop, value)
+    layout["explain-graph"].figure = explanation_figure(layout["explain-sector-selector"].value, initial_fields)
+    return layout
+
+app.cache_layout(render_initial, layout_key(model_version, scenario_version, file_hash(DATA_FILE)))
 
 if __name__ == '__main__':
     app.run_server(debug=True, use_reloader=False)
@@ -0,0 +1,64 @@
+import hashlib
+import os
+import pathlib
+import pickle
+import numpy as np
+import prediction
+from controls import monthCode, econSector
+from prediction import encode_features, file_hash
+
+# get relative cache folder
+PATH = pathlib.Path(__file__).parent
+CACHE_PATH = PATH.joinpath("cache").resolve()
+
+#score every historical row with one model call
+def run_backtest(df, model):
+    sector = np.asarray(df['SektorEkonomi'].map({s: i for i, s in enumerate(econSector)}), dtype=int)
+    X = encode_features(df['valueChannel'].values*1000000000, df['Inflasi'].values,
+                        df['EconGrowth'].values, df['Unemployment'].values,
+                        sector, df['pandemicTF'].values)
+
+    rows = df[['Tahun', 'Bulan', 'SektorEkonomi', 'percentNPL']].copy()
+    rows['predNPL'] = model.predict(X)
+    rows['error'] = rows['predNPL'] - rows['percentNPL']
+    rows['absError'] = rows['error'].abs()
+    rows['sqError'] = rows['error']**2
+    rows['monthIdx'] = np.asarray(rows['Bulan'].map({m: i for i, m in enumerate(monthCode)}), dtype=int)
+    rows = rows.sort_values(['SektorEkonomi', 'Tahun', 'monthIdx']).reset_index(drop=True)
+    rows['period'] = rows['Bulan'].astype(str) + " " + rows['Tahun'].astype(str)
+
+    return {
+        'rows': rows,
+        'by_sector': error_metrics(rows, 'SektorEkonomi').set_index('SektorEkonomi').reindex(econSector).reset_index(),
+        'by_year': error_metrics(rows, 'Tahun'),
+        'by_sector_year': error_metrics(rows, ['SektorEkonomi', 'Tahun']),
+    }
+
+#MAE, RMSE, mean bias and MAPE (all in NPL ratio units) per group
+def error_metrics(rows, by):
+    rows = rows.assign(apError=rows['absError']/rows['percentNPL'].where(rows['percentNPL'] != 0))
+    metrics = rows.groupby(by, as_index=False, observed=True).agg(
+        MAE=('absError', 'mean'),
+        MSE=('sqError', 'mean'),
+        bias=('error', 'mean'),
+        MAPE=('apError', 'mean'),
+        n=('error', 'size'))
+    metrics['RMSE'] = np.sqrt(metrics.pop('MSE'))
+    return metrics
+
+#backtest result cached on disk, keyed by the model and dataset content and the code that scores them
+def load_backtest(df, model, data_file, model_file, cache_path=CACHE_PATH):
+    code = hashlib.sha1((file_hash(__file__) + file_hash(prediction.__file__)).encode()).hexdigest()
+    key = "backtest-{}-{}-{}.pkl".format(file_hash(model_file)[:16], file_hash(data_file)[:16], code[:16])
+    cache_file = pathlib.Path(cache_path).joinpath(key)
+    if cache_file.exists():
+        with open(cache_file, "rb") as f:
+            return pickle.load(f)
+
+    result = run_backtest(df, model)
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_suffix(".tmp{}".format(os.getpid()))
+    with open(tmp_file, "wb") as f:
+        pickle.dump(result, f)
+    os.replace(tmp_file, cache_file)
+    return result
@@ -0,0 +1,142 @@
+import argparse
+import collections
+import itertools
+import os
+import pathlib
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from controls import econSector
+from prediction import MODEL_FILE, encode_features, init_worker, worker_model
+from scenario import default_scenario, ijp_tariff, loss_limit
+from storage import CHUNK_SIZE, DATA_FILE, is_parquet, iter_chunks
+
+#input rows: one sector credit (Rupiah) under one macro path, any other column (bank, path id,
+#period) is passed through to the output. Missing macro values default to June 2020
+MACRO_FIELDS = ['Inflasi', 'EconGrowth', 'Unemployment']
+
+#rows per model call, bounds the encoded feature matrix (184 bytes per row) inside a worker
+BATCH_SIZE = 50000
+
+#projected NPL (%) and value of every row, with the IJP tariff (%), IJP and loss limit budgets
+#the dashboard computes for a scenario, applied here to the row's own credit
+def score_chunk(chunk, defaults, model=None):
+    model = model or worker_model()
+    sector = pd.Categorical(chunk['SektorEkonomi'], categories=econSector).codes
+    if (sector < 0).any():
+        raise ValueError("sektor ekonomi kosong atau tidak dikenal pada {} baris".format((sector < 0).sum()))
+    credit = chunk['PenyaluranKredit'].values.astype(float)
+    if not (credit > 0).all():
+        raise ValueError("PenyaluranKredit harus lebih dari 0 pada setiap baris")
+    macro = [chunk[field].fillna(defaults[field]).values.astype(float) if field in chunk else np.full(len(chunk), defaults[field])
+             for field in MACRO_FIELDS]
+    pandemic = chunk['pandemicTF'].values if 'pandemicTF' in chunk else np.ones(len(chunk))
+
+    percent_npl = np.empty(len(chunk))
+    for start in range(0, len(chunk), BATCH_SIZE):
+        rows = slice(start, start + BATCH_SIZE)
+        percent_npl[rows] = model.predict(encode_features(credit[rows], macro[0][rows], macro[1][rows], macro[2][rows],
+                                                          sector[rows], pandemic[rows]))
+
+    chunk = chunk.assign(ProyeksiNPL=percent_npl*100, ProyeksiNilaiNPL=credit*percent_npl,
+                         TarifIJP=ijp_tariff(percent_npl*100))
+    chunk['AnggaranIJP'] = chunk['TarifIJP'].values * credit / 100
+    chunk['AnggaranLossLimit'] = loss_limit(credit)
+    return chunk
+
+#appends scored chunks to a csv or parquet file, written under a temporary name and moved
+#into place when complete so a partial run never looks like a finished one
+class ResultWriter:
+    def __init__(self, path):
+        self.path = pathlib.Path(path)
+        self.parquet = is_parquet(self.path)
+        self.tmp_file = self.path.with_name(self.path.name + ".tmp{}".format(os.getpid()))
+        self.writer = None
+        self.file = None
+
+    def write(self, chunk):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if self.writer is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                self.writer = pq.ParquetWriter(str(self.tmp_file), table.schema)
+            else:
+                table = pa.Table.from_pandas(chunk, schema=self.writer.schema, preserve_index=False)
+            self.writer.write_table(table)
+        else:
+            header = self.file is None
+            if header:
+                self.file = open(self.tmp_file, "w", newline='')
+            chunk.to_csv(self.file, header=header, index=False)
+
+    def close(self, complete=True):
+        if self.writer is not None:
+            self.writer.close()
+        if self.file is not None:
+            self.file.close()
+        if complete:
+            os.replace(self.tmp_file, self.path)
+        elif self.tmp_file.exists():
+            self.tmp_file.unlink()
+
+def _total_rows(source):
+    if not is_parquet(source):
+        return None
+    import pyarrow.dataset as ds
+    return ds.dataset(source, format='parquet', partitioning='hive').count_rows()
+
+#score a scenario file chunk by chunk across a process pool. At most max_pending chunks are in
+#flight and results are written in input order, so memory stays flat whatever the input size
+def score_file(source, out_file, model_file=MODEL_FILE, workers=None, chunksize=CHUNK_SIZE, max_pending=None,
+               interval=2.0, log=sys.stderr):
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 2
+    scenario = default_scenario(DATA_FILE)
+    defaults = {field: float(scenario[field]) for field in MACRO_FIELDS}
+    total = _total_rows(source)
+    chunks = iter_chunks(source, None, chunksize=chunksize)
+
+    writer = ResultWriter(out_file)
+    started = last_report = time.time()
+    done = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(str(model_file),)) as pool:
+            pending = collections.deque(pool.submit(score_chunk, chunk, defaults) for chunk in itertools.islice(chunks, max_pending))
+            while pending:
+                result = pending.popleft().result()
+                pending.extend(pool.submit(score_chunk, chunk, defaults) for chunk in itertools.islice(chunks, 1))
+                writer.write(result)
+                done += len(result)
+                now = time.time()
+                if now - last_report >= interval or not pending:
+                    last_report = now
+                    progress = " ({:.1f} %)".format(done / total * 100) if total else ""
+                    print("{:,} baris{} dalam {:.1f} detik, {:,.0f} baris/detik".format(
+                        done, progress, now - started, done / max(now - started, 1e-9)), file=log, flush=True)
+    except BaseException:
+        writer.close(complete=False)
+        raise
+    writer.close()
+    return done, time.time() - started
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Skor file skenario besar (csv atau parquet) per potongan: proyeksi NPL, "
+                                                 "tarif IJP dan anggaran per baris")
+    parser.add_argument('source', help="csv atau parquet dengan kolom SektorEkonomi, PenyaluranKredit (Rupiah) "
+                                       "dan opsional Inflasi, EconGrowth, Unemployment, pandemicTF")
+    parser.add_argument('out', help="file keluaran .csv atau .parquet")
+    parser.add_argument('--model', default=str(MODEL_FILE))
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE, help="baris per potongan")
+    parser.add_argument('--interval', type=float, default=2.0, help="jeda laporan kemajuan (detik)")
+    args = parser.parse_args()
+
+    rows, seconds = score_file(args.source, args.out, args.model, args.workers, args.chunksize, interval=args.interval)
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    print("{:,} baris ditulis ke {} dalam {:.1f} detik ({:,.0f} baris/detik), rss puncak per proses {:.1f} MiB".format(
+        rows, args.out, seconds, rows / max(seconds, 1e-9), peak / 1024))
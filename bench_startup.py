@@ -0,0 +1,102 @@
+import argparse
+import http.client
+import os
+import pathlib
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from layout_cache import CACHE_ENV
+
+PATH = pathlib.Path(__file__).parent
+
+#one line of python -X importtime: self and cumulative microseconds, nesting by indentation
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+#modules imported while importing the app, slowest cumulative first. Only modules directly below
+#the app's own imports are kept so a package and its submodules are not counted twice
+def import_profile(module='app'):
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+                            cwd=str(PATH), capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(result.stderr[-2000:])
+    rows = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            rows.append((int(match.group(2)), int(match.group(1)), len(match.group(3)) // 2, match.group(4)))
+    total = next(cumulative for cumulative, _, _, name in rows if name == module)
+    top = [(cumulative, name) for cumulative, _, depth, name in rows if depth == 1]
+    return total, sorted(top, reverse=True)
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def get(port, path):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    try:
+        conn.request('GET', path)
+        response = conn.getresponse()
+        response.read(1)
+        first_byte = time.perf_counter()
+        response.read()
+        return response.status, first_byte
+    finally:
+        conn.close()
+
+#seconds from starting python app.py to the first byte of the page and of its layout, with the
+#layout served from its cache or (cached=False) built on start and serialized by dash per request
+def cold_start(cached=True, timeout=120):
+    port = free_port()
+    env = dict(os.environ, PORT=str(port))
+    env[CACHE_ENV] = "1" if cached else "0"
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, 'app.py'], cwd=str(PATH), env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError("app.py berhenti dengan kode {}".format(process.returncode))
+            if time.perf_counter() - started > timeout:
+                raise RuntimeError("app.py tidak merespons dalam {} detik".format(timeout))
+            try:
+                status, page = get(port, '/')
+                break
+            except OSError:
+                time.sleep(0.01)
+        status, layout = get(port, '/_dash-layout')
+        if status != 200:
+            raise RuntimeError("/_dash-layout mengembalikan {}".format(status))
+        return page - started, layout - started
+    finally:
+        process.terminate()
+        process.wait()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Ukur waktu impor dan cold start aplikasi sampai byte pertama")
+    parser.add_argument('--runs', type=int, default=5, help="jumlah cold start yang diukur")
+    parser.add_argument('--top', type=int, default=15, help="jumlah modul terlambat yang ditampilkan")
+    args = parser.parse_args()
+
+    total, top = import_profile()
+    print("impor app: {:.0f} ms".format(total / 1000))
+    for cumulative, name in top[:args.top]:
+        print("  {:<40} {:>8.0f} ms".format(name, cumulative / 1000))
+
+    #the first run of each fills the on-disk caches (backtest, layout), later runs read them
+    medians = {}
+    for cached, label in [(False, 'tanpa cache layout'), (True, 'dengan cache layout')]:
+        runs = [cold_start(cached) for _ in range(args.runs)]
+        print(label)
+        print("{:<8} {:>12} {:>16}".format('run', '/ (ms)', '/_dash-layout (ms)'))
+        for i, (page, layout) in enumerate(runs):
+            print("{:<8} {:>12.0f} {:>16.0f}".format(i + 1, page * 1000, layout * 1000))
+        warm = runs[1:] or runs
+        medians[cached] = (statistics.median(r[0] for r in warm), statistics.median(r[1] for r in warm))
+        print("{:<8} {:>12.0f} {:>16.0f}".format('median', medians[cached][0] * 1000, medians[cached][1] * 1000))
+    print("cache layout menghemat {:.0f} ms sampai halaman dan {:.0f} ms sampai layout".format(
+        (medians[False][0] - medians[True][0]) * 1000, (medians[False][1] - medians[True][1]) * 1000))
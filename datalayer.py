@@ -0,0 +1,85 @@
+import argparse
+import pandas as pd
+from controls import monthCode, econSector
+
+monthType = pd.CategoricalDtype(monthCode, ordered=True)
+sectorType = pd.CategoricalDtype(econSector)
+
+#the only columns the dashboard needs, with their in-memory types. The csv also carries
+#' PenyaluranKredit', ' NPL', 'CreditChannelLog', 'LogCreditChannel' and ' Pandemic', which
+#duplicate valueChannel, valueNPL and pandemicTF and are never loaded.
+#credit and NPL values stay int64 since they are scaled from Rp miliar to Rupiah (x 1e9),
+#macro variables stay float64 because they become the default form values and scenario keys
+SCHEMA = {
+    'Tahun': 'int16',
+    'Bulan': monthType,
+    'SektorEkonomi': sectorType,
+    'valueChannel': 'int64',
+    'valueNPL': 'int64',
+    'percentNPL': 'float32',
+    'pandemicTF': 'int8',
+    'Inflasi': 'float64',
+    'EconGrowth': 'float64',
+    'Unemployment': 'float64',
+}
+
+#chunk dtypes for reading the raw file, string keys as categories so chunks stay small
+READ_DTYPES = {'Bulan': monthType, 'SektorEkonomi': sectorType}
+
+#check the columns and values the dashboard relies on, raising ValueError on the first problem
+def validate(df):
+    missing = [col for col in SCHEMA if col not in df.columns]
+    if missing:
+        raise ValueError("kolom dataset tidak ditemukan: {}".format(", ".join(missing)))
+    for col in ['Tahun', 'Bulan', 'SektorEkonomi']:
+        if df[col].isna().any():
+            raise ValueError("kolom {} berisi nilai kosong atau tidak dikenal".format(col))
+    unknown = set(df['Bulan'].astype(str)) - set(monthCode)
+    if unknown:
+        raise ValueError("nama bulan tidak dikenal: {}".format(", ".join(sorted(unknown))))
+    unknown = set(df['SektorEkonomi'].astype(str)) - set(econSector)
+    if unknown:
+        raise ValueError("sektor ekonomi tidak dikenal: {}".format(", ".join(sorted(unknown))))
+    if ((df['percentNPL'] < 0) | (df['percentNPL'] > 1)).any():
+        raise ValueError("percentNPL harus berupa rasio antara 0 dan 1")
+    if (df['valueChannel'] <= 0).any():
+        raise ValueError("valueChannel harus bernilai positif")
+    #apply_schema casts these to integers, which would truncate fractions and fails on NaN
+    for col, dtype in SCHEMA.items():
+        if pd.api.types.is_integer_dtype(dtype):
+            if df[col].isna().any():
+                raise ValueError("kolom {} berisi nilai kosong".format(col))
+            if (df[col] % 1 != 0).any():
+                raise ValueError("kolom {} harus berupa bilangan bulat".format(col))
+    return df
+
+#categoricals for the string keys, narrow types for year, flag and ratio, redundant columns dropped
+def apply_schema(df):
+    return df[list(SCHEMA)].astype(SCHEMA)
+
+#bytes held by each column (including string payloads) and their share of the frame
+def memory_report(df):
+    usage = df.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({'dtype': df.dtypes.astype(str), 'bytes': usage})
+    report['share'] = report['bytes'] / report['bytes'].sum()
+    report.loc['total'] = ['', report['bytes'].sum(), 1.0]
+    return report
+
+if __name__ == '__main__':
+    from storage import DATA_FILE, load_dataset
+
+    parser = argparse.ArgumentParser(description="Laporan penggunaan memori dataset per kolom")
+    parser.add_argument('source', nargs='?', default=str(DATA_FILE))
+    args = parser.parse_args()
+
+    raw = pd.read_csv(args.source, low_memory=False)
+    typed = load_dataset(args.source)
+    print("dataset mentah ({} kolom, tipe bawaan pandas)".format(len(raw.columns)))
+    print(memory_report(raw).to_string())
+    print()
+    print("lapisan data bertipe ({} kolom)".format(len(typed.columns)))
+    print(memory_report(typed).to_string())
+    print()
+    print("memori {:,} byte menjadi {:,} byte ({:.1%})".format(
+        int(raw.memory_usage(deep=True).sum()), int(typed.memory_usage(deep=True).sum()),
+        typed.memory_usage(deep=True).sum() / raw.memory_usage(deep=True).sum()))
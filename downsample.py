@@ -0,0 +1,90 @@
+import argparse
+import time
+import numpy as np
+
+#points per trace sent to the browser, about one per horizontal pixel of a full-width chart
+MAX_POINTS = 1000
+
+#rows of Y share the x axis (every sector is observed on the same periods), so each step below
+#handles all rows at once and the python loop only runs over output buckets, never input points
+
+#positions of the points inside [x0, x1] on a sorted x, plus one neighbour on each side so the
+#lines still run to the edges of a zoomed chart
+def window(x, x0=None, x1=None):
+    start = 0 if x0 is None else max(int(np.searchsorted(x, x0, side='left')) - 1, 0)
+    end = len(x) if x1 is None else min(int(np.searchsorted(x, x1, side='right')) + 1, len(x))
+    return slice(start, end)
+
+#Largest-Triangle-Three-Buckets: first and last point, then per bucket the point spanning the
+#largest triangle with the previously kept point and the mean of the next bucket. Keeps the
+#visual shape (peaks, dips) of a line with n points. Returns kept positions per row (rows x n)
+def lttb(x, Y, n):
+    Y = np.atleast_2d(Y)
+    k, N = Y.shape
+    if N <= n or n < 3:
+        return np.tile(np.arange(N), (k, 1))
+    #missing values never win a bucket and are left out of the bucket means
+    valid = ~np.isnan(Y)
+    filled = np.where(valid, Y, 0)
+    rows = np.arange(k)
+    every = (N - 2) / (n - 2)
+    kept = np.empty((k, n), dtype=int)
+    kept[:, 0] = 0
+    kept[:, -1] = N - 1
+    a = np.zeros(k, dtype=int)
+    for i in range(n - 2):
+        start, end = int(i * every) + 1, int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, N)
+        count = np.maximum(valid[:, end:next_end].sum(axis=1), 1)
+        next_x = x[end:next_end].mean()
+        next_y = filled[:, end:next_end].sum(axis=1) / count
+        ax, ay = x[a], filled[rows, a]
+        area = np.abs((ax - next_x)[:, None] * (Y[:, start:end] - ay[:, None])
+                      - (ax[:, None] - x[None, start:end]) * (next_y - ay)[:, None])
+        a = start + np.where(valid[:, start:end], area, -1).argmax(axis=1)
+        kept[:, i + 1] = a
+    return kept
+
+#min/max decimation: the lowest and highest point of each of n/2 equal buckets, in x order.
+#Cheaper than LTTB and keeps every extreme, so spikes in very long series are never dropped
+def minmax(x, Y, n):
+    Y = np.atleast_2d(Y)
+    k, N = Y.shape
+    buckets = max(n // 2, 1)
+    if N <= n:
+        return np.tile(np.arange(N), (k, 1))
+    size = -(-N // buckets)
+    #pad the last bucket by repeating its last point, missing values never win a bucket
+    padded = np.concatenate([Y, np.repeat(Y[:, -1:], buckets * size - N, axis=1)], axis=1).reshape(k, buckets, size)
+    offset = np.arange(buckets)[None, :] * size
+    low = np.where(np.isnan(padded), np.inf, padded).argmin(axis=2) + offset
+    high = np.where(np.isnan(padded), -np.inf, padded).argmax(axis=2) + offset
+    return np.minimum(np.sort(np.concatenate([low, high], axis=1), axis=1), N - 1)
+
+METHODS = {'lttb': lttb, 'minmax': minmax}
+
+#positions in x of the points of every row to draw for the visible range [x0, x1] (None:
+#unbounded), at most n per row (rows x points), each row keeps its own positions
+def downsample(x, Y, n=MAX_POINTS, x0=None, x1=None, method='lttb'):
+    Y = np.atleast_2d(Y)
+    visible = window(x, x0, x1)
+    return METHODS[method](x[visible], Y[:, visible], n) + visible.start
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Ukur waktu downsampling deret waktu sintetis per sektor")
+    parser.add_argument('--series', type=int, default=18, help="jumlah deret (sektor)")
+    parser.add_argument('--length', type=int, nargs='+', default=[120, 10000, 100000, 500000], help="titik per deret")
+    parser.add_argument('--points', type=int, default=MAX_POINTS)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print("{:>10} {:>10} {:>12} {:>12}".format('titik', 'keluaran', 'lttb ms', 'minmax ms'))
+    for length in args.length:
+        x = np.arange(length, dtype=float)
+        Y = rng.standard_normal((args.series, length)).cumsum(axis=1)
+        timings = []
+        for method in ('lttb', 'minmax'):
+            started = time.perf_counter()
+            kept = downsample(x, Y, args.points, method=method)
+            timings.append((time.perf_counter() - started) * 1000)
+        print("{:>10} {:>10} {:>12.1f} {:>12.1f}".format(length, kept.shape[1], *timings))
@@ -0,0 +1,157 @@
+import hashlib
+import json
+import math
+import numpy as np
+import prediction
+from controls import econSector
+from prediction import encode_features, file_hash
+
+#contributions are reported for these input groups. The pandemic flag is constant in every
+#scenario and is counted with the sector effect, so 5 groups give 32 coalitions
+GROUPS = ['Penyaluran Kredit', 'Inflasi', 'Pertumbuhan Ekonomi', 'Pengangguran', 'Sektor Ekonomi']
+N_GROUPS = len(GROUPS)
+N_COALITIONS = 2 ** N_GROUPS
+ALL = N_COALITIONS - 1
+
+#group of each model input column: log credit, pandemic, Inflasi, EconGrowth, Unemployment, sector dummies
+featureGroup = np.array([0, 4, 1, 2, 3] + [4] * len(econSector))
+
+#coalition bitmasks: bits[S, g] is set when group g is in coalition S
+bits = (np.arange(N_COALITIONS)[:, None] >> np.arange(N_GROUPS)[None, :]) & 1
+
+#shapley weights so that contributions = v @ shapleyWeights, v being the value of every coalition
+def _shapley_weights():
+    weights = np.zeros((N_COALITIONS, N_GROUPS))
+    for S in range(N_COALITIONS):
+        size = bits[S].sum()
+        for g in range(N_GROUPS):
+            if not bits[S, g]:
+                w = math.factorial(size) * math.factorial(N_GROUPS - size - 1) / math.factorial(N_GROUPS)
+                weights[S | (1 << g), g] += w
+                weights[S, g] -= w
+    return weights
+
+shapleyWeights = _shapley_weights()
+
+#every subset of a bitmask of groups
+def _subsets(groups):
+    return [S for S in range(N_COALITIONS) if S & groups == S]
+
+#exact group attribution of a fitted forest with the tree path-dependent expectation of TreeSHAP:
+#for a coalition S a tree follows the input at splits on groups in S and averages both children
+#by training cover elsewhere. A leaf's weight is then the product over its path of an indicator
+#(group in S) or a cover fraction (group not in S), so every tree of the forest is handled by one
+#level-by-level pass over the concatenated nodes and the 32 coalition values by a few matrix products
+class TreeExplainer:
+    def __init__(self, model):
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        self.n_trees = len(trees)
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+        left = np.concatenate([np.where(t.children_left >= 0, t.children_left + o, -1) for t, o in zip(trees, offsets)])
+        right = np.concatenate([np.where(t.children_right >= 0, t.children_right + o, -1) for t, o in zip(trees, offsets)])
+        feature = np.concatenate([t.feature for t in trees])
+        threshold = np.concatenate([t.threshold for t in trees])
+        cover = np.concatenate([t.weighted_n_node_samples for t in trees])
+        value = np.concatenate([t.value[:, 0, 0] for t in trees])
+
+        #nodes of all trees renumbered depth by depth, the children of a depth's internal nodes
+        #are stored as a block of left children followed by a block of right children
+        order, self.levels = [], []
+        nodes, start = offsets[:-1], 0
+        self.n_roots = len(nodes)
+        while len(nodes):
+            order.append(nodes)
+            internal = np.flatnonzero(left[nodes] >= 0)
+            parents = nodes[internal]
+            start += len(nodes)
+            if len(parents):
+                self.levels.append((start - len(nodes) + internal, start, start + len(parents),
+                                    feature[parents], threshold[parents],
+                                    (ALL ^ (1 << featureGroup[feature[parents]])).astype(np.uint8)[:, None]))
+            nodes = np.concatenate([left[parents], right[parents]])
+        order = np.concatenate(order)
+        self.n_nodes = len(order)
+        self.leaves = np.flatnonzero(left[order] < 0)
+
+        #cover fraction product per group along each path
+        R = np.ones((self.n_nodes, N_GROUPS))
+        for parents, left_start, right_start, level_feature, _, _ in self.levels:
+            group = featureGroup[level_feature]
+            n = len(parents)
+            for children in (np.arange(left_start, left_start + n), np.arange(right_start, right_start + n)):
+                R[children] = R[parents]
+                R[children, group] *= cover[order[children]] / cover[order[parents]]
+
+        #leafValue[T, leaf]: leaf value times the cover fractions of the groups in T
+        leafR = R[self.leaves]
+        self.leafValue = np.ascontiguousarray(
+            (value[order[self.leaves], None] * np.where(bits[None, :, :], leafR[:, None, :], 1).prod(axis=2)).T)
+
+    #value of every coalition (n x 32) for encoded rows X
+    def coalition_values(self, X):
+        #the forest compares float32 inputs against its thresholds
+        X = np.asarray(X, dtype=np.float32)
+        Xt = np.ascontiguousarray(X.T)
+        n = len(X)
+        #bitmask of the groups whose splits along the path all agree with the row
+        mask = np.empty((self.n_nodes, n), dtype=np.uint8)
+        mask[:self.n_roots] = ALL
+        for parents, left_start, right_start, feature, threshold, keep in self.levels:
+            go_left = Xt[feature] <= threshold[:, None]
+            parent = mask[parents]
+            cut = parent & keep
+            mask[left_start:left_start + len(parents)] = np.where(go_left, parent, cut)
+            mask[right_start:right_start + len(parents)] = np.where(go_left, cut, parent)
+
+        #v(S) sums, over leaves whose mask contains S, the leaf value times the cover fractions of the
+        #groups outside S. Groups with identical inputs in every row (the macro variables of a scenario)
+        #have the same mask bits for all rows, so for each subset of the remaining groups the
+        #coalitions are one (coalitions x leaves) @ (leaves x rows) product
+        leaf_mask = mask[self.leaves]
+        shared = 0
+        for g in range(N_GROUPS):
+            columns = X[:, featureGroup == g]
+            if (columns == columns[0]).all():
+                shared |= 1 << g
+        shared_mask = leaf_mask[:, 0] & shared
+
+        v = np.zeros((N_COALITIONS, n))
+        for own in _subsets(ALL ^ shared):
+            coalitions = [own | part for part in _subsets(shared)]
+            weights = np.stack([((shared_mask & S) == (S & shared)) * self.leafValue[ALL ^ S] for S in coalitions])
+            if own == 0:
+                v[coalitions] = weights.sum(axis=1)[:, None]
+            else:
+                v[coalitions] = weights @ ((leaf_mask & own) == own).astype(float)
+        return v.T / self.n_trees
+
+    #expected model output and per-group contributions (n x 5), which add up to the prediction
+    def explain(self, X):
+        v = self.coalition_values(X)
+        return v[:, 0], v @ shapleyWeights
+
+    #contributions for the 18 sectors of one scenario
+    def explain_sectors(self, credits, inflasi, econ_growth, unemployment):
+        return self.explain(encode_features(credits, inflasi, econ_growth, unemployment, np.arange(len(econSector))))
+
+#the code stored contributions were computed with, so attributions persisted in the scenario
+#store are not served after the explainer or feature encoding change
+CODE_VERSION = hashlib.sha1((file_hash(__file__) + file_hash(prediction.__file__)).encode()).hexdigest()[:16]
+
+def explanation_key(model_version, econ_growth, inflasi, unemployment, credits):
+    canonical = json.dumps(['explanation', model_version, CODE_VERSION, float(econ_growth), float(inflasi), float(unemployment),
+                            [float(c) for c in credits]], separators=(',', ':'))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:20]
+
+#contributions of one scenario, cached in the shared scenario store
+def load_or_explain(store, explainer, model_version, econ_growth, inflasi, unemployment, credits):
+    key = explanation_key(model_version, econ_growth, inflasi, unemployment, credits)
+    stored = store.get(key)
+    if stored is not None:
+        return stored['outputs']
+
+    base, contributions = explainer.explain_sectors(credits, inflasi, econ_growth, unemployment)
+    outputs = {'base': base.tolist(), 'contributions': contributions.tolist()}
+    store.put(key, {'kind': 'explanation', 'model': model_version, 'EconGrowth': econ_growth, 'Inflasi': inflasi,
+                    'Unemployment': unemployment, 'credits': list(credits)}, outputs)
+    return outputs
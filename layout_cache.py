@@ -0,0 +1,74 @@
+import hashlib
+import json
+import os
+import pathlib
+import sys
+import flask
+import plotly
+import dash
+import dash_html_components as html
+
+# get relative cache folder
+PATH = pathlib.Path(__file__).parent
+CACHE_PATH = PATH.joinpath("cache").resolve()
+
+#set to 0 to build the layout on every start and let dash serialize it on every page load, as
+#without the cache (bench_startup compares both)
+CACHE_ENV = "LAYOUT_CACHE"
+
+#stands for the scheme and host of the request (flask host_url) in layout text, the cached
+#layout is shared by every host the app is reached on and filled in when it is served
+HOST_URL = "{host_url}/"
+
+#the app's own modules loaded so far, the files next to this one. Matched on the module paths as
+#python set them (absolute, from sys.path) so the thousands of library modules cost a string
+#compare each, resolving every path would add about 100 ms to each start
+def _app_modules():
+    app_dir = os.path.abspath(os.path.dirname(__file__))
+    files = set()
+    for module in list(sys.modules.values()):
+        path = getattr(module, '__file__', None)
+        if path and path.endswith('.py') and os.path.dirname(path) == app_dir:
+            files.add(pathlib.Path(path))
+    return sorted(files)
+
+#the layout only changes with what it is built from: the given parts (dataset, model), the code
+#of every app module loaded when the key is taken, and the dash and plotly versions serializing it.
+#Take the key after everything the layout is built with has been imported
+def layout_key(*parts):
+    code = [(f.name, hashlib.sha1(f.read_bytes()).hexdigest()) for f in _app_modules()]
+    return hashlib.sha1(json.dumps([str(p) for p in parts] + code + [dash.__version__, plotly.__version__]).encode()).hexdigest()[:20]
+
+#Dash app that serves its layout as JSON serialized once and cached on disk, so a restarted
+#worker neither builds the component tree nor encodes it again on every page load
+class CachedLayoutDash(dash.Dash):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._layout_json = None
+
+    def cache_layout(self, build, key, cache_path=CACHE_PATH):
+        if os.environ.get(CACHE_ENV) == "0":
+            self.layout = build()
+            return
+        cache_file = pathlib.Path(cache_path).joinpath("layout-{}.json".format(key))
+        if cache_file.exists():
+            self._layout_json = cache_file.read_bytes()
+            #the tree is not needed to serve it, Dash only checks that a layout is set. The
+            #browser still validates the callbacks against the layout it receives
+            self.layout = html.Div()
+            return
+
+        #dash checks the layout when it is set and again before the first request
+        layout = build()
+        self.layout = layout
+        self._layout_json = json.dumps(layout, cls=plotly.utils.PlotlyJSONEncoder).encode()
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(".tmp{}".format(os.getpid()))
+        tmp_file.write_bytes(self._layout_json)
+        os.replace(tmp_file, cache_file)
+
+    def serve_layout(self):
+        if self._layout_json is None:
+            return super().serve_layout()
+        layout_json = self._layout_json.replace(HOST_URL.encode(), flask.request.host_url.encode())
+        return flask.Response(layout_json, mimetype="application/json")
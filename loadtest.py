@@ -0,0 +1,348 @@
+import argparse
+import http.client
+import json
+import os
+import random
+import threading
+import time
+import urllib.parse
+from collections import defaultdict
+
+#component types that analysts interact with, and how an edit of each is generated
+EDITABLE = {'Slider', 'RangeSlider', 'Dropdown', 'Input', 'RadioItems'}
+
+class Client:
+    def __init__(self, base_url, timeout=60):
+        url = urllib.parse.urlsplit(base_url)
+        self.host, self.port = url.hostname, url.port or 80
+        self.timeout = timeout
+        self.conn = None
+
+    #keep-alive connection per virtual user, reopened when the server closes it
+    def request(self, method, path, body=None):
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.conn.request(method, path, body=body, headers=headers)
+                response = self.conn.getresponse()
+                data = response.read()
+                if response.getheader('Connection', '').lower() == 'close':
+                    self.conn.close()
+                    self.conn = None
+                return response.status, data
+            except (http.client.HTTPException, ConnectionError, OSError):
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    raise
+
+#component props from the layout, plus the tab each component lives in
+def walk_layout(node, components, tab=None):
+    if isinstance(node, list):
+        for child in node:
+            walk_layout(child, components, tab)
+    elif isinstance(node, dict) and 'props' in node:
+        props = node['props']
+        if node.get('type') == 'Tab':
+            tab = props.get('label')
+        if 'id' in props:
+            components[props['id']] = {'type': node.get('type'), 'props': dict(props), 'tab': tab}
+        for value in props.values():
+            if isinstance(value, (dict, list)):
+                walk_layout(value, components, tab)
+
+def split_outputs(output):
+    outputs = output[2:-2].split('...') if output.startswith('..') else [output]
+    return [dict(zip(('id', 'property'), o.rsplit('.', 1))) for o in outputs]
+
+class App:
+    def __init__(self, base_url):
+        client = Client(base_url)
+        self.components = {}
+        walk_layout(json.loads(client.request('GET', '/_dash-layout')[1]), self.components)
+        dependencies = json.loads(client.request('GET', '/_dash-dependencies')[1])
+        self.callbacks = [dep for dep in dependencies if not dep.get('clientside_function')]
+        self.dependents = defaultdict(list)
+        self.produced = set()
+        for dep in self.callbacks:
+            for inp in dep['inputs']:
+                self.dependents[(inp['id'], inp['property'])].append(dep)
+            self.produced.update((o['id'], o['property']) for o in split_outputs(dep['output']))
+        #scenario tabs diff their fields in the browser and send them through a <slot>-delta store
+        self.slots = {}
+        self.diffs = {}
+        self.initial_slots = []
+        for dep in dependencies:
+            output = split_outputs(dep['output'])[0]['id']
+            if dep.get('clientside_function') and output.endswith('-delta'):
+                slot, fields = output[:-len('-delta')], [x['id'] for x in dep['inputs']]
+                self.slots[slot] = fields
+                if not dep.get('prevent_initial_call'):
+                    self.initial_slots.append(slot)
+                for field in fields:
+                    self.diffs[(field, 'value')] = slot
+        self.tabs = sorted({c['tab'] for c in self.components.values() if c['tab']})
+        self.editable = defaultdict(list)
+        for cid, comp in self.components.items():
+            if comp['type'] in EDITABLE and (self.dependents.get((cid, 'value')) or (cid, 'value') in self.diffs):
+                self.editable[comp['tab']].append(cid)
+
+#one analyst: loads the page, then edits inputs of the active tab and switches tabs.
+#Tab switches render client side in this layout, they only change which inputs get edited next
+class Session:
+    def __init__(self, app, base_url, stats, rng):
+        self.app = app
+        self.client = Client(base_url)
+        self.stats = stats
+        self.rng = rng
+        self.values = {(cid, prop): value for cid, comp in app.components.items() for prop, value in comp['props'].items()}
+        self.sent = {}
+        self.tab = rng.choice(app.tabs)
+
+    #same steps as DIFF_JS in app.py: only fields changed since the snapshot the server confirmed
+    def diff(self, slot):
+        values = {f: self.values.get((f, 'value')) for f in self.app.slots[slot]}
+        sent = self.sent.get(slot, {})
+        patch = self.values.get((slot + '-patch', 'data'))
+        token = sent.get('token') or "{:x}".format(self.rng.getrandbits(48))
+        seq = sent.get('seq', 0) + 1
+        history = sent.get('history', {})
+        base = None
+        if patch and not patch.get('resync') and not patch.get('refine') and patch.get('token') == token and patch.get('seq') in history:
+            base = patch['seq']
+        kept = {s: v for s, v in history.items() if base is not None and s >= base}
+        changed = {f: v for f, v in values.items() if base is None or history[base][f] != v}
+        kept[seq] = values
+        self.sent[slot] = {'token': token, 'seq': seq, 'history': kept}
+        self.values[(slot + '-delta', 'data')] = {'token': token, 'seq': seq, 'base': base, 'changed': changed}
+        return (slot + '-delta', 'data')
+
+    def fire(self, dep, changed):
+        spec = lambda x: {'id': x['id'], 'property': x['property'], 'value': self.values.get((x['id'], x['property']))}
+        outputs = split_outputs(dep['output'])
+        body = json.dumps({'output': dep['output'], 'outputs': outputs if len(outputs) > 1 else outputs[0],
+                           'inputs': [spec(x) for x in dep['inputs']], 'state': [spec(x) for x in dep['state']],
+                           'changedPropIds': changed})
+        started = time.perf_counter()
+        status, data = self.client.request('POST', '/_dash-update-component', body)
+        self.stats.record(outputs[0]['id'], time.perf_counter() - started, status)
+        if status != 200:
+            return []
+        #apply the response like the renderer does and report what changed
+        updated = []
+        for cid, props in json.loads(data).get('response', {}).items():
+            for prop, value in props.items():
+                self.values[(cid, prop)] = value
+                updated.append((cid, prop))
+                #clientside render of a scenario patch, estimated patches are passed on for refinement
+                if cid.endswith('-patch') and prop == 'data':
+                    for name, output in (value or {}).get('outputs', {}).items():
+                        self.values[tuple(name.rsplit('.', 1))] = output
+                    if (value or {}).get('refine'):
+                        refine = (cid[:-len('-patch')] + '-refine', 'data')
+                        self.values[refine] = value
+                        updated.append(refine)
+                #a refinement only applies to the patch still on display
+                if cid.endswith('-refined') and prop == 'data':
+                    patch = self.values.get((cid[:-len('-refined')] + '-patch', 'data')) or {}
+                    if (patch.get('token'), patch.get('seq')) == (value.get('token'), value.get('seq')):
+                        for name, output in value.get('outputs', {}).items():
+                            self.values[tuple(name.rsplit('.', 1))] = output
+        return updated
+
+    #fire the callbacks of the changed props, then callbacks chained on their outputs
+    def propagate(self, changed):
+        queue = list(changed)
+        seen = set()
+        while queue:
+            key = queue.pop(0)
+            if key in self.app.diffs:
+                queue.append(self.diff(self.app.diffs[key]))
+                continue
+            for dep in self.app.dependents.get(key, []):
+                if dep['output'] in seen:
+                    continue
+                seen.add(dep['output'])
+                queue.extend(self.fire(dep, ["{}.{}".format(*key)]))
+
+    def load_page(self):
+        for path in ['/', '/_dash-layout', '/_dash-dependencies']:
+            started = time.perf_counter()
+            status, _ = self.client.request('GET', path)
+            self.stats.record('GET ' + path, time.perf_counter() - started, status)
+        #initial callbacks, then those chained on their outputs as the renderer orders them
+        for slot in self.app.initial_slots:
+            self.diff(slot)
+        updated = []
+        for dep in self.app.callbacks:
+            inputs = [(x['id'], x['property']) for x in dep['inputs']]
+            if not dep.get('prevent_initial_call') and not any(key in self.app.produced for key in inputs):
+                updated.extend(self.fire(dep, ["{}.{}".format(*key) for key in inputs]))
+        self.propagate(updated)
+
+    def edit(self, cid):
+        comp = self.app.components[cid]
+        props = comp['props']
+        value = self.values.get((cid, 'value'))
+        if comp['type'] in ('Slider', 'RangeSlider'):
+            marks = sorted(int(m) for m in props.get('marks', {})) or list(range(props['min'], props['max'] + 1))
+            picks = sorted(self.rng.sample(marks, 2)) if comp['type'] == 'RangeSlider' else self.rng.choice(marks)
+            value = picks
+        elif comp['type'] == 'Dropdown' and props.get('multi'):
+            options = [o['value'] for o in props['options']]
+            value = self.rng.sample(options, self.rng.randint(1, len(options)))
+        elif comp['type'] in ('Dropdown', 'RadioItems'):
+            value = self.rng.choice(props['options'])['value']
+        elif isinstance(value, (int, float)):
+            value = round(value * self.rng.uniform(0.8, 1.2), 2) if value else self.rng.uniform(0, 5)
+        else:
+            return
+        self.values[(cid, 'value')] = value
+        self.propagate([(cid, 'value')])
+
+    def run(self, actions, think):
+        self.load_page()
+        for _ in range(actions):
+            time.sleep(self.rng.expovariate(1 / think) if think > 0 else 0)
+            if self.rng.random() < 0.15 or not self.app.editable.get(self.tab):
+                self.tab = self.rng.choice(self.app.tabs)
+                continue
+            self.edit(self.rng.choice(self.app.editable[self.tab]))
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, name, seconds, status):
+        with self.lock:
+            self.latency[name].append(seconds)
+            if status not in (200, 204):
+                self.errors[name] += 1
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+#cpu ticks and resident memory of the app's worker processes, read from /proc
+def _children(pid):
+    children = []
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open('/proc/{}/stat'.format(entry)) as f:
+                    if int(f.read().rsplit(')', 1)[1].split()[1]) == pid:
+                        children.append(int(entry))
+            except (OSError, IndexError, ValueError):
+                pass
+    return children
+
+def worker_pids(pids, parents):
+    found = set(pids)
+    for parent in parents:
+        found.add(parent)
+        queue = [parent]
+        while queue:
+            for child in _children(queue.pop()):
+                found.add(child)
+                queue.append(child)
+    return sorted(found)
+
+def sample_process(pid):
+    try:
+        with open('/proc/{}/stat'.format(pid)) as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        with open('/proc/{}/status'.format(pid)) as f:
+            rss = next(int(line.split()[1]) for line in f if line.startswith('VmRSS'))
+    except (OSError, StopIteration):
+        return None
+    return int(fields[11]) + int(fields[12]), rss * 1024
+
+class ProcessMonitor(threading.Thread):
+    def __init__(self, pids, interval=0.5):
+        super().__init__(daemon=True)
+        self.pids = pids
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.first = {pid: sample_process(pid) for pid in pids}
+        self.peak_rss = defaultdict(int)
+        self.started = time.time()
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            for pid in self.pids:
+                sample = sample_process(pid)
+                if sample:
+                    self.peak_rss[pid] = max(self.peak_rss[pid], sample[1])
+
+    def stop(self):
+        self.stop_event.set()
+        elapsed = time.time() - self.started
+        ticks = os.sysconf('SC_CLK_TCK')
+        report = {}
+        for pid in self.pids:
+            first, last = self.first.get(pid), sample_process(pid)
+            if first and last:
+                report[pid] = ((last[0] - first[0]) / ticks / elapsed * 100, max(self.peak_rss[pid], last[1]))
+        return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Uji beban dashboard: memutar ulang sesi analis terhadap aplikasi lokal")
+    parser.add_argument('--url', default='http://127.0.0.1:8050')
+    parser.add_argument('--concurrency', type=int, default=10, help="jumlah sesi analis bersamaan")
+    parser.add_argument('--sessions', type=int, default=50, help="total sesi yang diputar")
+    parser.add_argument('--actions', type=int, default=20, help="interaksi per sesi")
+    parser.add_argument('--think', type=float, default=0.5, help="rata-rata jeda antar interaksi (detik)")
+    parser.add_argument('--pid', type=int, action='append', default=[], help="pid worker yang dipantau")
+    parser.add_argument('--parent', type=int, action='append', default=[],
+                        help="pid induk (mis. master gunicorn), seluruh turunannya ikut dipantau")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    app = App(args.url)
+    stats = Stats()
+    monitor = ProcessMonitor(worker_pids(args.pid, args.parent))
+    monitor.start()
+
+    counter = iter(range(args.sessions))
+    counter_lock = threading.Lock()
+    def user():
+        while True:
+            with counter_lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            Session(app, args.url, stats, random.Random(args.seed * 1000003 + i)).run(args.actions, args.think)
+
+    started = time.time()
+    users = [threading.Thread(target=user) for _ in range(args.concurrency)]
+    for t in users:
+        t.start()
+    for t in users:
+        t.join()
+    elapsed = time.time() - started
+    processes = monitor.stop()
+
+    total = sum(len(v) for v in stats.latency.values())
+    print("{} permintaan dalam {:.1f} detik, {:.1f} permintaan/detik, {} sesi x {} interaksi, konkurensi {}".format(
+        total, elapsed, total / elapsed, args.sessions, args.actions, args.concurrency))
+    print("{:<48} {:>7} {:>6} {:>9} {:>9} {:>9}".format('callback', 'n', 'error', 'p50 ms', 'p95 ms', 'p99 ms'))
+    everything = []
+    for name in sorted(stats.latency):
+        values = stats.latency[name]
+        everything.extend(values)
+        print("{:<48} {:>7} {:>6} {:>9.1f} {:>9.1f} {:>9.1f}".format(
+            name[:48], len(values), stats.errors[name],
+            percentile(values, 50)*1000, percentile(values, 95)*1000, percentile(values, 99)*1000))
+    if everything:
+        print("{:<48} {:>7} {:>6} {:>9.1f} {:>9.1f} {:>9.1f}".format(
+            'semua', len(everything), sum(stats.errors.values()),
+            percentile(everything, 50)*1000, percentile(everything, 95)*1000, percentile(everything, 99)*1000))
+    for pid, (cpu, rss) in sorted(processes.items()):
+        print("pid {:>7}  cpu {:6.1f} %  rss puncak {:8.1f} MiB".format(pid, cpu, rss / 2**20))
+
+if __name__ == '__main__':
+    main()
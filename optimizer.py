@@ -0,0 +1,101 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from controls import econSector
+from prediction import MODEL_FILE, encode_features, init_worker, worker_model
+from scenario import ijp_tariff, loss_limit, scenario_totals, sector_ijp_budget
+
+N_SECTORS = len(econSector)
+
+#processes used by the dashboard to evaluate candidates, 1 evaluates in the calling process
+WORKERS = os.cpu_count() or 1
+
+def _predict_chunk(credits, inflasi, econ_growth, unemployment):
+    return predict_allocations(worker_model(), credits, inflasi, econ_growth, unemployment)
+
+#projected NPL ratio of every sector for n candidate allocations (n x 18 credits) in one model call
+def predict_allocations(model, credits, inflasi, econ_growth, unemployment):
+    n = credits.shape[0]
+    X = encode_features(credits.ravel(), inflasi, econ_growth, unemployment, np.tile(np.arange(N_SECTORS), n))
+    return model.predict(X).reshape(n, N_SECTORS)
+
+#shared pool for the dashboard, created on first use so idle workers cost nothing
+_pool = None
+
+def get_pool(workers, model_file=MODEL_FILE):
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(model_file,))
+    return _pool
+
+#project each candidate onto {lower <= x <= upper, sum(x) = total} by bisection on a common shift
+def project_allocations(credits, lower, upper, total, n_iter=50):
+    lo_shift = (lower - credits).min(axis=1, keepdims=True)
+    hi_shift = (upper - credits).max(axis=1, keepdims=True)
+    for _ in range(n_iter):
+        shift = (lo_shift + hi_shift) / 2
+        over = np.clip(credits + shift, lower, upper).sum(axis=1, keepdims=True) > total
+        hi_shift = np.where(over, shift, hi_shift)
+        lo_shift = np.where(over, lo_shift, shift)
+    return np.clip(credits + (lo_shift + hi_shift) / 2, lower, upper)
+
+#cross-entropy search over sector allocations of total_credit within per-sector bounds.
+#candidates within budget (IJP budget + loss limit) always rank above those over it, then by the
+#objective: projected total NPL value ('npl', with the pooled IJP budget) or the IJP budget with
+#each sector priced on its own NPL ratio ('ijp', which the budget then applies to as well). The
+#pooled IJP budget is a fixed linear function of the total NPL value at a given total credit, so
+#minimizing it would rank allocations exactly as 'npl' does
+def optimize_allocation(model, econ_growth, inflasi, unemployment, total_credit, budget,
+                        lower, upper, start=None, objective='npl', n_candidates=2000,
+                        n_iter=20, elite_frac=0.05, pool=None, workers=1, seed=0):
+    started = time.time()
+    lower = np.asarray(lower, dtype=float)
+    upper = np.asarray(upper, dtype=float)
+    if lower.sum() > total_credit or upper.sum() < total_credit or (lower > upper).any():
+        raise ValueError("batas penyaluran per sektor tidak dapat memenuhi total kredit")
+
+    rng = np.random.default_rng(seed)
+    start = (lower + upper) / 2 if start is None else np.asarray(start, dtype=float)
+    mean = project_allocations(start[None, :] * total_credit / start.sum(), lower, upper, total_credit)[0]
+    std = (upper - lower) / 4
+    n_elite = max(2, int(n_candidates * elite_frac))
+    best = None
+
+    for _ in range(n_iter):
+        candidates = project_allocations(mean + std * rng.standard_normal((n_candidates, N_SECTORS)),
+                                         lower, upper, total_credit)
+        if best is not None:
+            candidates[0] = best
+        percent_npl = evaluate_allocations(model, candidates, inflasi, econ_growth, unemployment, pool, workers)
+
+        npl_value = (candidates * percent_npl).sum(axis=1)
+        if objective == 'npl':
+            ijp_budget = ijp_tariff(npl_value / total_credit * 100) * total_credit / 100
+        else:
+            ijp_budget = sector_ijp_budget(candidates, percent_npl)
+        cost = ijp_budget + loss_limit(total_credit)
+        score = npl_value if objective == 'npl' else ijp_budget
+        over_budget = np.maximum(cost - budget, 0)
+        order = np.lexsort((score, over_budget))
+
+        elites = candidates[order[:n_elite]]
+        best = candidates[order[0]].copy()
+        mean = elites.mean(axis=0)
+        std = np.maximum(elites.std(axis=0), (upper - lower) * 1e-4)
+
+    result = scenario_totals(best, percent_npl[order[0]])
+    result['sector_ijp_budget'] = float(sector_ijp_budget(best, percent_npl[order[0]]))
+    result['cost'] = result['ijp_budget' if objective == 'npl' else 'sector_ijp_budget'] + result['loss_limit_budget']
+    result['feasible'] = bool(result['cost'] <= budget)
+    result['evaluated'] = n_candidates * n_iter
+    result['seconds'] = time.time() - started
+    return result
+
+#batched predictions for all candidates, split across the pool when one is given
+def evaluate_allocations(model, candidates, inflasi, econ_growth, unemployment, pool=None, workers=1):
+    if pool is None or workers <= 1:
+        return predict_allocations(model, candidates, inflasi, econ_growth, unemployment)
+    chunks = np.array_split(candidates, workers)
+    futures = [pool.submit(_predict_chunk, chunk, inflasi, econ_growth, unemployment) for chunk in chunks]
+    return np.vstack([future.result() for future in futures])
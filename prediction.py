@@ -0,0 +1,63 @@
+import hashlib
+import pathlib
+import pickle
+import numpy as np
+from controls import econSector
+
+# get relative model folder
+PATH = pathlib.Path(__file__).parent
+MODEL_PATH = PATH.joinpath("model").resolve()
+MODEL_FILE = MODEL_PATH.joinpath("penjaminan_predictive_UMKM_2.sav")
+
+#the model was trained with alphabetically sorted sector dummies after the 5 numeric features:
+#log credit, pandemic flag, Inflasi, EconGrowth, Unemployment
+sectorDummy = np.array([sorted(econSector).index(s) for s in econSector])
+#column of the model input that holds each sector's dummy, inverted to find the sector of a row
+dummySector = np.argsort(sectorDummy)
+N_NUMERIC = 5
+N_FEATURES = N_NUMERIC + len(econSector)
+
+def load_model(path=MODEL_FILE):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+#one model per worker process of a pool created with initializer=init_worker, loaded once and
+#read by the tasks with worker_model()
+_worker_model = None
+
+def init_worker(model_file=MODEL_FILE):
+    global _worker_model
+    _worker_model = load_model(model_file)
+
+def worker_model():
+    return _worker_model
+
+#content hash used to key every on-disk cache on the model and dataset actually loaded
+def file_hash(path, chunk_size=1 << 20):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+#build the model input matrix for any number of rows at once.
+#arguments broadcast against each other: credit is in Rupiah, sector is the econSector index
+def encode_features(credit, inflasi, econ_growth, unemployment, sector, pandemic=1):
+    credit, inflasi, econ_growth, unemployment, sector, pandemic = np.broadcast_arrays(
+        np.asarray(credit, dtype=float), np.asarray(inflasi, dtype=float),
+        np.asarray(econ_growth, dtype=float), np.asarray(unemployment, dtype=float),
+        np.asarray(sector, dtype=int), np.asarray(pandemic, dtype=float))
+    n = credit.size
+    X = np.zeros((n, N_FEATURES))
+    X[:, 0] = np.log(credit.ravel())
+    X[:, 1] = pandemic.ravel()
+    X[:, 2] = inflasi.ravel()
+    X[:, 3] = econ_growth.ravel()
+    X[:, 4] = unemployment.ravel()
+    X[np.arange(n), N_NUMERIC + sectorDummy[sector.ravel()]] = 1
+    return X
+
+#projected NPL ratio of the 18 sectors in one model call
+def predict_sectors(model, credits, inflasi, econ_growth, unemployment):
+    return model.predict(encode_features(credits, inflasi, econ_growth, unemployment,
+                                         np.arange(len(econSector))))
@@ -0,0 +1,111 @@
+import argparse
+import time
+import numpy as np
+from controls import econSector
+from prediction import MODEL_FILE, encode_features, load_model
+
+#seconds the estimate of a progressive prediction may spend on trees
+LATENCY_BUDGET = 0.02
+
+#fewest trees an estimate is made from, the spread of fewer says little about the error
+MIN_TREES = 8
+
+#estimates are shown with this many standard errors either side (95 %)
+Z = 1.96
+
+#cost per tree is measured on this many rows, one per sector as in an interactive scenario
+CALIBRATION_ROWS = len(econSector)
+
+#a fitted random forest evaluated tree by tree. predict is the full ensemble (the same sum in the
+#same order as sklearn, without its thread pool overhead on small inputs), estimate evaluates only
+#the first trees that fit a latency budget. The trees of a forest are independent draws, so the
+#first k are a random subset and their mean an unbiased estimate of the full forest
+class ProgressiveForest:
+    def __init__(self, model, budget=LATENCY_BUDGET, min_trees=MIN_TREES):
+        self.model = model
+        self.trees = [estimator.tree_ for estimator in model.estimators_]
+        self.n_trees = len(self.trees)
+        self.budget = budget
+        self.min_trees = min(min_trees, self.n_trees)
+        self.seconds_per_tree = None
+        self.tree_predictions(np.zeros((CALIBRATION_ROWS, model.n_features_in_)), 0, self.min_trees)
+
+    #predictions of trees [start, stop) for encoded rows X (trees x rows). Calls on interactive
+    #sized inputs keep a running measure of the cost per tree the budget is converted with
+    def tree_predictions(self, X, start=0, stop=None):
+        #the forest compares float32 inputs against its thresholds
+        X = np.asarray(X, dtype=np.float32)
+        trees = self.trees[start:stop]
+        started = time.perf_counter()
+        predictions = np.empty((len(trees), len(X)))
+        for i, tree in enumerate(trees):
+            predictions[i] = tree.predict(X)[:, 0]
+        if trees and len(X) <= CALIBRATION_ROWS:
+            seconds = (time.perf_counter() - started) / len(trees)
+            self.seconds_per_tree = seconds if self.seconds_per_tree is None else 0.8 * self.seconds_per_tree + 0.2 * seconds
+        return predictions
+
+    def predict(self, X):
+        total = np.zeros(len(X))
+        for prediction in self.tree_predictions(X):
+            total += prediction
+        return total / self.n_trees
+
+    #trees an estimate can evaluate within the budget, all of them when the forest fits
+    def trees_for_budget(self, budget=None):
+        budget = self.budget if budget is None else budget
+        return int(np.clip(budget / self.seconds_per_tree, self.min_trees, self.n_trees))
+
+    def fits_budget(self, budget=None):
+        return self.trees_for_budget(budget) >= self.n_trees
+
+    #predictions of the first trees within the budget (trees x rows), see standard_error
+    def estimate(self, X, budget=None):
+        return self.tree_predictions(X, 0, self.trees_for_budget(budget))
+
+    #standard error of the mean of the given tree predictions (trees x ...) as an estimate of the
+    #full forest. The trees are a sample without replacement from the forest, so it shrinks to 0 at
+    #k = n. Combinations of rows (totals) get theirs from the per tree combination
+    def standard_error(self, predictions):
+        k = len(predictions)
+        if k >= self.n_trees:
+            return np.zeros(predictions.shape[1:])
+        return predictions.std(axis=0, ddof=1) / np.sqrt(k) * np.sqrt((self.n_trees - k) / (self.n_trees - 1))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Ukur waktu dan galat perkiraan progresif forest pada skenario acak")
+    parser.add_argument('--model', default=str(MODEL_FILE))
+    parser.add_argument('--budget', type=float, nargs='+', default=[0.0005, 0.001, 0.002, 0.005, LATENCY_BUDGET],
+                        help="anggaran latensi (detik)")
+    parser.add_argument('--scenarios', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    forest = ProgressiveForest(load_model(args.model))
+    rng = np.random.default_rng(args.seed)
+    scenarios = [encode_features(10 ** rng.uniform(11, 15, len(econSector)), rng.uniform(1, 4), rng.uniform(-5, 6),
+                                 rng.uniform(4, 8), np.arange(len(econSector))) for _ in range(args.scenarios)]
+    started = time.perf_counter()
+    exact = [forest.predict(X) for X in scenarios]
+    full = (time.perf_counter() - started) / len(scenarios)
+    started = time.perf_counter()
+    for X in scenarios:
+        forest.model.predict(X)
+    sklearn = (time.perf_counter() - started) / len(scenarios)
+    print("{} pohon: penuh {:.2f} ms per skenario ({:.2f} ms dengan predict sklearn)".format(forest.n_trees, full*1000, sklearn*1000))
+
+    #the error interval should hold the full forest result in about 95 % of the sectors
+    print("{:>10} {:>8} {:>10} {:>14} {:>14} {:>10}".format('anggaran ms', 'pohon', 'waktu ms', 'galat rata %', 'SE rata %', 'cakupan'))
+    for budget in args.budget:
+        error, se, inside, seconds = [], [], [], []
+        for X, y in zip(scenarios, exact):
+            started = time.perf_counter()
+            predictions = forest.estimate(X, budget)
+            seconds.append(time.perf_counter() - started)
+            e = np.abs(predictions.mean(axis=0) - y)
+            s = forest.standard_error(predictions)
+            error.append(e)
+            se.append(s)
+            inside.append(e <= Z * s + 1e-12)
+        print("{:>10.1f} {:>8} {:>10.2f} {:>14.4f} {:>14.4f} {:>9.1%}".format(
+            budget*1000, len(predictions), np.median(seconds)*1000, np.mean(error)*100, np.mean(se)*100, np.mean(inside)))
@@ -0,0 +1,66 @@
+import hashlib
+import json
+import numpy as np
+import prediction
+from controls import monthCode, econSector
+from prediction import encode_features, file_hash
+
+N_SECTORS = len(econSector)
+
+#month labels of the horizon following the last observed month, e.g. Jul 2020 .. Dec 2020
+def horizon_periods(last_year, last_month, horizon=None):
+    horizon = 11 - last_month if horizon is None else horizon
+    months = last_month + 1 + np.arange(horizon)
+    return ["{} {}".format(monthCode[m % 12], last_year + m // 12) for m in months]
+
+#monthly NPL paths for S scenarios x H months x 18 sectors in one model call.
+#credits: start credits (S x 18, Rupiah), growth: monthly credit growth in percent (S x 18),
+#macro paths: S x H values per month
+def projection_paths(model, credits, growth, inflasi_path, econ_growth_path, unemployment_path):
+    credits = np.atleast_2d(np.asarray(credits, dtype=float))
+    growth = np.atleast_2d(np.asarray(growth, dtype=float))
+    inflasi_path = np.atleast_2d(np.asarray(inflasi_path, dtype=float))
+    econ_growth_path = np.atleast_2d(np.asarray(econ_growth_path, dtype=float))
+    unemployment_path = np.atleast_2d(np.asarray(unemployment_path, dtype=float))
+    n_scenarios, horizon = inflasi_path.shape
+
+    #credit of month h is the start credit compounded h+1 times
+    steps = np.arange(1, horizon + 1)[None, :, None]
+    credit_path = credits[:, None, :] * (1 + growth[:, None, :]/100) ** steps
+
+    X = encode_features(credit_path,
+                        inflasi_path[:, :, None], econ_growth_path[:, :, None], unemployment_path[:, :, None],
+                        np.arange(N_SECTORS)[None, None, :])
+    percent_npl = model.predict(X).reshape(n_scenarios, horizon, N_SECTORS)
+
+    npl_value = credit_path * percent_npl
+    return {
+        'credits': credit_path,
+        'percent_npl': percent_npl,
+        'npl_value': npl_value,
+        'total_npl_percentage': npl_value.sum(axis=2) / credit_path.sum(axis=2) * 100,
+    }
+
+#the code stored paths were computed with, so paths persisted in the scenario store are not
+#served after the projection formulas or feature encoding change
+CODE_VERSION = hashlib.sha1((file_hash(__file__) + file_hash(prediction.__file__)).encode()).hexdigest()[:16]
+
+def projection_key(model_version, credits, growth, inflasi_path, econ_growth_path, unemployment_path):
+    canonical = json.dumps(['projection', model_version, CODE_VERSION] + [
+        np.asarray(v, dtype=float).round(10).tolist()
+        for v in (credits, growth, inflasi_path, econ_growth_path, unemployment_path)], separators=(',', ':'))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:20]
+
+#paths of one scenario, cached in the shared scenario store
+def load_or_project(store, model, model_version, credits, growth, inflasi_path, econ_growth_path, unemployment_path):
+    key = projection_key(model_version, credits, growth, inflasi_path, econ_growth_path, unemployment_path)
+    stored = store.get(key)
+    if stored is not None:
+        return stored['outputs']
+
+    paths = projection_paths(model, credits, growth, [inflasi_path], [econ_growth_path], [unemployment_path])
+    outputs = {name: values[0].tolist() for name, values in paths.items()}
+    store.put(key, {'kind': 'projection', 'model': model_version, 'credits': list(credits), 'growth': list(growth),
+                    'Inflasi': list(inflasi_path), 'EconGrowth': list(econ_growth_path),
+                    'Unemployment': list(unemployment_path)}, outputs)
+    return outputs
@@ -0,0 +1,187 @@
+import argparse
+import csv
+import html
+import itertools
+import json
+import os
+import pathlib
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import plotly.graph_objects as go
+from plotly.offline import get_plotlyjs
+from controls import econSector, sectorColor, sectorTxtColor
+from prediction import init_worker, worker_model
+from scenario import compute_scenario, default_scenario
+from storage import aggregate, DATA_FILE
+
+MACRO_FIELDS = ['EconGrowth', 'Inflasi', 'Unemployment']
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<script src="plotly.min.js"></script>
+<style>
+body {{font-family: sans-serif; margin: 24px;}}
+.cards {{display: flex; flex-wrap: wrap;}}
+.card {{width: 30%; margin: 6px; padding: 12px; border-radius: 5px;}}
+.card h1 {{margin: 4px 0; font-size: 36px;}}
+table.summary td {{padding: 4px 12px;}}
+</style></head>
+<body>
+<h3>{title}</h3>
+{body}
+<p><a href="historis.html">Data historis 2011-2020</a></p>
+<p><b>&copy; 2020 - Inspektorat Jenderal Kementerian Keuangan</b></p>
+</body></html>
+"""
+
+#scenarios are read lazily from a csv (one row per scenario) or a json list.
+#macro fields and sector credits (columns named after econSector) default to the June 2020 values
+def _read_rows(path):
+    path = pathlib.Path(path)
+    if path.suffix == '.json':
+        with open(path) as f:
+            yield from json.load(f)
+    else:
+        with open(path, newline='') as f:
+            yield from csv.DictReader(f)
+
+def read_scenarios(path, defaults):
+    for n, row in enumerate(_read_rows(path)):
+        scenario = {'name': row.get('name') or row.get('nama') or "skenario-{}".format(n+1)}
+        for field in MACRO_FIELDS:
+            value = row.get(field)
+            scenario[field] = float(value) if value not in (None, '') else defaults[field]
+        scenario['credits'] = [float(row[s]) if row.get(s) not in (None, '') else defaults['credits'][i]
+                               for i, s in enumerate(econSector)]
+        yield scenario
+
+def _slug(name):
+    return "".join(c if c.isalnum() or c in '-_' else '-' for c in str(name)).strip('-') or "skenario"
+
+#page file of each scenario, assigned in read order before it is dispatched. Distinct names can
+#share a slug ("a/b" and "a-b", or differ only in case on case-insensitive file systems), later
+#ones get their row number appended so no page overwrites another
+def assign_pages(scenarios):
+    used = set()
+    for n, scenario in enumerate(scenarios):
+        page = _slug(scenario['name'])
+        if page.lower() in used:
+            page = "{}-{}".format(page, n+1)
+            while page.lower() in used:
+                page += "-{}".format(n+1)
+        used.add(page.lower())
+        scenario['page'] = page + ".html"
+        yield scenario
+
+def _sector_cards(result):
+    cards = []
+    for i in range(len(econSector)):
+        cards.append(
+            '<div class="card" style="background-color:{};color:{}"><b>{}</b>'
+            '<p>Penyaluran Kredit Rp {:,.2f}</p><h1>{:,.2f} %</h1><p>Proyeksi NPL Rp {:,.2f}</p></div>'.format(
+                sectorColor[i], sectorTxtColor[i], html.escape(econSector[i]),
+                result['credits'][i], result['percent_npl'][i]*100, result['npl_value'][i]))
+    return '<div class="cards">{}</div>'.format("".join(cards))
+
+def _summary_table(scenario, result):
+    rows = [("Pertumbuhan Ekonomi", "{:,.2f}".format(scenario['EconGrowth'])),
+            ("Tingkat Inflasi", "{:,.2f}".format(scenario['Inflasi'])),
+            ("Tingkat Pengangguran", "{:,.2f}".format(scenario['Unemployment'])),
+            ("Total Penyaluran Kredit UMKM", "Rp {:,.2f}".format(result['total_credit'])),
+            ("Proyeksi Total NPL Kredit UMKM", "{:,.2f} %".format(result['total_npl_percentage'])),
+            ("Proyeksi Total Nilai NPL", "Rp {:,.2f}".format(result['total_npl_val'])),
+            ("Tarif IJP Kredit UMKM", "{:,.2f} %".format(result['ijp_trf'])),
+            ("Anggaran IJP", "Rp {:,.2f}".format(result['ijp_budget'])),
+            ("Anggaran Loss Limit", "Rp {:,.2f}".format(result['loss_limit_budget']))]
+    return '<table class="summary">{}</table>'.format(
+        "".join("<tr><td>{}</td><td><b>{}</b></td></tr>".format(k, v) for k, v in rows))
+
+#compute and render one scenario inside a worker, the page goes straight to disk
+#and only the small summary rows travel back to the parent process
+def render_scenario(scenario, out_dir):
+    result = compute_scenario(worker_model(), scenario['EconGrowth'], scenario['Inflasi'],
+                              scenario['Unemployment'], scenario['credits'])
+
+    fig = go.Figure(go.Bar(x=result['percent_npl']*100, y=econSector, orientation='h'))
+    fig.layout.update({'title': 'Proyeksi Persentase NPL per Sektor Ekonomi', 'height': 600})
+    body = (_summary_table(scenario, result) + _sector_cards(result)
+            + fig.to_html(full_html=False, include_plotlyjs=False))
+
+    page_file = pathlib.Path(out_dir).joinpath(scenario['page'])
+    with open(page_file, "w", encoding="utf-8") as f:
+        f.write(PAGE.format(title=html.escape("Skenario " + str(scenario['name'])), body=body))
+
+    summary = [scenario['name']] + [float(scenario[field]) for field in MACRO_FIELDS] + [
+        float(result[k]) for k in ['total_credit', 'total_npl_percentage', 'total_npl_val',
+                                   'ijp_trf', 'ijp_budget', 'loss_limit_budget']] + [page_file.name]
+    sectors = [[scenario['name'], econSector[i], float(result['credits'][i]),
+                float(result['percent_npl'][i]*100), float(result['npl_value'][i])] for i in range(len(econSector))]
+    return summary, sectors
+
+#historical figures are identical for every scenario, rendered once by the parent
+def render_history(out_dir):
+    summ_df = aggregate(DATA_FILE, by=['Tahun', 'Bulan'])
+    period = summ_df['Bulan'] + " " + summ_df['Tahun'].astype(str)
+    sector_df = aggregate(DATA_FILE, by=['Tahun', 'SektorEkonomi'])
+
+    figs = [go.Figure(go.Scatter(x=period, y=summ_df['valueChannel'], marker=dict(color='#0099ff'))),
+            go.Figure(go.Scatter(x=period, y=summ_df['valueNPL'], marker=dict(color='#6f42c1'))),
+            go.Figure([go.Scatter(x=sector_df[sector_df.SektorEkonomi == s]['Tahun'],
+                                  y=sector_df[sector_df.SektorEkonomi == s]['percentNPL']*100,
+                                  name=s) for s in econSector])]
+    titles = ['Total Penyaluran Kredit (Rp Miliar)', 'Total NPL Kredit (Rp Miliar)',
+              'Rata-rata Persentase NPL per Sektor Ekonomi']
+    for fig, title in zip(figs, titles):
+        fig.layout.update({'title': title})
+    body = "".join(fig.to_html(full_html=False, include_plotlyjs=False) for fig in figs)
+    with open(pathlib.Path(out_dir).joinpath("historis.html"), "w", encoding="utf-8") as f:
+        f.write(PAGE.format(title="Penyaluran dan NPL Kredit UMKM Tahun 2011-2020", body=body))
+
+SUMMARY_HEADER = ['Skenario'] + MACRO_FIELDS + ['Total Penyaluran Kredit', 'Proyeksi NPL (%)',
+                  'Proyeksi Nilai NPL', 'Tarif IJP (%)', 'Anggaran IJP', 'Anggaran Loss Limit', 'Halaman']
+SECTOR_HEADER = ['Skenario', 'Sektor Ekonomi', 'Penyaluran Kredit', 'Proyeksi NPL (%)', 'Proyeksi Nilai NPL']
+
+def generate_reports(scenario_file, out_dir, workers=None, max_pending=None):
+    import openpyxl
+
+    out_dir = pathlib.Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with open(out_dir.joinpath("plotly.min.js"), "w", encoding="utf-8") as f:
+        f.write(get_plotlyjs())
+    render_history(out_dir)
+
+    #write-only workbook appends rows to disk as results arrive
+    wb = openpyxl.Workbook(write_only=True)
+    summary_ws = wb.create_sheet("Ringkasan")
+    sector_ws = wb.create_sheet("Sektor")
+    summary_ws.append(SUMMARY_HEADER)
+    sector_ws.append(SECTOR_HEADER)
+
+    workers = workers or os.cpu_count()
+    max_pending = max_pending or workers * 4
+    scenarios = assign_pages(read_scenarios(scenario_file, default_scenario(DATA_FILE)))
+    start = time.time()
+    done_count = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+        #keep a bounded number of scenarios in flight instead of submitting the whole batch
+        pending = {pool.submit(render_scenario, s, out_dir) for s in itertools.islice(scenarios, max_pending)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                summary, sectors = future.result()
+                summary_ws.append(summary)
+                for row in sectors:
+                    sector_ws.append(row)
+                done_count += 1
+            pending |= {pool.submit(render_scenario, s, out_dir) for s in itertools.islice(scenarios, len(done))}
+
+    wb.save(out_dir.joinpath("ringkasan-skenario.xlsx"))
+    print("{} skenario selesai dalam {:.1f} detik".format(done_count, time.time() - start))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Laporan proyeksi NPL, tarif IJP dan anggaran untuk daftar skenario")
+    parser.add_argument('scenario_file', help="csv atau json berisi skenario")
+    parser.add_argument('--out', default='laporan', help="folder keluaran")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+    generate_reports(args.scenario_file, args.out, args.workers)
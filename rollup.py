@@ -0,0 +1,54 @@
+import numpy as np
+from controls import monthCode, econSector
+
+MEASURES = ['valueChannel', 'valueNPL', 'percentNPL']
+
+#cumulative per-sector, per-month sums of the sector-level dataset.
+#any year (or month) range sum or mean is two lookups per sector instead of a fresh groupby
+class Rollup:
+    def __init__(self, df):
+        self.first_year = int(df['Tahun'].min())
+        self.last_year = int(df['Tahun'].max())
+        n_periods = (self.last_year - self.first_year + 1) * 12
+
+        sector = np.asarray(df['SektorEkonomi'].map({s: i for i, s in enumerate(econSector)}), dtype=int)
+        period = ((df['Tahun'].values.astype(int) - self.first_year) * 12
+                  + np.asarray(df['Bulan'].map({m: i for i, m in enumerate(monthCode)}), dtype=int))
+
+        #one leading zero column so range sums are cum[:, end] - cum[:, start]
+        self.cum = {}
+        for col in MEASURES + ['count']:
+            values = np.ones(len(df)) if col == 'count' else df[col].values.astype(float)
+            grid = np.zeros((len(econSector), n_periods + 1))
+            np.add.at(grid, (sector, period + 1), np.nan_to_num(values))
+            self.cum[col] = np.cumsum(grid, axis=1)
+
+    def _bounds(self, start_year, end_year, start_month=0, end_month=11):
+        start_year = min(max(int(start_year), self.first_year), self.last_year)
+        end_year = min(max(int(end_year), self.first_year), self.last_year)
+        start = (start_year - self.first_year) * 12 + start_month
+        end = (end_year - self.first_year) * 12 + end_month + 1
+        return start, max(end, start)
+
+    #sum of a measure over the range (years inclusive) for all sectors, in econSector order
+    def range_sum(self, measure, start_year, end_year, start_month=0, end_month=11):
+        start, end = self._bounds(start_year, end_year, start_month, end_month)
+        return self.cum[measure][:, end] - self.cum[measure][:, start]
+
+    #mean over the observed months of the range, nan for sectors without data in it
+    def range_mean(self, measure, start_year, end_year, start_month=0, end_month=11):
+        total = self.range_sum(measure, start_year, end_year, start_month, end_month)
+        count = self.range_sum('count', start_year, end_year, start_month, end_month)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(count > 0, total / count, np.nan)
+
+    #first day of every month covered, as datetime64[M]
+    def periods(self):
+        return np.arange("{}-01".format(self.first_year), "{}-01".format(self.last_year + 1), dtype='datetime64[M]')
+
+    #per-sector value of every month (mean of its rows), nan for months without data
+    def monthly(self, measure):
+        total = np.diff(self.cum[measure], axis=1)
+        count = np.diff(self.cum['count'], axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(count > 0, total / count, np.nan)
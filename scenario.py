@@ -0,0 +1,58 @@
+import numpy as np
+from controls import econSector
+from prediction import predict_sectors
+from storage import aggregate
+
+#IJP tariff (in percent) from the projected total NPL percentage, 80% guarantee coverage
+def ijp_tariff(npl_percentage):
+    return ((((npl_percentage/100) * 0.8)-0.01) / 0.9)*100
+
+#IJP budget with every sector charged the tariff of its own projected NPL ratio (n x 18 for a batch of
+#allocations). A sector below the break-even ratio pays nothing rather than a negative premium, so
+#unlike the pooled tariff this does not follow the total NPL value
+def sector_ijp_budget(credits, percent_npl):
+    tariff = np.maximum(ijp_tariff(np.asarray(percent_npl, dtype=float)*100), 0)
+    return (tariff * np.asarray(credits, dtype=float) / 100).sum(axis=-1)
+
+#loss limit budget is 1% of total credit channeling
+def loss_limit(total_credit):
+    return total_credit / 100
+
+#totals, IJP and loss limit of a scenario from its sector credits and projected NPL ratios
+def scenario_totals(credits, percent_npl):
+    credits = np.asarray(credits, dtype=float)
+    percent_npl = np.asarray(percent_npl, dtype=float)
+    npl_value = credits * percent_npl
+    total_credit = credits.sum()
+    total_npl_val = npl_value.sum()
+    total_npl_percentage = (total_npl_val/total_credit)*100
+    ijp_trf = ijp_tariff(total_npl_percentage)
+    return {
+        'credits': credits,
+        'percent_npl': percent_npl,
+        'npl_value': npl_value,
+        'total_credit': total_credit,
+        'total_npl_val': total_npl_val,
+        'total_npl_percentage': total_npl_percentage,
+        'ijp_trf': ijp_trf,
+        'ijp_budget': ijp_trf * total_credit / 100,
+        'loss_limit_budget': loss_limit(total_credit),
+    }
+
+#sector NPL projection and budget figures of one scenario, as in the Penganggaran tab
+def compute_scenario(model, econ_growth, inflasi, unemployment, credits):
+    credits = np.asarray(credits, dtype=float)
+    percent_npl = predict_sectors(model, credits, inflasi, econ_growth, unemployment)
+    return scenario_totals(credits, percent_npl)
+
+#June 2020 macro values and sector credits (Rupiah) used as the form defaults
+def default_scenario(data_file, year=2020, month="Jun"):
+    filtered_df = aggregate(data_file, by='SektorEkonomi', filters={'Tahun': year, 'Bulan': month},
+                            means=['Inflasi','EconGrowth','Unemployment'])
+    filtered_df = filtered_df.set_index('SektorEkonomi').reindex(econSector)
+    return {
+        'EconGrowth': filtered_df['EconGrowth'].values[0],
+        'Inflasi': filtered_df['Inflasi'].values[0],
+        'Unemployment': filtered_df['Unemployment'].values[0],
+        'credits': list(filtered_df['valueChannel'].values*1000000000),
+    }
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import pathlib
+import time
+import numpy as np
+import prediction
+import scenario
+from prediction import file_hash
+from scenario import compute_scenario
+from sqlite_store import SqliteStore
+
+# get relative cache folder
+PATH = pathlib.Path(__file__).parent
+STORE_FILE = PATH.joinpath("cache").resolve().joinpath("scenarios.sqlite")
+
+#evict least recently used scenarios once the stored payloads exceed this size
+MAX_BYTES = 64 * 1024 * 1024
+
+#a hit only refreshes last_used once it is older than this (seconds): eviction order needs no
+#finer resolution, and every refresh is a write that takes sqlite's single write lock
+TOUCH_INTERVAL = 60
+
+#the code a stored result was computed with, so results persisted across restarts are not
+#served after the scenario formulas or feature encoding change
+CODE_VERSION = hashlib.sha1("".join(file_hash(m.__file__) for m in (scenario, prediction)).encode()).hexdigest()[:16]
+
+#canonical scenario key: the same macro values, sector credits, model and code version
+#give the same key in every worker, whatever the input types (int/float/numpy)
+def scenario_key(model_version, econ_growth, inflasi, unemployment, credits):
+    canonical = json.dumps([model_version, CODE_VERSION, float(econ_growth), float(inflasi), float(unemployment),
+                            [float(c) for c in credits]], separators=(',', ':'))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:20]
+
+def _to_json(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(type(value))
+
+#scenario results in a sqlite file shared by all workers, see SqliteStore
+class ScenarioStore(SqliteStore):
+    def __init__(self, path=STORE_FILE, max_bytes=MAX_BYTES, touch_interval=TOUCH_INTERVAL):
+        super().__init__(path)
+        self.max_bytes = max_bytes
+        self.touch_interval = touch_interval
+        with self._connect() as conn:
+            conn.execute("""CREATE TABLE IF NOT EXISTS scenarios (
+                key TEXT PRIMARY KEY, inputs TEXT, outputs TEXT,
+                size INTEGER, created REAL, last_used REAL)""")
+            conn.execute("CREATE INDEX IF NOT EXISTS scenarios_last_used ON scenarios (last_used)")
+
+    def get(self, key):
+        conn = self._connect()
+        row = conn.execute("SELECT inputs, outputs, last_used FROM scenarios WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[2] > self.touch_interval:
+            with conn:
+                conn.execute("UPDATE scenarios SET last_used = ? WHERE key = ?", (now, key))
+        return {'inputs': json.loads(row[0]), 'outputs': json.loads(row[1])}
+
+    def put(self, key, inputs, outputs):
+        inputs = json.dumps(inputs, default=_to_json)
+        outputs = json.dumps(outputs, default=_to_json)
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO scenarios VALUES (?, ?, ?, ?, ?, ?)",
+                         (key, inputs, outputs, len(inputs) + len(outputs), now, now))
+            self._evict(conn)
+
+    #drop least recently used rows until the store is back under 90% of max_bytes
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM scenarios").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - int(self.max_bytes * 0.9)
+        stale = []
+        for key, size in conn.execute("SELECT key, size FROM scenarios ORDER BY last_used"):
+            if excess <= 0:
+                break
+            stale.append((key,))
+            excess -= size
+        conn.executemany("DELETE FROM scenarios WHERE key = ?", stale)
+
+    #stored result of the scenario, computing and storing it on a miss
+    def load_or_compute(self, model, model_version, econ_growth, inflasi, unemployment, credits):
+        key = scenario_key(model_version, econ_growth, inflasi, unemployment, credits)
+        stored = self.get(key)
+        if stored is not None:
+            return key, stored['outputs']
+
+        result = compute_scenario(model, econ_growth, inflasi, unemployment, credits)
+        outputs = json.loads(json.dumps(result, default=_to_json))
+        inputs = {'model': model_version, 'EconGrowth': econ_growth, 'Inflasi': inflasi,
+                  'Unemployment': unemployment, 'credits': list(credits)}
+        self.put(key, inputs, outputs)
+        return key, outputs
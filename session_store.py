@@ -0,0 +1,77 @@
+import json
+import pathlib
+import time
+from sqlite_store import SqliteStore
+
+# get relative cache folder
+PATH = pathlib.Path(__file__).parent
+SESSION_FILE = PATH.joinpath("cache").resolve().joinpath("sessions.sqlite")
+
+#sessions idle for longer than this are dropped, the browser then resends its full state
+TTL = 24 * 3600
+
+#snapshots kept per session and tab, older ones can no longer serve as a diff base
+MAX_SNAPSHOTS = 16
+
+#scenario inputs and rendered outputs of each browser tab, one snapshot per request sequence
+#number, in a sqlite file every worker sees (SqliteStore).
+#heads holds the newest sequence number each tab has sent, whichever worker got it: a request
+#claims it before computing and only stores its snapshot while it still holds it
+class SessionStore(SqliteStore):
+    def __init__(self, path=SESSION_FILE, ttl=TTL, max_snapshots=MAX_SNAPSHOTS):
+        super().__init__(path)
+        self.ttl = ttl
+        self.max_snapshots = max_snapshots
+        self._last_expiry = 0
+        with self._connect() as conn:
+            conn.execute("""CREATE TABLE IF NOT EXISTS sessions (
+                token TEXT, slot TEXT, seq INTEGER, fields TEXT, outputs TEXT, updated REAL,
+                PRIMARY KEY (token, slot, seq))""")
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated)")
+            conn.execute("""CREATE TABLE IF NOT EXISTS heads (
+                token TEXT, slot TEXT, seq INTEGER, updated REAL, PRIMARY KEY (token, slot))""")
+
+    def get(self, token, slot, seq):
+        row = self._connect().execute("SELECT fields, outputs FROM sessions WHERE token = ? AND slot = ? AND seq = ?",
+                                      (token, slot, seq)).fetchone()
+        if row is None:
+            return None
+        return {'fields': json.loads(row[0]), 'outputs': json.loads(row[1])}
+
+    #newest sequence number the tab has sent, 0 if none
+    def latest_seq(self, token, slot):
+        row = self._connect().execute("SELECT seq FROM heads WHERE token = ? AND slot = ?", (token, slot)).fetchone()
+        return row[0] if row else 0
+
+    #compare-and-set the tab's head to seq, False when the tab already sent seq or a newer request
+    def claim(self, token, slot, seq):
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute("UPDATE heads SET seq = ?, updated = ? WHERE token = ? AND slot = ? AND seq < ?",
+                                  (seq, now, token, slot, seq))
+            if cursor.rowcount:
+                return True
+            cursor = conn.execute("INSERT OR IGNORE INTO heads VALUES (?, ?, ?, ?)", (token, slot, seq, now))
+            return cursor.rowcount > 0
+
+    #store the snapshot of a claimed request, False (nothing stored) once a newer one claimed the tab.
+    #the head check and the insert share one write transaction, so no claim can slip in between
+    def put(self, token, slot, seq, fields, outputs):
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute("UPDATE heads SET updated = ? WHERE token = ? AND slot = ? AND seq = ?",
+                                  (now, token, slot, seq))
+            if not cursor.rowcount:
+                return False
+            conn.execute("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?)",
+                         (token, slot, seq, json.dumps(fields), json.dumps(outputs), now))
+            conn.execute("DELETE FROM sessions WHERE token = ? AND slot = ? AND seq <= ?",
+                         (token, slot, seq - self.max_snapshots))
+            #idle sessions are swept at most once a minute per process
+            if now - self._last_expiry > 60:
+                self._last_expiry = now
+                conn.execute("DELETE FROM sessions WHERE updated < ?", (now - self.ttl,))
+                conn.execute("DELETE FROM heads WHERE updated < ?", (now - self.ttl,))
+        return True
@@ -0,0 +1,170 @@
+import argparse
+import time
+import numpy as np
+from scipy.special import ndtr, ndtri
+from controls import econSector
+from prediction import MODEL_FILE, load_model
+from scenario import compute_scenario, default_scenario, loss_limit
+from storage import DATA_FILE, iter_chunks
+
+N_SECTORS = len(econSector)
+
+#synthetic portfolios: lognormal loan sizes per sector with this mean (Rupiah) and log-sd,
+#scaled so every sector adds up to its credit channeling
+MEAN_LOAN = 250000000
+SIGMA = 1.0
+
+#assumed share of a defaulted loan recovered, and the guarantee coverage of the IJP formula
+RECOVERY = 0.25
+COVERAGE = 0.8
+
+#one-factor (Vasicek) asset correlation, 0 makes defaults independent. Without it the loss of
+#millions of loans hardly varies and the loss limit collapses onto the expected loss
+RHO = 0.15
+
+TRIALS = 2000
+CONFIDENCE = 0.99
+
+#draws per block of the default sampler, bounds its memory (8 bytes each)
+BLOCK_ELEMENTS = 4000000
+
+#lognormal loan sizes per sector, as many loans as the credit holds at the mean size
+def synthetic_loans(credits, mean_loan=MEAN_LOAN, sigma=SIGMA, seed=0):
+    rng = np.random.default_rng(seed)
+    loans = []
+    for credit in np.asarray(credits, dtype=float):
+        n = max(int(round(credit / mean_loan)), 1)
+        sizes = rng.lognormal(-sigma**2 / 2, sigma, n)
+        loans.append(sizes * (credit / sizes.sum()))
+    return loans
+
+#loan sizes (Rupiah) per sector from a csv or parquet file with SektorEkonomi and PenyaluranKredit,
+#one row per loan, read in chunks
+def read_loans(source):
+    parts = [[] for _ in range(N_SECTORS)]
+    for chunk in iter_chunks(source, ['SektorEkonomi', 'PenyaluranKredit']):
+        sector = np.asarray(chunk['SektorEkonomi'].map({s: i for i, s in enumerate(econSector)}), dtype=float)
+        if np.isnan(sector).any():
+            raise ValueError("sektor ekonomi kosong atau tidak dikenal pada {} baris".format(np.isnan(sector).sum()))
+        sizes = chunk['PenyaluranKredit'].values.astype(float)
+        for i in range(N_SECTORS):
+            parts[i].append(sizes[sector == i])
+    return [np.concatenate(p) if p else np.zeros(0) for p in parts]
+
+#default probability of every sector given the systematic factor z of each trial (trials x sectors)
+def conditional_pd(pd, rho, z):
+    pd = np.clip(np.asarray(pd, dtype=float), 0, 1)
+    if rho == 0:
+        return np.broadcast_to(pd, (len(z), len(pd))).copy()
+    return ndtr((ndtri(pd)[None, :] - np.sqrt(rho) * np.asarray(z)[:, None]) / np.sqrt(1 - rho))
+
+#loss of one sector in each trial with default probability p: every loan defaults independently,
+#sampled as geometric gaps between defaulted loans so the work follows the number of defaults
+#instead of the number of loans. exposure ends with a zero that absorbs positions past the last loan
+def _sector_losses(rng, exposure, p):
+    n = len(exposure) - 1
+    loss = np.zeros(len(p))
+    last = np.full(len(p), -1, dtype=np.int64)
+    active = np.flatnonzero(p > 0)
+    while len(active):
+        q = p[active]
+        #enough gaps to pass the last loan in almost every trial, the rest go round again
+        left = (n - 1 - last[active]) * q
+        m = int(np.ceil((left + 5 * np.sqrt(left)).max())) + 8
+        #inverse-cdf geometric gaps from float32 uniforms in (0, 1], several times faster than
+        #Generator.geometric. Gaps past the end are clipped so the running positions stay small
+        u = 1 - rng.random((len(active), m), dtype=np.float32)
+        gaps = np.ceil(np.log(u) / np.log1p(-np.minimum(q, 1 - 1e-7)).astype(np.float32)[:, None])
+        np.clip(gaps, 1, n + 1, out=gaps)
+        positions = last[active, None] + np.cumsum(gaps.astype(np.int64), axis=1)
+        loss[active] += np.take(exposure, np.minimum(positions, n)).sum(axis=1, dtype=float)
+        last[active] = positions[:, -1]
+        active = active[last[active] < n - 1]
+    return loss
+
+#guarantor loss of every sector in every trial (trials x sectors). Trials are sorted by their
+#systematic factor and run in blocks of similar default probability to keep the blocks tight
+def simulate_losses(loans, pd, recovery=RECOVERY, coverage=COVERAGE, rho=RHO, trials=TRIALS, seed=0):
+    rng = np.random.default_rng(seed)
+    z = rng.standard_normal(trials)
+    p = conditional_pd(pd, rho, z)
+    recovery = np.broadcast_to(np.asarray(recovery, dtype=float), (N_SECTORS,))
+    order = np.argsort(z)
+    losses = np.zeros((trials, N_SECTORS))
+    for s in range(N_SECTORS):
+        if not len(loans[s]):
+            continue
+        exposure = np.append(loans[s] * (1 - recovery[s]) * coverage, 0).astype(np.float32)
+        step = max(int(BLOCK_ELEMENTS // max(len(loans[s]) * p[:, s].max(), 1)), 1)
+        for start in range(0, trials, step):
+            rows = order[start:start + step]
+            losses[rows, s] = _sector_losses(rng, exposure, p[rows, s])
+    return losses
+
+#expected loss, spread, value at risk (the loss limit covering the confidence level) and
+#expected shortfall beyond it
+def loss_summary(losses, confidence=CONFIDENCE):
+    total = losses.sum(axis=1)
+    var = np.quantile(total, confidence)
+    return {'expected_loss': total.mean(), 'std': total.std(), 'var': var,
+            'expected_shortfall': total[total >= var].mean(), 'confidence': confidence,
+            'sector_expected_loss': losses.mean(axis=0)}
+
+#sector default probabilities from the model's NPL projection of the scenario, then the loss
+#distribution of its loans (synthetic unless given)
+def simulate_scenario(model, econ_growth, inflasi, unemployment, credits=None, loans=None, recovery=RECOVERY,
+                      coverage=COVERAGE, rho=RHO, trials=TRIALS, seed=0):
+    if loans is None:
+        loans = synthetic_loans(credits, seed=seed)
+    credits = [max(l.sum(), 1.0) for l in loans]
+    result = compute_scenario(model, econ_growth, inflasi, unemployment, credits)
+    losses = simulate_losses(loans, result['percent_npl'], recovery, coverage, rho, trials, seed)
+    return result, losses
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Simulasi Monte Carlo kerugian penjaminan tingkat pinjaman untuk menentukan loss limit")
+    parser.add_argument('--loans', default=None, help="csv atau parquet pinjaman (SektorEkonomi, PenyaluranKredit); "
+                                                       "tanpa ini portofolio sintetis dari kredit Juni 2020")
+    parser.add_argument('--econ-growth', type=float, default=None)
+    parser.add_argument('--inflasi', type=float, default=None)
+    parser.add_argument('--unemployment', type=float, default=None)
+    parser.add_argument('--mean-loan', type=float, default=MEAN_LOAN, help="rata-rata ukuran pinjaman sintetis (Rupiah)")
+    parser.add_argument('--sigma', type=float, default=SIGMA, help="simpangan baku log ukuran pinjaman sintetis")
+    parser.add_argument('--recovery', type=float, default=RECOVERY, help="tingkat pemulihan pinjaman gagal bayar")
+    parser.add_argument('--coverage', type=float, default=COVERAGE, help="porsi penjaminan")
+    parser.add_argument('--rho', type=float, default=RHO, help="korelasi aset satu faktor, 0 = independen")
+    parser.add_argument('--trials', type=int, default=TRIALS)
+    parser.add_argument('--confidence', type=float, default=CONFIDENCE)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default=None, help="csv kerugian per percobaan dan sektor")
+    args = parser.parse_args()
+
+    defaults = default_scenario(DATA_FILE)
+    econ_growth = defaults['EconGrowth'] if args.econ_growth is None else args.econ_growth
+    inflasi = defaults['Inflasi'] if args.inflasi is None else args.inflasi
+    unemployment = defaults['Unemployment'] if args.unemployment is None else args.unemployment
+
+    started = time.time()
+    loans = read_loans(args.loans) if args.loans else synthetic_loans(defaults['credits'], args.mean_loan, args.sigma, args.seed)
+    n_loans = sum(len(l) for l in loans)
+    result, losses = simulate_scenario(load_model(MODEL_FILE), econ_growth, inflasi, unemployment, loans=loans,
+                                       recovery=args.recovery, coverage=args.coverage, rho=args.rho,
+                                       trials=args.trials, seed=args.seed)
+    summary = loss_summary(losses, args.confidence)
+    seconds = time.time() - started
+
+    print("{:,} pinjaman x {:,} percobaan dalam {:.1f} detik".format(n_loans, args.trials, seconds))
+    print("Total penyaluran kredit          Rp {:,.0f}".format(result['total_credit']))
+    print("Proyeksi total NPL               {:.2f} %".format(result['total_npl_percentage']))
+    print("Kerugian harapan                 Rp {:,.0f}".format(summary['expected_loss']))
+    print("Simpangan baku kerugian          Rp {:,.0f}".format(summary['std']))
+    print("{:<33}Rp {:,.0f}".format("Loss limit ({:.1%})".format(summary['confidence']), summary['var']))
+    print("Expected shortfall               Rp {:,.0f}".format(summary['expected_shortfall']))
+    print("Loss limit 1% penyaluran         Rp {:,.0f}".format(loss_limit(result['total_credit'])))
+    print("{:<66} {:>10} {:>22}".format('sektor', 'PD %', 'kerugian harapan'))
+    for i, sector in enumerate(econSector):
+        print("{:<66} {:>10.2f} {:>22,.0f}".format(sector[:66], result['percent_npl'][i]*100, summary['sector_expected_loss'][i]))
+
+    if args.out:
+        import pandas as pd
+        pd.DataFrame(losses, columns=econSector).to_csv(args.out, index_label='percobaan')
@@ -0,0 +1,60 @@
+import collections
+import threading
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+#coalesce identical in-flight computations within a worker process: while one caller computes
+#a key, concurrent callers with the same key wait for it and share its result (or exception).
+#Workers only overlap requests when they run threads (dev server, gunicorn --threads)
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+#latest request generation per (session, slot). A request that is no longer the latest of its
+#session when its computation finishes has been superseded by newer inputs and should be dropped
+class Supersede:
+    def __init__(self, max_sessions=10000):
+        self._lock = threading.Lock()
+        self._latest = collections.OrderedDict()
+        self.max_sessions = max_sessions
+
+    def begin(self, session, slot):
+        with self._lock:
+            generation = self._latest.pop((session, slot), 0) + 1
+            self._latest[(session, slot)] = generation
+            while len(self._latest) > self.max_sessions:
+                self._latest.popitem(last=False)
+            return generation
+
+    def is_current(self, session, slot, generation):
+        with self._lock:
+            return self._latest.get((session, slot)) == generation
@@ -0,0 +1,22 @@
+import os
+import pathlib
+import sqlite3
+import threading
+
+#a sqlite file shared by all Gunicorn workers and kept across restarts. Connections are opened
+#per process and thread, WAL lets readers run alongside a writer
+class SqliteStore:
+    def __init__(self, path):
+        self.path = pathlib.Path(path)
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(str(self.path), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
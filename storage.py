@@ -0,0 +1,122 @@
+import argparse
+import functools
+import pathlib
+import pandas as pd
+from controls import monthCode, econSector
+from datalayer import READ_DTYPES, apply_schema, validate
+
+# get relative data folder
+PATH = pathlib.Path(__file__).parent
+DATA_PATH = PATH.joinpath("dataset").resolve()
+DATA_FILE = DATA_PATH.joinpath('dataset-predictive-NPL-UMKM.csv')
+
+#rows per chunk read from disk, memory use is bounded by this and the number of groups
+CHUNK_SIZE = 200000
+
+#columns that can be used for filtering and grouping, the rest are measures
+KEY_COLUMNS = ['Tahun', 'Bulan', 'SektorEkonomi']
+SUM_COLUMNS = ['valueChannel', 'valueNPL']
+MEAN_COLUMNS = ['percentNPL']
+
+#a source is either a csv file, a single parquet file or a directory of parquet files
+#partitioned hive style (e.g. Tahun=2020/Bulan=Jun/part-0.parquet)
+def is_parquet(source):
+    source = pathlib.Path(source)
+    return source.is_dir() or source.suffix == '.parquet'
+
+#string keys are read as categoricals, only the requested columns are parsed (all when None)
+def _read_csv_chunks(source, columns, filters, chunksize):
+    dtype = {col: t for col, t in READ_DTYPES.items() if columns is None or col in columns}
+    for chunk in pd.read_csv(source, usecols=columns, dtype=dtype, chunksize=chunksize, low_memory=False):
+        for col, values in filters:
+            chunk = chunk[chunk[col].isin(values)]
+        yield chunk
+
+#pyarrow is only needed for parquet sources, filters are pushed down to partition and row group level
+def _read_parquet_chunks(source, columns, filters, chunksize):
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(source, format='parquet', partitioning='hive')
+    expr = None
+    for col, values in filters:
+        cond = ds.field(col).isin(list(values))
+        expr = cond if expr is None else expr & cond
+    for batch in dataset.to_batches(columns=columns, filter=expr, batch_size=chunksize):
+        yield batch.to_pandas()
+
+def iter_chunks(source, columns, filters=(), chunksize=CHUNK_SIZE):
+    if is_parquet(source):
+        return _read_parquet_chunks(source, columns, filters, chunksize)
+    return _read_csv_chunks(source, columns, filters, chunksize)
+
+#keep chronological month and econSector order instead of alphabetical groupby order
+def _sort_keys(result, by):
+    order = []
+    for col in by:
+        if col == 'Bulan':
+            result['_Bulan'] = result['Bulan'].map({m: i for i, m in enumerate(monthCode)})
+            order.append('_Bulan')
+        elif col == 'SektorEkonomi':
+            result['_SektorEkonomi'] = result['SektorEkonomi'].map({s: i for i, s in enumerate(econSector)})
+            order.append('_SektorEkonomi')
+        else:
+            order.append(col)
+    result = result.sort_values(order).drop(columns=[c for c in order if c.startswith('_')])
+    return result.reset_index(drop=True)
+
+@functools.lru_cache(maxsize=256)
+def _aggregate(source, by, filters, sums, means, chunksize):
+    columns = list(dict.fromkeys(list(by) + [col for col, _ in filters] + list(sums) + list(means)))
+    acc = None
+    for chunk in iter_chunks(source, columns, filters, chunksize):
+        if chunk.empty:
+            continue
+        grouped = chunk.groupby(list(by), observed=True)
+        part = grouped[list(sums) + list(means)].sum()
+        for col in means:
+            part['_n_' + col] = grouped[col].count()
+        #fold each chunk into the running partial sums so memory stays bounded by the group count
+        acc = part if acc is None else pd.concat([acc, part]).groupby(level=list(range(len(by)))).sum()
+
+    if acc is None:
+        return pd.DataFrame(columns=list(by) + list(sums) + list(means))
+    for col in means:
+        acc[col] = acc[col] / acc.pop('_n_' + col)
+    #small result frames keep plain key values, load_dataset applies the typed schema
+    acc = acc.reset_index()
+    for col in by:
+        if acc[col].dtype.name == 'category':
+            acc[col] = acc[col].astype(acc[col].cat.categories.dtype)
+    return _sort_keys(acc, by)
+
+#sum of valueChannel/valueNPL and mean of percentNPL grouped by any of the key columns.
+#filters maps a key column to a value or list of values, e.g. {'Tahun': 2020, 'Bulan': ['Jun']}
+def aggregate(source, by, filters=None, sums=SUM_COLUMNS, means=MEAN_COLUMNS, chunksize=CHUNK_SIZE):
+    by = (by,) if isinstance(by, str) else tuple(by)
+    filters = tuple(sorted(
+        (col, tuple(values) if isinstance(values, (list, tuple, set)) else (values,))
+        for col, values in (filters or {}).items()))
+    return _aggregate(str(source), by, filters, tuple(sums), tuple(means), chunksize).copy()
+
+#sector-level monthly dataset with the typed schema of datalayer, validated on load
+def load_dataset(source=DATA_FILE):
+    df = aggregate(source, by=KEY_COLUMNS,
+                   means=['percentNPL', 'Inflasi', 'EconGrowth', 'Unemployment', 'pandemicTF'])
+    return apply_schema(validate(df))
+
+#rewrite a large csv as parquet partitioned by Tahun and Bulan, one chunk at a time
+def write_partitioned(csv_file, out_dir, chunksize=CHUNK_SIZE):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    for chunk in pd.read_csv(csv_file, chunksize=chunksize, low_memory=False):
+        pq.write_to_dataset(pa.Table.from_pandas(chunk, preserve_index=False), str(out_dir),
+                            partition_cols=['Tahun', 'Bulan'])
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Konversi dataset csv ke parquet terpartisi per Tahun/Bulan")
+    parser.add_argument('csv_file')
+    parser.add_argument('out_dir')
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+    write_partitioned(args.csv_file, args.out_dir, args.chunksize)
@@ -0,0 +1,181 @@
+import argparse
+import hashlib
+import json
+import os
+import pathlib
+import time
+import numpy as np
+from controls import econSector
+from prediction import MODEL_FILE, N_NUMERIC, dummySector, encode_features, file_hash, load_model
+
+PATH = pathlib.Path(__file__).parent
+CACHE_PATH = PATH.joinpath("cache").resolve()
+
+N_SECTORS = len(econSector)
+MACRO_AXES = ['Inflasi', 'EconGrowth', 'Unemployment']
+
+#grid points per axis: log credit (per sector), Inflasi, EconGrowth, Unemployment
+POINTS = (48, 16, 16, 16)
+
+#interpolated sectors must stay within this absolute NPL ratio error (0.005 = 0.5 percentage point)
+#at the given quantile of the measured error, other sectors are always computed by the model.
+#the forest is a step function and its worst errors sit on split thresholds between grid points:
+#at POINTS every sector of the shipped forest has a max above the tolerance (0.6 to 9.6 pp), so
+#the gate is on p99 and the tail beyond it (the max) is reported with the grid
+TOLERANCE = 0.005
+QUANTILE = 'p99'
+
+def surrogate_dir(model_version, cache_path=CACHE_PATH):
+    return pathlib.Path(cache_path).joinpath("surrogate-{}".format(model_version))
+
+#axis ranges from the observed data: each sector's credit range halved/doubled,
+#macro ranges widened by margin of their span on both sides
+def grid_axes(df, points=POINTS, margin=0.25):
+    log_credit = np.log(df['valueChannel'].values * 1000000000.0)
+    sector = np.asarray(df['SektorEkonomi'].map({s: i for i, s in enumerate(econSector)}), dtype=int)
+    credit_lo = np.array([log_credit[sector == i].min() for i in range(N_SECTORS)]) - np.log(2)
+    credit_hi = np.array([log_credit[sector == i].max() for i in range(N_SECTORS)]) + np.log(2)
+    axes = {'points': list(points),
+            'credit_lo': credit_lo.tolist(), 'credit_hi': credit_hi.tolist()}
+    for col in MACRO_AXES:
+        lo, hi = float(df[col].min()), float(df[col].max())
+        axes[col] = [lo - margin * (hi - lo), hi + margin * (hi - lo)]
+    return axes
+
+def _axis_values(axes):
+    n_credit, n_inf, n_eg, n_un = axes['points']
+    credit = np.linspace(axes['credit_lo'], axes['credit_hi'], n_credit).T
+    macro = [np.linspace(*axes[col], n) for col, n in zip(MACRO_AXES, (n_inf, n_eg, n_un))]
+    return credit, macro
+
+#evaluate the model on every grid point, one sector and credit slice at a time, into a .npy memmap
+def build_grid(model, axes, out_dir):
+    out_dir = pathlib.Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    credit, (inflasi, econ_growth, unemployment) = _axis_values(axes)
+    shape = (N_SECTORS,) + tuple(axes['points'])
+    tmp_file = out_dir.joinpath("grid.npy.tmp{}".format(os.getpid()))
+    grid = np.lib.format.open_memmap(tmp_file, mode='w+', dtype=np.float32, shape=shape)
+    macro = np.meshgrid(inflasi, econ_growth, unemployment, indexing='ij')
+    for sector in range(N_SECTORS):
+        for i, log_credit in enumerate(credit[sector]):
+            X = encode_features(np.exp(log_credit), macro[0], macro[1], macro[2], sector)
+            grid[sector, i] = model.predict(X).reshape(shape[2:])
+    grid.flush()
+    del grid
+    os.replace(tmp_file, out_dir.joinpath("grid.npy"))
+
+#multilinear interpolation of the 16 surrounding grid points. Rows outside the grid are
+#clamped here, the caller decides whether to use them
+def interpolate(grid, axes, log_credit, inflasi, econ_growth, unemployment, sector):
+    points = axes['points']
+    lo = np.asarray(axes['credit_lo'])[sector]
+    hi = np.asarray(axes['credit_hi'])[sector]
+    bounds = [(lo, hi)] + [axes[col] for col in MACRO_AXES]
+    index, frac = [], []
+    for x, (a, b), n in zip((log_credit, inflasi, econ_growth, unemployment), bounds, points):
+        pos = np.clip((x - a) / (b - a) * (n - 1), 0, n - 1)
+        i = np.minimum(pos.astype(int), n - 2)
+        index.append(i)
+        frac.append(pos - i)
+
+    #flat offsets of the 16 corners and their weights, gathered in one take from the flat grid
+    strides = np.cumprod([1] + list(points[::-1]))[::-1]
+    bits = (np.arange(16)[:, None] >> np.arange(4)[None, :]) & 1
+    base = sector * strides[0] + sum(index[d] * strides[d + 1] for d in range(4))
+    frac = np.stack(frac, axis=1)
+    weight = np.where(bits[None, :, :], frac[:, None, :], 1 - frac[:, None, :]).prod(axis=2)
+    corners = np.take(grid.reshape(-1), base[:, None] + bits @ strides[1:])
+    return (weight * corners).sum(axis=1)
+
+def _inside(axes, log_credit, inflasi, econ_growth, unemployment, sector):
+    inside = (log_credit >= np.asarray(axes['credit_lo'])[sector]) & (log_credit <= np.asarray(axes['credit_hi'])[sector])
+    for x, col in zip((inflasi, econ_growth, unemployment), MACRO_AXES):
+        inside &= (x >= axes[col][0]) & (x <= axes[col][1])
+    return inside
+
+#interpolation error against the model at random points inside the grid, per sector
+def measure_error(model, grid, axes, n_samples=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    sector = np.repeat(np.arange(N_SECTORS), n_samples)
+    log_credit = rng.uniform(np.asarray(axes['credit_lo'])[sector], np.asarray(axes['credit_hi'])[sector])
+    macro = [rng.uniform(*axes[col], len(sector)) for col in MACRO_AXES]
+    exact = model.predict(encode_features(np.exp(log_credit), macro[0], macro[1], macro[2], sector))
+    error = np.abs(interpolate(grid, axes, log_credit, macro[0], macro[1], macro[2], sector) - exact)
+    error = error.reshape(N_SECTORS, n_samples)
+    return {'p50': np.quantile(error, 0.5, axis=1).tolist(), 'p90': np.quantile(error, 0.9, axis=1).tolist(),
+            'p99': np.quantile(error, 0.99, axis=1).tolist(), 'max': error.max(axis=1).tolist()}
+
+def build(model, model_version, df, points=POINTS, n_samples=5000, cache_path=CACHE_PATH):
+    out_dir = surrogate_dir(model_version, cache_path)
+    axes = grid_axes(df, points)
+    started = time.time()
+    build_grid(model, axes, out_dir)
+    grid = np.load(out_dir.joinpath("grid.npy"), mmap_mode='r')
+    meta = {'model': model_version, 'axes': axes, 'error': measure_error(model, grid, axes, n_samples),
+            'seconds': time.time() - started}
+    with open(out_dir.joinpath("meta.json"), "w") as f:
+        json.dump(meta, f)
+    return meta
+
+#drop-in replacement for the model's predict on encoded rows: interpolates rows inside the grid
+#of sectors within tolerance, rows outside it (or with the pandemic flag off) go to the model
+class Surrogate:
+    def __init__(self, model, path, tolerance=TOLERANCE, quantile=QUANTILE):
+        path = pathlib.Path(path)
+        with open(path.joinpath("meta.json")) as f:
+            self.meta = json.load(f)
+        self.model = model
+        self.axes = self.meta['axes']
+        self.grid = np.load(path.joinpath("grid.npy"), mmap_mode='r')
+        self.trusted = np.asarray(self.meta['error'][quantile]) <= tolerance
+        #worst measured error of the interpolated sectors, 0 when the model serves every sector
+        self.tail = float(np.max(np.asarray(self.meta['error']['max'])[self.trusted], initial=0))
+        #scenario results are keyed on this, so grid and exact results are never mixed in the store
+        self.version = "{}-grid-{}".format(self.meta['model'], hashlib.sha1(
+            json.dumps([self.meta['axes'], tolerance, quantile]).encode()).hexdigest()[:8])
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=float)
+        sector = dummySector[X[:, N_NUMERIC:].argmax(axis=1)]
+        use_grid = self.trusted[sector] & (X[:, 1] == 1) & _inside(self.axes, X[:, 0], X[:, 2], X[:, 3], X[:, 4], sector)
+        result = np.empty(len(X))
+        if use_grid.any():
+            rows = np.flatnonzero(use_grid)
+            result[rows] = interpolate(self.grid, self.axes, X[rows, 0], X[rows, 2], X[rows, 3], X[rows, 4], sector[rows])
+        if not use_grid.all():
+            result[~use_grid] = self.model.predict(X[~use_grid])
+        return result
+
+#surrogate of the loaded model if its grid has been built, otherwise the model itself
+def load_surrogate(model, model_version, tolerance=TOLERANCE, quantile=QUANTILE, cache_path=CACHE_PATH):
+    path = surrogate_dir(model_version, cache_path)
+    if not path.joinpath("meta.json").exists():
+        return model, model_version
+    surrogate = Surrogate(model, path, tolerance, quantile)
+    return surrogate, surrogate.version
+
+if __name__ == '__main__':
+    from storage import DATA_FILE, load_dataset
+
+    parser = argparse.ArgumentParser(description="Bangun grid respons model per sektor untuk prediksi interaktif cepat")
+    parser.add_argument('--model', default=str(MODEL_FILE))
+    parser.add_argument('--data', default=str(DATA_FILE))
+    parser.add_argument('--points', type=int, nargs=4, default=list(POINTS),
+                        metavar=('KREDIT', 'INFLASI', 'ECONGROWTH', 'UNEMPLOYMENT'))
+    parser.add_argument('--samples', type=int, default=5000, help="titik acak per sektor untuk mengukur galat")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    model_version = file_hash(args.model)[:16]
+    meta = build(load_model(args.model), model_version, load_dataset(args.data), args.points, args.samples)
+    print("grid {} dibangun dalam {:.1f} detik".format(surrogate_dir(model_version), meta['seconds']))
+    print("{:<66} {:>8} {:>8} {:>8} {:>8}".format('sektor', 'p50 %', 'p90 %', 'p99 %', 'maks %'))
+    for i, sector in enumerate(econSector):
+        error = meta['error']
+        flag = "" if error[QUANTILE][i] <= args.tolerance else "  (model)"
+        print("{:<66} {:>8.3f} {:>8.3f} {:>8.3f} {:>8.3f}{}".format(
+            sector[:66], error['p50'][i]*100, error['p90'][i]*100, error['p99'][i]*100, error['max'][i]*100, flag))
+    grid = Surrogate(None, surrogate_dir(model_version), args.tolerance)
+    print("{} dari {} sektor memakai grid ({} <= {:.3f} %), galat maksimum terukur {:.3f} %".format(
+        int(grid.trusted.sum()), N_SECTORS, QUANTILE, args.tolerance*100, grid.tail*100))
@@ -0,0 +1,22 @@
+import pathlib
+import sys
+import numpy as np
+import pytest
+
+#the modules live at the top of the repo, not in a package
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from prediction import N_NUMERIC, dummySector
+
+#stands in for the forest: the NPL ratio of each encoded row is response(sector, X)
+class SectorModel:
+    def __init__(self, response):
+        self.response = response
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=float)
+        return self.response(dummySector[X[:, N_NUMERIC:].argmax(axis=1)], X)
+
+@pytest.fixture
+def sector_model():
+    return SectorModel
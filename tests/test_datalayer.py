@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+import datalayer
+from storage import DATA_FILE, load_dataset
+
+def _raw():
+    return load_dataset(DATA_FILE).astype({'valueChannel': 'float64', 'valueNPL': 'float64'})
+
+def test_dataset_passes():
+    datalayer.apply_schema(datalayer.validate(_raw()))
+
+@pytest.mark.parametrize('col', ['valueChannel', 'valueNPL'])
+def test_fraction_rejected(col):
+    df = _raw()
+    df.loc[df.index[0], col] += 0.5
+    with pytest.raises(ValueError, match="bilangan bulat"):
+        datalayer.validate(df)
+
+def test_nan_rejected():
+    df = _raw()
+    df.loc[df.index[0], 'valueNPL'] = np.nan
+    with pytest.raises(ValueError, match="kosong"):
+        datalayer.validate(df)
@@ -0,0 +1,58 @@
+import itertools
+import math
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+import explain
+from controls import econSector
+from prediction import encode_features
+
+#a small forest on encoded rows with every input group in its splits
+def _forest():
+    rng = np.random.default_rng(0)
+    n = 400
+    sector = rng.integers(0, len(econSector), n)
+    X = encode_features(10 ** rng.uniform(11, 15, n), rng.uniform(1, 4, n), rng.uniform(-5, 6, n),
+                        rng.uniform(4, 8, n), sector, rng.integers(0, 2, n))
+    y = 0.01 * X[:, 0] + 0.02 * X[:, 2] * (sector % 3) - 0.01 * X[:, 3] + 0.05 * (X[:, 4] > 6) + rng.normal(0, 0.01, n)
+    return RandomForestRegressor(n_estimators=4, max_depth=5, random_state=0).fit(X, y)
+
+#path-dependent expectation of one tree for coalition S, node by node
+def _tree_value(tree, x, S, node=0):
+    if tree.children_left[node] < 0:
+        return tree.value[node, 0, 0]
+    left, right = tree.children_left[node], tree.children_right[node]
+    if S & (1 << explain.featureGroup[tree.feature[node]]):
+        child = left if np.float32(x[tree.feature[node]]) <= tree.threshold[node] else right
+        return _tree_value(tree, x, S, child)
+    cover = tree.weighted_n_node_samples
+    return (cover[left] * _tree_value(tree, x, S, left) + cover[right] * _tree_value(tree, x, S, right)) / cover[node]
+
+#shapley values of the groups from the coalition values by their definition
+def _brute_force(model, x):
+    v = {S: np.mean([_tree_value(e.tree_, x, S) for e in model.estimators_]) for S in range(explain.N_COALITIONS)}
+    n = explain.N_GROUPS
+    phi = np.zeros(n)
+    for g in range(n):
+        others = [h for h in range(n) if h != g]
+        for size in range(n):
+            for members in itertools.combinations(others, size):
+                S = sum(1 << h for h in members)
+                w = math.factorial(size) * math.factorial(n - size - 1) / math.factorial(n)
+                phi[g] += w * (v[S | (1 << g)] - v[S])
+    return v[0], phi
+
+def test_contributions_match_brute_force_shapley():
+    model = _forest()
+    explainer = explain.TreeExplainer(model)
+    rng = np.random.default_rng(1)
+    #one scenario (macro inputs shared by the rows) and rows that differ in every input
+    scenario = encode_features(10 ** rng.uniform(11, 15, len(econSector)), 2.5, 1.0, 6.5, np.arange(len(econSector)))
+    mixed = encode_features(10 ** rng.uniform(11, 15, 6), rng.uniform(1, 4, 6), rng.uniform(-5, 6, 6),
+                            rng.uniform(4, 8, 6), rng.integers(0, len(econSector), 6))
+    for X in (scenario, mixed):
+        base, contributions = explainer.explain(X)
+        for i, x in enumerate(X):
+            expected_base, expected = _brute_force(model, x)
+            assert np.isclose(base[i], expected_base)
+            assert np.allclose(contributions[i], expected, atol=1e-12)
+        assert np.allclose(base + contributions.sum(axis=1), model.predict(X))
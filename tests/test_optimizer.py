@@ -0,0 +1,36 @@
+import numpy as np
+import optimizer
+from controls import econSector
+
+#sector 0 has no NPL up to 5 of credit (9 to share with sector 1) and 1.2 % (below the IJP break-even of 1.25 %) above it,
+#sector 1 a constant 2 %, the other sectors are fixed at 1 with no NPL. Least NPL value puts 5 in
+#sector 0, least sector priced IJP moves everything it can into sector 0 where the tariff is 0
+def step_response(sector, X):
+    credit = np.exp(X[:, 0])
+    return np.select([sector == 0, sector == 1], [np.where(credit <= 5, 0.0, 0.012), 0.02], 0.0)
+
+def _optimize(model, objective, budget=1e9):
+    lower = np.ones(len(econSector))
+    upper = np.ones(len(econSector))
+    lower[:2], upper[:2] = 0.5, 9.5
+    return optimizer.optimize_allocation(model, 0, 2, 5, lower.sum() + 8, budget, lower, upper,
+                                         objective=objective, n_candidates=500)
+
+def test_objectives_return_different_allocations(sector_model):
+    model = sector_model(step_response)
+    npl = _optimize(model, 'npl')
+    ijp = _optimize(model, 'ijp')
+    assert 4.5 < npl['credits'][0] <= 5
+    assert ijp['credits'][1] < 0.6
+    assert npl['total_npl_val'] < ijp['total_npl_val']
+    assert ijp['sector_ijp_budget'] < npl['sector_ijp_budget']
+
+#the budget holds the IJP figure the objective works with, the one the panel shows as cost
+def test_budget_applies_to_the_objective_ijp(sector_model):
+    model = sector_model(step_response)
+    npl = _optimize(model, 'npl')
+    ijp = _optimize(model, 'ijp', budget=npl['loss_limit_budget'] + 0.01)
+    assert npl['cost'] == npl['ijp_budget'] + npl['loss_limit_budget']
+    assert ijp['cost'] == ijp['sector_ijp_budget'] + ijp['loss_limit_budget']
+    assert ijp['feasible']
+    assert not _optimize(model, 'ijp', budget=ijp['loss_limit_budget'])['feasible']
@@ -0,0 +1,7 @@
+import report
+
+def test_colliding_names_get_distinct_pages():
+    names = ['a/b', 'a-b', 'A-B', 'a-b-2', 'x', '']
+    pages = [s['page'] for s in report.assign_pages({'name': n} for n in names)]
+    assert len({p.lower() for p in pages}) == len(names)
+    assert pages[0] == 'a-b.html' and pages[4] == 'x.html'
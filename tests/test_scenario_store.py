@@ -0,0 +1,18 @@
+from scenario_store import ScenarioStore
+
+#hits read without writing until last_used is older than the touch interval
+def test_hits_touch_last_used_once_per_interval(tmp_path):
+    store = ScenarioStore(tmp_path.joinpath("scenarios.sqlite"), touch_interval=60)
+    store.put("k", {'a': 1}, {'b': 2})
+    conn = store._connect()
+    writes = conn.total_changes
+    for _ in range(5):
+        assert store.get("k") == {'inputs': {'a': 1}, 'outputs': {'b': 2}}
+    assert conn.total_changes == writes
+
+    with conn:
+        conn.execute("UPDATE scenarios SET last_used = last_used - 120")
+    writes = conn.total_changes
+    store.get("k")
+    store.get("k")
+    assert conn.total_changes == writes + 1
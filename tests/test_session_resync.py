@@ -0,0 +1,44 @@
+import json
+import subprocess
+import uuid
+import pytest
+from prediction import MODEL_FILE
+
+pytestmark = pytest.mark.skipif(not MODEL_FILE.exists(), reason="model belum tersedia")
+
+NO_UPDATE = "no_update"
+
+#run a clientside callback of the app in node, with dash_clientside.no_update as a marker
+def run_js(function, *args):
+    script = "var window = {dash_clientside: {no_update: %s}};\nconsole.log(JSON.stringify((%s)(%s)));" % (
+        json.dumps(NO_UPDATE), function, ", ".join(json.dumps(a) for a in args))
+    return json.loads(subprocess.run(["node", "-e", script], capture_output=True, check=True, text=True).stdout)
+
+#an edit whose base snapshot the server no longer has is rendered from the full state the browser
+#resends, without waiting for another edit
+def test_resync_resends_full_state():
+    import app
+    slot = 'tarif'
+    fields, outputs = app.SESSION_SLOTS[slot]
+    values = dict(app.initial_fields, EconGrowth2=1.5)
+    values = {f: values[f] for f in fields}
+    render = app.session_renders[slot]
+    #sessions persist in the app's cache folder, a new browser tab each run
+    token = uuid.uuid4().hex[:10]
+
+    patch, ack = app.session_update(slot, {'token': token, 'seq': 7, 'base': 6,
+                                           'changed': {'EconGrowth2': 1.5}}, render)
+    assert patch['resync']
+    sent = {'token': token, 'seq': 7, 'history': {'6': {}, '7': values}}
+    resend = run_js(app.RESYNC_JS, patch, sent)
+    assert resend == {'token': token, 'seq': 7, 'fields': values}
+    #not once newer inputs were sent, their own request follows
+    assert run_js(app.RESYNC_JS, patch, dict(sent, seq=8)) == NO_UPDATE
+
+    render_js = app.RENDER_JS % json.dumps(["{}.{}".format(*o) for o in outputs])
+    assert run_js(render_js, patch, None, None) == [NO_UPDATE] * len(outputs)
+    resynced = app.session_resync(slot, resend, render)
+    assert app.sessions.get(token, slot, 7)['fields'] == values
+    expected, _ = render(None, values)
+    shown = run_js(render_js, patch, None, resynced)
+    assert json.dumps(shown) == json.dumps(json.loads(json.dumps(expected, cls=app.plotly.utils.PlotlyJSONEncoder)))
@@ -0,0 +1,22 @@
+from session_store import SessionStore
+
+def test_older_request_cannot_claim_or_store_after_newer(tmp_path):
+    store = SessionStore(tmp_path.joinpath("sessions.sqlite"))
+    assert store.claim("t", "tab", 1)
+    assert store.claim("t", "tab", 2)
+    #request 1 finishes after request 2 was sent: its snapshot is not stored
+    assert not store.put("t", "tab", 1, {'a': 1}, {'o': 1})
+    assert store.get("t", "tab", 1) is None
+    assert not store.claim("t", "tab", 1)
+    assert not store.claim("t", "tab", 2)
+    assert store.put("t", "tab", 2, {'a': 2}, {'o': 2})
+    assert store.get("t", "tab", 2) == {'fields': {'a': 2}, 'outputs': {'o': 2}}
+    assert store.latest_seq("t", "tab") == 2
+
+def test_tabs_are_independent(tmp_path):
+    store = SessionStore(tmp_path.joinpath("sessions.sqlite"))
+    assert store.claim("t", "tab", 5)
+    assert store.claim("t", "other", 1)
+    assert store.claim("u", "tab", 1)
+    assert store.latest_seq("t", "tab") == 5
+    assert store.latest_seq("v", "tab") == 0
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+import surrogate
+from controls import econSector
+from prediction import MODEL_FILE, encode_features, load_model
+from storage import DATA_FILE, load_dataset
+
+#the first sectors respond linearly to every input, which the grid interpolates exactly. The
+#others add a step on EconGrowth between two grid points, like a forest split threshold, in a cell
+#holding about 6 % of the samples, so their p99 error is above the tolerance
+LINEAR = 9
+STEP = 2.2
+
+def step_response(sector, X):
+    y = 0.02 + 0.001 * X[:, 0] + 0.003 * X[:, 2] - 0.002 * X[:, 3] + 0.001 * X[:, 4]
+    return y + np.where(sector >= LINEAR, 0.05 * (X[:, 3] > STEP), 0)
+
+def _dataset():
+    rng = np.random.default_rng(0)
+    n = 10 * len(econSector)
+    return pd.DataFrame({'SektorEkonomi': np.repeat(econSector, 10),
+                         'valueChannel': 10 ** rng.uniform(2, 5, n),
+                         'Inflasi': rng.uniform(1, 4, n),
+                         'EconGrowth': rng.uniform(-2, 6, n),
+                         'Unemployment': rng.uniform(4, 8, n)})
+
+def _build(model, tmp_path):
+    surrogate.build(model, 'test', _dataset(), points=(4, 4, 16, 4), n_samples=2000, cache_path=tmp_path)
+    return model, surrogate.load_surrogate(model, 'test', cache_path=tmp_path)[0]
+
+#random rows inside the grid of the trusted sectors, drawn apart from the error measurement
+def _held_out(grid, n=2000, seed=1):
+    axes = grid.axes
+    rng = np.random.default_rng(seed)
+    sector = np.repeat(np.flatnonzero(grid.trusted), n)
+    log_credit = rng.uniform(np.asarray(axes['credit_lo'])[sector], np.asarray(axes['credit_hi'])[sector])
+    macro = [rng.uniform(*axes[col], len(sector)) for col in surrogate.MACRO_AXES]
+    return encode_features(np.exp(log_credit), macro[0], macro[1], macro[2], sector)
+
+def test_trust_follows_error_quantile(sector_model, tmp_path):
+    _, grid = _build(sector_model(step_response), tmp_path)
+    step = np.arange(len(econSector)) >= LINEAR
+    assert (np.asarray(grid.meta['error'][surrogate.QUANTILE])[step] > surrogate.TOLERANCE).all()
+    assert (grid.trusted == ~step).all()
+    assert grid.tail <= surrogate.TOLERANCE
+
+def test_trusted_sectors_within_tolerance_on_held_out_points(sector_model, tmp_path):
+    model, grid = _build(sector_model(step_response), tmp_path)
+    X = _held_out(grid)
+    assert np.abs(grid.predict(X) - model.predict(X)).max() <= surrogate.TOLERANCE
+
+#the grid of the shipped forest must serve some sectors. On points the error was not measured on
+#their p99 stays within the tolerance up to the sampling noise of a quantile of 5000 points,
+#sectors are trusted right at the tolerance
+@pytest.mark.skipif(not MODEL_FILE.exists(), reason="model belum tersedia")
+def test_real_forest_grid_serves_sectors(tmp_path):
+    model = load_model()
+    surrogate.build(model, 'forest', load_dataset(DATA_FILE), cache_path=tmp_path)
+    grid = surrogate.load_surrogate(model, 'forest', cache_path=tmp_path)[0]
+    assert grid.trusted.any()
+    X = _held_out(grid, 5000)
+    error = np.abs(grid.predict(X) - model.predict(X)).reshape(-1, 5000)
+    assert (np.quantile(error, 0.99, axis=1) <= 1.1 * surrogate.TOLERANCE).all()
+    assert error.max() <= 2 * grid.tail